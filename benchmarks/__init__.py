@@ -0,0 +1,6 @@
+"""
+Load tests and benchmarks for Srihari Developers website
+
+    python -m benchmarks.run run --server gunicorn --workers 2 --concurrency 8
+    python -m benchmarks.run compare benchmarks/baseline.json benchmarks/results/<commit>.json
+"""
@@ -0,0 +1,134 @@
+"""
+CPU cost against bytes saved for response minification and compression
+
+Renders each page and API response once with CompressionMiddleware off,
+then times ``minify_html`` and every compression setting on the bodies,
+reporting milliseconds per response and the resulting size. Use it to pick
+COMPRESSION['BROTLI_QUALITY'] and to decide whether MINIFY_HTML pays off.
+
+Examples:
+    python -m benchmarks.compression
+    python -m benchmarks.compression --repeat 50 --paths /,/projects/ --output compression.json
+"""
+
+from argparse import Namespace
+import argparse
+import tempfile
+import shutil
+import json
+import time
+import sys
+import os
+
+from benchmarks.run import _git_commit, prepare_environment
+
+DEFAULT_PATHS = ['/', '/about/', '/services/', '/projects/', '/contact/', '/api/projects/', '/api/testimonials/']
+
+# Brotli qualities compared against the gzip default
+BROTLI_QUALITIES = [1, 4, 5, 6, 9, 11]
+
+
+def _time(function, repeat):
+    """Median milliseconds per call and the last result"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2], result
+
+
+def measure(body, is_html, repeat):
+    """
+    Time minification and each compression setting on one response body
+
+    Args:
+        body (bytes): Uncompressed response body
+        is_html (bool): Whether to minify before compressing
+        repeat (int): Runs per measurement; the median is reported
+
+    Returns:
+        dict: ``original`` size, ``minify`` and per-encoding ``{ms, bytes}``
+    """
+    from core.compression import brotli, compress, minify_html
+
+    result = {'original': len(body)}
+    if is_html:
+        ms, minified = _time(lambda: minify_html(body.decode('utf-8')).encode('utf-8'), repeat)
+        result['minify'] = {'ms': round(ms, 3), 'bytes': len(minified)}
+    else:
+        minified = body
+
+    ms, compressed = _time(lambda: compress(minified, 'gzip'), repeat)
+    result['gzip'] = {'ms': round(ms, 3), 'bytes': len(compressed)}
+    if brotli is not None:
+        for quality in BROTLI_QUALITIES:
+            options = {'BROTLI_QUALITY': quality}
+            ms, compressed = _time(lambda: compress(minified, 'br', options), repeat)
+            result[f'br-{quality}'] = {'ms': round(ms, 3), 'bytes': len(compressed)}
+    if is_html:
+        # What minifying adds on top of the default compression
+        ms, compressed = _time(lambda: compress(body, 'gzip'), repeat)
+        result['gzip-unminified'] = {'ms': round(ms, 3), 'bytes': len(compressed)}
+    return result
+
+
+def _format(path, result):
+    lines = [f"{path}: {result['original']} bytes"]
+    for name, value in result.items():
+        if name == 'original':
+            continue
+        saved = 1 - value['bytes'] / result['original']
+        lines.append(f"  {name:<16} {value['ms']:>8.3f} ms  {value['bytes']:>8} bytes  {saved:>6.1%} saved")
+    return '\n'.join(lines)
+
+
+def run(args):
+    bench_dir = tempfile.mkdtemp(prefix='srihari-bench-')
+    try:
+        prepare_environment(Namespace(firestore='none', no_page_cache=True), bench_dir)
+        os.environ['COMPRESSION_ENABLED'] = 'False'
+
+        import django
+        django.setup()
+        from django.test import Client
+
+        client = Client(raise_request_exception=False)
+        results = {}
+        for path in args.paths.split(','):
+            response = client.get(path)
+            if response.status_code != 200:
+                raise SystemExit(f"{path} returned HTTP {response.status_code}")
+            is_html = response.get('Content-Type', '').startswith('text/html')
+            results[path] = measure(response.content, is_html, args.repeat)
+            print(_format(path, results[path]))
+    finally:
+        shutil.rmtree(bench_dir, ignore_errors=True)
+
+    if args.output:
+        report = {
+            'meta': {
+                'commit': _git_commit(),
+                'date': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'repeat': args.repeat,
+                'cpus': os.cpu_count(),
+            },
+            'responses': results,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--paths', default=','.join(DEFAULT_PATHS), help='Comma-separated paths to measure')
+    parser.add_argument('--repeat', type=int, default=20, help='Runs per measurement (median is reported)')
+    parser.add_argument('--output', default=None, help='Also write the results to this JSON file')
+    run(parser.parse_args(argv))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
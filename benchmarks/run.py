@@ -0,0 +1,472 @@
+"""
+HTTP load test for Srihari Developers website
+
+Drives the public pages, a contact form POST and the JSON APIs at a fixed
+concurrency and records requests/second, latency percentiles and worker
+memory to a JSON file. ``compare`` flags regressions between two such files.
+
+The app runs either in this process (Django test client, no sockets) or
+under gunicorn with ``sriharidevelopers.wsgi``. Both use benchmarks.settings,
+which points the database, spool and cache at a temporary copy.
+
+Examples:
+    python -m benchmarks.run run --server gunicorn --workers 2 --concurrency 8
+    python -m benchmarks.run run --server inprocess --duration 5 --scenarios home,projects
+    python -m benchmarks.run run --firestore emulator --emulator-host localhost:8080
+    python -m benchmarks.run run --firestore memory --latency 0.05 --jitter 0.02 --failure-rate 0.01
+    python -m benchmarks.run compare benchmarks/baseline.json benchmarks/results/abc1234.json
+"""
+
+from http.client import HTTPConnection
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+import subprocess
+import threading
+import argparse
+import platform
+import tempfile
+import shutil
+import socket
+import json
+import time
+import sys
+import os
+import re
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BASE_DIR, 'benchmarks', 'results')
+
+# name -> (method, path); {project_id} is filled from /api/projects/
+SCENARIOS = {
+    'home': ('GET', '/'),
+    'projects': ('GET', '/projects/'),
+    'project_detail': ('GET', '/project/{project_id}/'),
+    'contact_post': ('POST', '/contact/'),
+    'api_projects': ('GET', '/api/projects/'),
+    'api_testimonials': ('GET', '/api/testimonials/'),
+    'api_project_search': ('GET', '/api/projects/search/?q=tirupati'),
+}
+
+CONTACT_FORM = {
+    'name': 'Benchmark Visitor',
+    'email': 'bench@example.com',
+    'phone': '+919999999999',
+    'inquiry_type': 'general',
+    'message': 'Load test submission',
+}
+
+CSRF_INPUT_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+class InProcessClient:
+    """One virtual user calling the WSGI handler directly"""
+
+    def __init__(self):
+        from django.test import Client
+        self.client = Client(raise_request_exception=False)
+
+    def request(self, method, path, data=None):
+        if method == 'POST':
+            return self.client.post(path, data).status_code
+        return self.client.get(path).status_code
+
+    def get_json(self, path):
+        return self.client.get(path).json()
+
+
+class HTTPClient:
+    """One virtual user with a keep-alive connection and a cookie jar"""
+
+    def __init__(self, host, port):
+        self.connection = HTTPConnection(host, port, timeout=30)
+        self.cookies = SimpleCookie()
+
+    def _send(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f"{k}={v.value}" for k, v in self.cookies.items())
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+        except (ConnectionError, OSError):
+            # The server closed the connection; retry once on a new one
+            self.connection.close()
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+        content = response.read()
+        for cookie in response.headers.get_all('Set-Cookie') or []:
+            self.cookies.load(cookie)
+        if response.getheader('Connection', '').lower() == 'close':
+            self.connection.close()
+        return response.status, content
+
+    def request(self, method, path, data=None):
+        if method != 'POST':
+            return self._send(method, path)[0]
+
+        status, content = self._send('GET', path)
+        match = CSRF_INPUT_RE.search(content.decode('utf-8', 'replace'))
+        token = match.group(1) if match else ''
+        body = urlencode(dict(data, csrfmiddlewaretoken=token))
+        return self._send('POST', path, body, {
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'X-CSRFToken': token,
+        })[0]
+
+    def get_json(self, path):
+        return json.loads(self._send('GET', path)[1])
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def drive(make_client, method, path, data, concurrency, duration):
+    """
+    Run one scenario at a fixed concurrency
+
+    Args:
+        make_client (callable): Creates one virtual user's client
+        method (str): HTTP method
+        path (str): Request path
+        data (dict): Form data for POSTs
+        concurrency (int): Number of concurrent virtual users
+        duration (float): Seconds to run
+
+    Returns:
+        dict: Request count, errors, req/s and latency percentiles in ms
+    """
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def user():
+        client = make_client()
+        local_latencies, local_errors = [], 0
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                status = client.request(method, path, data)
+            except Exception:
+                status = 599
+            local_latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=user) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    latencies.sort()
+    to_ms = lambda value: None if value is None else round(value * 1000, 2)
+    return {
+        'requests': len(latencies),
+        'errors': sum(errors),
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0,
+        'mean_ms': to_ms(sum(latencies) / len(latencies)) if latencies else None,
+        'p50_ms': to_ms(percentile(latencies, 0.50)),
+        'p95_ms': to_ms(percentile(latencies, 0.95)),
+        'p99_ms': to_ms(percentile(latencies, 0.99)),
+        'max_ms': to_ms(latencies[-1]) if latencies else None,
+    }
+
+
+def _memory_mb(pid):
+    """Current and peak resident memory of a process from /proc, in MB"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            status = dict(line.split(':', 1) for line in f if ':' in line)
+    except OSError:
+        return None
+    to_mb = lambda key: round(int(status[key].split()[0]) / 1024, 1) if key in status else None
+    return {'pid': pid, 'rss_mb': to_mb('VmRSS'), 'peak_rss_mb': to_mb('VmHWM')}
+
+
+def _child_pids(parent_pid):
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # Field 4 is the parent pid; the name in field 2 may hold spaces
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == parent_pid:
+            children.append(int(entry))
+    return sorted(children)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def prepare_environment(args, bench_dir):
+    """Copy the database and set the environment for benchmarks.settings"""
+    shutil.copy(os.path.join(BASE_DIR, 'db.sqlite3'), os.path.join(bench_dir, 'db.sqlite3'))
+    env = {
+        'DJANGO_SETTINGS_MODULE': 'benchmarks.settings',
+        'BENCH_DIR': bench_dir,
+        'BENCH_FIRESTORE': args.firestore,
+        'PAGE_CACHE_ENABLED': 'False' if args.no_page_cache else 'True',
+        'METRICS_ENABLED': 'True',
+        'NO_GCE_CHECK': 'True',
+    }
+    if args.firestore == 'none':
+        # Make default-credential lookup fail fast instead of finding real credentials
+        env['GOOGLE_APPLICATION_CREDENTIALS'] = os.path.join(bench_dir, 'no-credentials.json')
+    elif args.firestore == 'emulator':
+        env['FIRESTORE_EMULATOR_HOST'] = args.emulator_host
+        env.setdefault('GOOGLE_CLOUD_PROJECT', os.environ.get('GOOGLE_CLOUD_PROJECT', 'demo-srihari'))
+    elif args.firestore == 'memory':
+        env.update({
+            'FIREBASE_MEMORY_LATENCY': str(args.latency),
+            'FIREBASE_MEMORY_JITTER': str(args.jitter),
+            'FIREBASE_MEMORY_FAILURE_RATE': str(args.failure_rate),
+            'FIREBASE_MEMORY_SEED': str(args.seed),
+        })
+        subprocess.run(
+            [sys.executable, 'manage.py', 'export_firestore_fixture',
+             '--output', os.path.join(bench_dir, 'fixture.json'), '--scale', str(args.scale)],
+            cwd=BASE_DIR, env=dict(os.environ, **env), check=True, stdout=subprocess.DEVNULL,
+        )
+    # The copied database may predate the latest indexes and search tables
+    subprocess.run(
+        [sys.executable, 'manage.py', 'migrate', '--no-input'],
+        cwd=BASE_DIR, env=dict(os.environ, **env), check=True, stdout=subprocess.DEVNULL,
+    )
+    os.environ.update(env)
+    return env
+
+
+def start_gunicorn(args, env):
+    """Boot gunicorn on a free port and wait until it answers"""
+    port = _free_port()
+    app = 'sriharidevelopers.wsgi:application'
+    if args.worker_class and 'uvicorn' in args.worker_class.lower():
+        app = 'sriharidevelopers.asgi:application'
+    command = [
+        sys.executable, '-m', 'gunicorn', app,
+        '--workers', str(args.workers),
+        '--bind', f"127.0.0.1:{port}",
+        '--log-level', 'warning',
+    ]
+    if args.worker_class:
+        command += ['--worker-class', args.worker_class]
+    if args.threads:
+        command += ['--threads', str(args.threads)]
+
+    process = subprocess.Popen(command, cwd=BASE_DIR, env=dict(os.environ, **env))
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"gunicorn exited with status {process.returncode}")
+        try:
+            connection = HTTPConnection('127.0.0.1', port, timeout=5)
+            connection.request('GET', '/about/')
+            connection.getresponse().read()
+            return process, port
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit("gunicorn did not start within 60 seconds")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run(args):
+    scenarios = args.scenarios.split(',') if args.scenarios else list(SCENARIOS)
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    bench_dir = tempfile.mkdtemp(prefix='srihari-bench-')
+    env = prepare_environment(args, bench_dir)
+    process = None
+    try:
+        if args.server == 'gunicorn':
+            process, port = start_gunicorn(args, env)
+            make_client = lambda: HTTPClient('127.0.0.1', port)
+        else:
+            import django
+            django.setup()
+            make_client = InProcessClient
+
+        projects = make_client().get_json('/api/projects/?limit=1&fields=name').get('projects') or []
+        project_id = projects[0]['id'] if projects else 1
+
+        results = {}
+        for name in scenarios:
+            method, path = SCENARIOS[name]
+            path = path.format(project_id=project_id)
+            data = CONTACT_FORM if method == 'POST' else None
+            if args.warmup:
+                drive(make_client, method, path, data, args.concurrency, args.warmup)
+            results[name] = drive(make_client, method, path, data, args.concurrency, args.duration)
+            print(_format_result(name, results[name]))
+
+        if process is not None:
+            workers = [_memory_mb(pid) for pid in _child_pids(process.pid)]
+        else:
+            workers = [_memory_mb(os.getpid())]
+        workers = [worker for worker in workers if worker]
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        shutil.rmtree(bench_dir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'commit': _git_commit(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'server': args.server,
+            'workers': args.workers if args.server == 'gunicorn' else 1,
+            'worker_class': args.worker_class or 'sync',
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'firestore': args.firestore,
+            'firestore_latency': args.latency if args.firestore == 'memory' else None,
+            'firestore_jitter': args.jitter if args.firestore == 'memory' else None,
+            'firestore_failure_rate': args.failure_rate if args.firestore == 'memory' else None,
+            'page_cache': not args.no_page_cache,
+            'python': platform.python_version(),
+            'cpus': os.cpu_count(),
+        },
+        'scenarios': results,
+        'memory': {
+            'workers': workers,
+            'max_rss_mb': max((worker['rss_mb'] or 0 for worker in workers), default=None),
+        },
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    memory = ', '.join(f"{worker['rss_mb']} MB" for worker in workers)
+    print(f"Worker memory: {memory or 'unavailable'}")
+    print(f"Results written to {output}")
+
+
+def _format_result(name, result):
+    return (
+        f"{name:18} {result['rps']:8.1f} req/s  p50 {result['p50_ms']} ms  "
+        f"p95 {result['p95_ms']} ms  p99 {result['p99_ms']} ms  "
+        f"{result['errors']}/{result['requests']} errors"
+    )
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    for key in ('server', 'workers', 'concurrency', 'firestore', 'firestore_latency', 'page_cache'):
+        if baseline['meta'].get(key) != current['meta'].get(key):
+            print(f"Warning: {key} differs ({baseline['meta'].get(key)} vs {current['meta'].get(key)})")
+
+    tolerance = args.tolerance
+    regressions = []
+    print(f"{'scenario':18} {'metric':8} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, base in baseline['scenarios'].items():
+        result = current['scenarios'].get(name)
+        if result is None:
+            continue
+        for metric, higher_is_worse in (('rps', False), ('p50_ms', True), ('p95_ms', True), ('p99_ms', True)):
+            before, after = base.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = change > tolerance if higher_is_worse else change < -tolerance
+            # Ignore sub-millisecond jitter on very fast endpoints
+            if worse and higher_is_worse and after - before < args.min_ms:
+                worse = False
+            flag = '  REGRESSION' if worse else ''
+            print(f"{name:18} {metric:8} {before:>10} {after:>10} {change:>+8.1%}{flag}")
+            if worse:
+                regressions.append(f"{name} {metric}")
+
+        base_rate = base['errors'] / base['requests'] if base['requests'] else 0
+        rate = result['errors'] / result['requests'] if result['requests'] else 0
+        if rate > base_rate + 0.01:
+            print(f"{name:18} errors   {base_rate:>10.1%} {rate:>10.1%}  REGRESSION")
+            regressions.append(f"{name} errors")
+
+    before, after = baseline['memory'].get('max_rss_mb'), current['memory'].get('max_rss_mb')
+    if before and after:
+        change = (after - before) / before
+        flag = '  REGRESSION' if change > tolerance else ''
+        print(f"{'memory':18} {'rss_mb':8} {before:>10} {after:>10} {change:>+8.1%}{flag}")
+        if flag:
+            regressions.append('memory')
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    print(f"\nNo regressions over {tolerance:.0%}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Run the load test and write a JSON report')
+    run_parser.add_argument('--server', choices=['inprocess', 'gunicorn'], default='inprocess')
+    run_parser.add_argument('--workers', type=int, default=2, help='gunicorn workers')
+    run_parser.add_argument('--worker-class', default=None, help='gunicorn worker class, e.g. uvicorn.workers.UvicornWorker')
+    run_parser.add_argument('--threads', type=int, default=None, help='gunicorn threads per worker')
+    run_parser.add_argument('--concurrency', type=int, default=8, help='Concurrent virtual users')
+    run_parser.add_argument('--duration', type=float, default=10, help='Seconds per scenario')
+    run_parser.add_argument('--warmup', type=float, default=2, help='Unmeasured seconds per scenario')
+    run_parser.add_argument('--scenarios', default=None, help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    run_parser.add_argument('--firestore', choices=['none', 'emulator', 'memory'], default='none')
+    run_parser.add_argument('--emulator-host', default='localhost:8080')
+    run_parser.add_argument('--latency', type=float, default=0.03, help='memory: seconds per Firestore call')
+    run_parser.add_argument('--jitter', type=float, default=0.01, help='memory: extra random seconds per call')
+    run_parser.add_argument('--failure-rate', type=float, default=0.0, help='memory: probability a call fails')
+    run_parser.add_argument('--seed', type=int, default=1, help='memory: random seed for jitter and failures')
+    run_parser.add_argument('--scale', type=int, default=1, help='memory: copies of each project/testimonial')
+    run_parser.add_argument('--no-page-cache', action='store_true', help='Measure views without the page cache')
+    run_parser.add_argument('--output', default=None, help='Report path (default: benchmarks/results/<commit>.json)')
+
+    compare_parser = commands.add_parser('compare', help='Flag regressions between two reports')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--tolerance', type=float, default=0.10, help='Allowed relative change (default 0.10)')
+    compare_parser.add_argument('--min-ms', type=float, default=1.0, help='Ignore latency increases below this many ms')
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        run(args)
+        return 0
+    return compare(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+Django settings for benchmark runs
+
+Everything the site writes (database, submission spool, shared cache) goes
+to a throwaway copy in BENCH_DIR, so contact POSTs never touch db.sqlite3.
+The Firestore source is chosen with BENCH_FIRESTORE:
+
+    none      Firebase is unavailable; every read uses the Django models
+    emulator  Firestore emulator at FIRESTORE_EMULATOR_HOST
+    memory    In-memory stand-in loaded from BENCH_DIR/fixture.json, with
+              latency and failures from the FIREBASE_MEMORY_* variables
+"""
+
+from sriharidevelopers.settings import *  # noqa: F401,F403
+from sriharidevelopers.settings import (
+    CACHES, FIREBASE_CIRCUIT, FIREBASE_MEMORY, FIREBASE_SPOOL, LOGGING, METRICS, QUERY_BUDGET,
+)
+import os
+
+BENCH_DIR = os.environ['BENCH_DIR']
+BENCH_FIRESTORE = os.environ.get('BENCH_FIRESTORE', 'none')
+
+DEBUG = False
+ALLOWED_HOSTS = ['*']
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BENCH_DIR, 'db.sqlite3'),
+    }
+}
+
+CACHES = dict(CACHES)
+CACHES['default'] = {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': os.path.join(BENCH_DIR, 'cache'),
+}
+
+FIREBASE_SPOOL = dict(FIREBASE_SPOOL, PATH=os.path.join(BENCH_DIR, 'spool.sqlite3'))
+METRICS = dict(METRICS, DIRECTORY=None)
+QUERY_BUDGET = dict(QUERY_BUDGET, ENABLED=False)
+
+if BENCH_FIRESTORE == 'memory':
+    FIREBASE_BACKEND = 'memory'
+    FIREBASE_MEMORY = dict(FIREBASE_MEMORY, FIXTURE=os.path.join(BENCH_DIR, 'fixture.json'))
+
+if BENCH_FIRESTORE == 'none':
+    # Fail initialization once and keep the circuit open for the whole run
+    FIREBASE_SERVICE_ACCOUNT_KEY = os.path.join(BENCH_DIR, 'no-service-account.json')
+    FIREBASE_CIRCUIT = dict(FIREBASE_CIRCUIT, RESET_TIMEOUT=86400, MAX_RESET_TIMEOUT=86400)
+
+# Per-request INFO lines would dominate the timings of cached pages
+LOGGING = dict(LOGGING, root={'handlers': ['console'], 'level': 'WARNING'})
+LOGGING['loggers'] = {
+    name: dict(config, level='WARNING') for name, config in LOGGING['loggers'].items()
+}
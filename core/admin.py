@@ -2,8 +2,41 @@
 Admin configuration for Srihari Developers core app
 """
 
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponseBadRequest
+from django.shortcuts import redirect
+from django.urls import path, reverse
 from .models import Project, ProjectCategory, ContactInquiry, Testimonial, CompanyInfo
+from .changelist import FastChangeListMixin
+from .export import FORMATS, export_response, firestore_records, orm_records
+from .search import filter_queryset
+
+try:
+    from firebase_config.utils import contact_service
+except ImportError:
+    contact_service = None
+
+
+class FullTextSearchMixin:
+    """Answer the changelist search box from the model's FTS5 index (see core/search.py)"""
+    
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return filter_queryset(queryset, search_term), False
+
+
+def export_action(export_format, compress=False):
+    """Build an admin action that streams the selected inquiries as a download"""
+    label = export_format.upper() + (' (gzip)' if compress else '')
+    
+    @admin.action(description=f"Export selected inquiries as {label}")
+    def action(modeladmin, request, queryset):
+        return export_response(orm_records(queryset), 'contact-inquiries', export_format, compress)
+    
+    action.__name__ = f"export_{export_format}" + ('_gzip' if compress else '')
+    return action
 
 
 @admin.register(CompanyInfo)
@@ -34,7 +67,7 @@ class ProjectCategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['name', 'location', 'status', 'category', 'featured', 'completion_date', 'created_at']
     list_filter = ['status', 'category', 'featured', 'created_at']
     search_fields = ['name', 'location', 'description']
@@ -56,13 +89,19 @@ class ProjectAdmin(admin.ModelAdmin):
 
 
 @admin.register(ContactInquiry)
-class ContactInquiryAdmin(admin.ModelAdmin):
+class ContactInquiryAdmin(FullTextSearchMixin, FastChangeListMixin, admin.ModelAdmin):
     list_display = ['name', 'email', 'phone', 'inquiry_type', 'created_at', 'responded']
     list_filter = ['inquiry_type', 'responded', 'created_at']
     search_fields = ['name', 'email', 'phone', 'message']
     list_editable = ['responded']
     readonly_fields = ['created_at']
     date_hierarchy = 'created_at'
+    actions = [
+        export_action('csv'),
+        export_action('csv', compress=True),
+        export_action('ndjson'),
+        export_action('ndjson', compress=True),
+    ]
     
     fieldsets = (
         ('Contact Information', {
@@ -75,6 +114,32 @@ class ContactInquiryAdmin(admin.ModelAdmin):
             'fields': ('responded', 'created_at')
         }),
     )
+    
+    def get_urls(self):
+        info = self.opts.app_label, self.opts.model_name
+        return [
+            path(
+                'export-firestore/',
+                self.admin_site.admin_view(self.export_firestore_view),
+                name='%s_%s_export_firestore' % info,
+            ),
+        ] + super().get_urls()
+    
+    def export_firestore_view(self, request):
+        """Stream every contact document in Firestore as CSV or NDJSON (?format=, ?gzip=1)"""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        
+        export_format = request.GET.get('format', 'csv')
+        if export_format not in FORMATS:
+            return HttpResponseBadRequest(f"Unknown export format: {export_format}")
+        
+        if contact_service is None or not contact_service.is_available():
+            messages.error(request, "Firestore is not available, so there is nothing to export.")
+            return redirect(reverse('admin:core_contactinquiry_changelist'))
+        
+        compress = request.GET.get('gzip') == '1'
+        return export_response(firestore_records(contact_service), 'firestore-contacts', export_format, compress)
 
 
 @admin.register(Testimonial)
@@ -8,4 +8,33 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
-    verbose_name = 'Srihari Developers Core'
\ No newline at end of file
+    verbose_name = 'Srihari Developers Core'
+
+    def ready(self):
+        # Register signal handlers
+        from . import signals  # noqa: F401
+
+        # Per-request query counting for QueryBudgetMiddleware
+        from .querybudget import install
+        install()
+
+        # Firestore latency and error metrics
+        from firebase_config.tracking import add_rpc_listener
+        from .metrics import get_metrics_settings, observe_firestore_rpc
+        if get_metrics_settings()['ENABLED']:
+            add_rpc_listener(observe_firestore_rpc)
+
+        # Firestore collection changes expire the same content versions
+        from firebase_config.cache import get_query_cache
+        from .caching import bump_version
+        get_query_cache().add_invalidation_listener(bump_version)
+
+        # ...and make the repository re-check which source is authoritative
+        from .repository import forget_source
+        get_query_cache().add_invalidation_listener(forget_source)
+
+        # Opt-in: start the Firebase handshake before the first request
+        from django.conf import settings
+        if getattr(settings, 'FIREBASE_WARMUP', False):
+            from firebase_config.firebase_admin_setup import warmup_firebase
+            warmup_firebase()
@@ -0,0 +1,820 @@
+"""
+Build-time CSS bundle for Srihari Developers website
+
+``manage.py build_assets`` scans the templates, scripts and forms for the
+classes and ``data-aos`` animations they use. From that scan it writes:
+
+- ``core/static/build/site.css``: one minified stylesheet with the Tailwind
+  preflight, the utilities that are used (core/tailwind.py), the Font
+  Awesome icons that are used, the scroll-reveal animations that are used,
+  and core/static/css/style.css.
+- ``core/static/build/fonts/``: the icon fonts cut down to the icons used,
+  and the Poppins and Playfair Display weights that are used, served from
+  this site.
+- ``core/templates/build/assets.html``: the critical CSS for the navigation
+  and the first section of every page, inlined in a ``<style>`` block, plus
+  a non-blocking ``<link>`` to the full bundle. base.html includes it.
+
+Nothing is downloaded. Font Awesome comes from the ``fontawesomefree``
+package and the text fonts from core/asset_sources/fonts/ (see the README
+there). Any source that is missing falls back to its old CDN stylesheet,
+loaded without blocking rendering, so the page never loses its icons or
+fonts. fontTools is optional: without it the fonts are copied whole instead
+of being cut down.
+"""
+
+from django.conf import settings
+import glob
+import hashlib
+import logging
+import os
+import re
+import shutil
+
+from .tailwind import FONT_WEIGHTS, generate_utilities, unsupported_utilities
+
+try:
+    import fontawesomefree
+except ImportError:
+    fontawesomefree = None
+
+try:
+    from fontTools import subset as font_subset
+except ImportError:
+    font_subset = None
+
+DEFAULT_ASSET_SETTINGS = {
+    # Files scanned for class names, relative to BASE_DIR
+    'CONTENT': [
+        'core/templates/*.html',
+        'core/templates/partials/*.html',
+        'core/static/js/*.js',
+        'core/forms.py',
+        'core/cards.py',
+    ],
+    # Hand-written CSS appended to the bundle as-is (minified, not purged)
+    'STYLESHEETS': ['core/static/css/style.css'],
+    # Its markup before {% block content %}, plus each page's first
+    # <section>, is what the critical CSS covers
+    'BASE_TEMPLATE': 'core/templates/base.html',
+    'SOURCE_DIR': 'core/asset_sources',
+    'OUTPUT_DIR': 'core/static/build',
+    'TEMPLATE': 'core/templates/build/assets.html',
+}
+
+# Google Fonts' "latin" range plus the rupee sign
+TEXT_FONT_UNICODES = (
+    'U+0000-00FF, U+0131, U+0152-0153, U+02BB-02BC, U+02C6, U+02DA, U+02DC, U+0304, U+0308, '
+    'U+0329, U+2000-206F, U+2074, U+20AC, U+20B9, U+2122, U+2191, U+2193, U+2212, U+2215, U+FEFF, U+FFFD'
+)
+
+# Font family utility -> (CSS family name, source file prefix, Google Fonts name)
+TEXT_FONTS = {
+    'playfair': ('Playfair Display', 'playfair-display', 'Playfair+Display'),
+    'poppins': ('Poppins', 'poppins', 'Poppins'),
+}
+
+# Font Awesome webfont -> classes that select it
+FONT_AWESOME_STYLES = {
+    'fa-solid-900': ('fas', 'fa-solid', 'fa'),
+    'fa-regular-400': ('far', 'fa-regular'),
+    'fa-brands-400': ('fab', 'fa-brands'),
+}
+FONT_AWESOME_CDN = 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css'
+GOOGLE_FONTS_CSS = 'https://fonts.googleapis.com/css2'
+
+# data-aos value -> hidden-state transform (the AOS library's defaults)
+AOS_ANIMATIONS = {
+    'fade': None,
+    'fade-up': 'translate3d(0, 100px, 0)',
+    'fade-down': 'translate3d(0, -100px, 0)',
+    'fade-right': 'translate3d(-100px, 0, 0)',
+    'fade-left': 'translate3d(100px, 0, 0)',
+    'fade-up-right': 'translate3d(-100px, 100px, 0)',
+    'fade-up-left': 'translate3d(100px, 100px, 0)',
+    'fade-down-right': 'translate3d(-100px, -100px, 0)',
+    'fade-down-left': 'translate3d(100px, -100px, 0)',
+    'zoom-in': 'scale(0.6)',
+    'zoom-in-up': 'translate3d(0, 100px, 0) scale(0.6)',
+    'zoom-in-down': 'translate3d(0, -100px, 0) scale(0.6)',
+    'zoom-out': 'scale(1.2)',
+}
+
+TOKEN_RE = re.compile(r'[\w:./-]+')
+CLASS_ATTRIBUTE_RE = re.compile(r'class="([^"]*)"')
+DATA_ATTRIBUTE_RE = re.compile(r'\b(data-[\w-]+)="([^"{}]*)"')
+SELECTOR_CLASS_RE = re.compile(r'\.((?:\\.|[\w-])+)')
+SELECTOR_ATTRIBUTE_RE = re.compile(r'\[(data-[\w-]+)(?:([\^*$~|]?=)["\']?([^"\'\]]*)["\']?)?\]')
+FUNCTIONAL_PSEUDO_RE = re.compile(r':(?:not|where|is)\([^)]*\)')
+URL_RE = re.compile(r'url\(["\']?([^"\')]+)["\']?\)')
+INCLUDE_RE = re.compile(r'{%\s*include\s+["\']([^"\']+)["\']\s*%}')
+CONTENT_BLOCK_RE = re.compile(r'{%\s*block\s+content\s*%}')
+TEMPLATE_TAG_RE = re.compile(r'{[{%].*?[%}]}')
+
+BLOCK_AT_RULES = ('media', 'supports', 'keyframes', '-webkit-keyframes', 'layer', 'container')
+
+# Stands in for a build/fonts/ URL until the critical CSS becomes a template
+FONT_URL_PLACEHOLDER = '\x00font:{name}\x00'
+
+
+def get_asset_settings():
+    """
+    Get asset build settings with defaults
+
+    Returns:
+        dict: Settings from ``settings.ASSETS`` merged over the defaults
+    """
+    options = DEFAULT_ASSET_SETTINGS.copy()
+    options.update(getattr(settings, 'ASSETS', {}))
+    return options
+
+
+def _path(relative):
+    return os.path.join(settings.BASE_DIR, relative)
+
+
+def _read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+# CSS parsing and serialisation
+
+class Rule:
+    """A style rule: ``selector { declarations }``"""
+
+    def __init__(self, selector, declarations):
+        self.selector = selector
+        self.declarations = declarations
+
+
+class AtRule:
+    """An at-rule, with either nested rules or declarations (``@font-face``)"""
+
+    def __init__(self, name, prelude, rules=None, declarations=None):
+        self.name = name
+        self.prelude = prelude
+        self.rules = rules
+        self.declarations = declarations
+
+
+def _skip_string(text, i):
+    quote = text[i]
+    i += 1
+    while i < len(text) and text[i] != quote:
+        i += 2 if text[i] == '\\' else 1
+    return i + 1
+
+
+def _strip_comments(text):
+    """Remove comments, keeping ``/*! ... */`` license comments separately"""
+    output = []
+    licenses = []
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char in '"\'':
+            end = _skip_string(text, i)
+            output.append(text[i:end])
+            i = end
+        elif text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            end = len(text) if end == -1 else end + 2
+            if text.startswith('/*!', i):
+                licenses.append(text[i:end])
+            i = end
+        else:
+            output.append(char)
+            i += 1
+    return ''.join(output), licenses
+
+
+def _split_top_level(text, separator):
+    """Split on ``separator`` outside strings and brackets"""
+    parts = []
+    depth = 0
+    start = 0
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char in '"\'':
+            i = _skip_string(text, i)
+            continue
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+        i += 1
+    parts.append(text[start:])
+    return parts
+
+
+def _find_block_end(text, start):
+    """Index of the ``}`` closing the block whose ``{`` is at ``start``"""
+    depth = 0
+    i = start
+    while i < len(text):
+        char = text[i]
+        if char in '"\'':
+            i = _skip_string(text, i)
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    raise ValueError('Unbalanced braces in stylesheet')
+
+
+def _parse_declarations(text):
+    declarations = []
+    for part in _split_top_level(text, ';'):
+        # style.css has never been run through Tailwind, so browsers have
+        # always ignored its @apply lines; keep it that way
+        if ':' not in part or part.strip().startswith('@'):
+            continue
+        prop, value = part.split(':', 1)
+        declarations.append((prop.strip(), ' '.join(value.split())))
+    return declarations
+
+
+def _parse_rules(text):
+    nodes = []
+    i = 0
+    while i < len(text):
+        if text[i].isspace() or text[i] == ';':
+            i += 1
+            continue
+        # Prelude runs to the first '{' or ';' outside strings and brackets
+        j = i
+        depth = 0
+        while j < len(text):
+            char = text[j]
+            if char in '"\'':
+                j = _skip_string(text, j)
+                continue
+            if char in '([':
+                depth += 1
+            elif char in ')]':
+                depth -= 1
+            elif char in '{;' and depth == 0:
+                break
+            j += 1
+        prelude = ' '.join(text[i:j].split())
+        if j >= len(text) or text[j] == ';':
+            if prelude.startswith('@'):
+                name, _, rest = prelude[1:].partition(' ')
+                nodes.append(AtRule(name, rest))
+            i = j + 1
+            continue
+
+        end = _find_block_end(text, j)
+        body = text[j + 1:end]
+        if prelude.startswith('@'):
+            name, _, rest = prelude[1:].partition(' ')
+            if name in BLOCK_AT_RULES:
+                nodes.append(AtRule(name, rest, rules=_parse_rules(body)))
+            else:
+                nodes.append(AtRule(name, rest, declarations=_parse_declarations(body)))
+        else:
+            nodes.append(Rule(prelude, _parse_declarations(body)))
+        i = end + 1
+    return nodes
+
+
+def parse_css(text):
+    """
+    Parse a stylesheet
+
+    Args:
+        text (str): CSS source
+
+    Returns:
+        tuple: (list of Rule and AtRule, list of ``/*!`` license comments)
+    """
+    text, licenses = _strip_comments(text)
+    return _parse_rules(text), licenses
+
+
+def _minify_selector(selector):
+    selector = ' '.join(selector.split())
+    return re.sub(r'\s*([,>~+])\s*', r'\1', selector)
+
+
+def _serialize_declarations(declarations):
+    parts = []
+    for prop, value in declarations:
+        # An empty custom property still needs its space to be valid
+        if prop.startswith('--') and not value:
+            value = ' '
+        parts.append(f"{prop}:{value}")
+    return ';'.join(parts)
+
+
+def serialize_css(nodes, licenses=()):
+    """
+    Write parsed rules back out as minified CSS
+
+    Args:
+        nodes (list): Rule and AtRule objects
+        licenses (iterable): Comments to keep at the top
+
+    Returns:
+        str: Minified CSS
+    """
+    parts = list(licenses)
+    for node in nodes:
+        if isinstance(node, Rule):
+            if node.declarations:
+                parts.append(f"{_minify_selector(node.selector)}{{{_serialize_declarations(node.declarations)}}}")
+        elif node.rules is not None:
+            prelude = f" {node.prelude}" if node.prelude else ''
+            prelude = re.sub(r':\s+', ':', prelude)
+            parts.append(f"@{node.name}{prelude}{{{serialize_css(node.rules)}}}")
+        elif node.declarations is not None:
+            prelude = f" {node.prelude}" if node.prelude else ''
+            parts.append(f"@{node.name}{prelude}{{{_serialize_declarations(node.declarations)}}}")
+        else:
+            parts.append(f"@{node.name} {node.prelude};")
+    return ''.join(parts)
+
+
+def utility_nodes(entries):
+    """Turn ``generate_utilities()`` entries into parsed rules, grouping media queries"""
+    nodes = []
+    for media, selector, declarations in entries:
+        rule = Rule(selector, declarations)
+        if media is None:
+            nodes.append(rule)
+        elif nodes and isinstance(nodes[-1], AtRule) and nodes[-1].prelude == media:
+            nodes[-1].rules.append(rule)
+        else:
+            nodes.append(AtRule('media', media, rules=[rule]))
+    return nodes
+
+
+# Purging
+
+def _unescape(name):
+    return re.sub(r'\\(.)', r'\1', name)
+
+
+def _selector_used(selector, classes, attributes):
+    bare = FUNCTIONAL_PSEUDO_RE.sub('', selector)
+    for name in SELECTOR_CLASS_RE.findall(bare):
+        if _unescape(name) not in classes:
+            return False
+    for attribute, operator, value in SELECTOR_ATTRIBUTE_RE.findall(bare):
+        values = attributes.get(attribute)
+        if values is None:
+            return False
+        if operator == '=' and value not in values:
+            return False
+        if operator == '^=' and not any(v.startswith(value) for v in values):
+            return False
+    return True
+
+
+def _declaration_text(nodes):
+    text = []
+    for node in nodes:
+        if isinstance(node, Rule):
+            text.extend(value for _, value in node.declarations)
+        elif node.rules is not None and node.name not in ('keyframes', '-webkit-keyframes'):
+            text.append(_declaration_text(node.rules))
+    return ' '.join(text)
+
+
+def _purge_rules(nodes, classes, attributes):
+    kept = []
+    for node in nodes:
+        if isinstance(node, Rule):
+            selectors = [s.strip() for s in _split_top_level(node.selector, ',')]
+            used = [s for s in selectors if _selector_used(s, classes, attributes)]
+            if used:
+                kept.append(Rule(', '.join(used), node.declarations))
+        elif node.rules is not None and node.name not in ('keyframes', '-webkit-keyframes'):
+            rules = _purge_rules(node.rules, classes, attributes)
+            if rules:
+                kept.append(AtRule(node.name, node.prelude, rules=rules))
+        else:
+            kept.append(node)
+    return kept
+
+
+def purge_css(nodes, classes, attributes=None):
+    """
+    Drop the rules no scanned markup can match
+
+    A selector is kept when every class in it is in ``classes`` and every
+    ``data-*`` attribute selector matches a scanned value. Keyframes and
+    font faces are kept only while a remaining rule refers to them.
+
+    Args:
+        nodes (list): Parsed stylesheet
+        classes (set): Class names used by the site
+        attributes (dict): ``data-*`` attribute name -> set of values used
+
+    Returns:
+        list: The rules that can still apply
+    """
+    kept = _purge_rules(nodes, classes, attributes or {})
+    referenced = _declaration_text(kept)
+    result = []
+    for node in kept:
+        if isinstance(node, AtRule) and node.name in ('keyframes', '-webkit-keyframes'):
+            if not re.search(rf'(?<![\w-]){re.escape(node.prelude)}(?![\w-])', referenced):
+                continue
+        elif isinstance(node, AtRule) and node.name == 'font-face':
+            family = dict(node.declarations).get('font-family', '').strip('\'"')
+            if family not in referenced:
+                continue
+        result.append(node)
+    return result
+
+
+# Scanning
+
+class Scan:
+    """Class names and ``data-*`` attribute values found in the site's source"""
+
+    def __init__(self, tokens, attributes, class_attributes):
+        self.tokens = tokens
+        self.attributes = attributes
+        self.class_attributes = class_attributes
+
+    @classmethod
+    def from_text(cls, text):
+        attributes = {}
+        for name, value in DATA_ATTRIBUTE_RE.findall(text):
+            attributes.setdefault(name, set()).add(value)
+        class_attributes = set()
+        for value in CLASS_ATTRIBUTE_RE.findall(text):
+            value = TEMPLATE_TAG_RE.sub(' ', value)
+            class_attributes.update(token for token in value.split() if re.match(r'^-?[a-z][\w:/-]*$', token))
+        return cls(set(TOKEN_RE.findall(text)), attributes, class_attributes)
+
+
+def content_files(options):
+    """Paths matched by the CONTENT globs, excluding the generated template"""
+    generated = os.path.normpath(_path(options['TEMPLATE']))
+    paths = set()
+    for pattern in options['CONTENT']:
+        paths.update(os.path.normpath(path) for path in glob.glob(_path(pattern), recursive=True))
+    paths.discard(generated)
+    return sorted(paths)
+
+
+def _resolve_includes(text, depth=0):
+    if depth > 5:
+        return text
+
+    def include(match):
+        path = _path(os.path.join('core', 'templates', match.group(1)))
+        if not os.path.exists(path):
+            return ''
+        return _resolve_includes(_read(path), depth + 1)
+    return INCLUDE_RE.sub(include, text)
+
+
+def critical_markup(options, paths):
+    """
+    The markup a visitor sees before scrolling
+
+    That is base.html up to ``{% block content %}`` (navigation and flash
+    messages) and the first ``<section>`` of every page that extends it.
+
+    Args:
+        options (dict): Asset settings
+        paths (list): Scanned files
+
+    Returns:
+        str: Concatenated template fragments
+    """
+    base = _read(_path(options['BASE_TEMPLATE']))
+    body = base[base.find('<body'):]
+    match = CONTENT_BLOCK_RE.search(body)
+    fragments = [_resolve_includes(body[:match.start()] if match else body)]
+    for path in paths:
+        if not path.endswith('.html'):
+            continue
+        text = _read(path)
+        if '{% extends' not in text:
+            continue
+        match = CONTENT_BLOCK_RE.search(text)
+        if not match:
+            continue
+        content = text[match.end():]
+        end = content.find('</section>')
+        fragments.append(_resolve_includes(content[:end] if end != -1 else content))
+    return '\n'.join(fragments)
+
+
+# Fonts
+
+def _write_font(source, destination, unicodes=None):
+    """Write ``source`` as WOFF2, cut down to ``unicodes`` when fontTools is installed"""
+    if font_subset is None:
+        if not source.endswith('.woff2'):
+            return False
+        shutil.copyfile(source, destination)
+        return True
+    # Font Awesome's webfonts make fontTools warn about padding on every load
+    logging.getLogger('fontTools').setLevel(logging.ERROR)
+    subset_options = font_subset.Options()
+    subset_options.flavor = 'woff2'
+    subset_options.layout_features = ['*']
+    # Keep the copyright, license description and license URL the OFL asks fonts to carry
+    subset_options.name_IDs = [0, 1, 2, 3, 4, 5, 6, 13, 14]
+    font = font_subset.load_font(source, subset_options)
+    subsetter = font_subset.Subsetter(subset_options)
+    if unicodes is None:
+        subsetter.populate(unicodes=font.getBestCmap().keys())
+    else:
+        subsetter.populate(unicodes=unicodes)
+    subsetter.subset(font)
+    font_subset.save_font(font, destination, subset_options)
+    return True
+
+
+def _parse_unicode_ranges(ranges):
+    codepoints = set()
+    for part in ranges.split(','):
+        part = part.strip()[2:]
+        start, _, end = part.partition('-')
+        codepoints.update(range(int(start, 16), int(end or start, 16) + 1))
+    return codepoints
+
+
+def _font_url(name):
+    return FONT_URL_PLACEHOLDER.format(name=name)
+
+
+def text_font_faces(scan, options, fonts):
+    """
+    Font faces for the text fonts and weights the site uses
+
+    Args:
+        scan (Scan): Scanned source
+        options (dict): Asset settings
+        fonts (dict): Collects output font name -> (source path, unicodes)
+
+    Returns:
+        tuple: (list of AtRule, dict of Google Fonts family -> missing weights)
+    """
+    weights = {'400'} | {value for key, value in FONT_WEIGHTS.items() if f"font-{key}" in scan.tokens}
+    italic = 'italic' in scan.tokens
+    source_dir = _path(os.path.join(options['SOURCE_DIR'], 'fonts'))
+    faces = []
+    missing = {}
+    for utility, (family, prefix, google_name) in TEXT_FONTS.items():
+        if f"font-{utility}" not in scan.tokens:
+            continue
+        for weight in sorted(weights):
+            for style in (('normal', 'italic') if italic else ('normal',)):
+                stem = f"{prefix}-{weight}" + ('-italic' if style == 'italic' else '')
+                source = next(
+                    (path for path in (os.path.join(source_dir, f"{stem}{ext}") for ext in ('.woff2', '.ttf', '.otf'))
+                     if os.path.exists(path) and (font_subset or path.endswith('.woff2'))),
+                    None,
+                )
+                if source is None:
+                    if style == 'normal':
+                        missing.setdefault(google_name, set()).add(weight)
+                    continue
+                name = f"{stem}.woff2"
+                fonts[name] = (source, _parse_unicode_ranges(TEXT_FONT_UNICODES))
+                faces.append(AtRule('font-face', '', declarations=[
+                    ('font-family', f"'{family}'"),
+                    ('font-style', style),
+                    ('font-weight', weight),
+                    ('font-display', 'swap'),
+                    ('src', f"url({_font_url(name)}) format(\"woff2\")"),
+                    ('unicode-range', TEXT_FONT_UNICODES),
+                ]))
+    return faces, missing
+
+
+def font_awesome_rules(classes, fonts):
+    """
+    Font Awesome's stylesheet reduced to the icons in ``classes``
+
+    Args:
+        classes (set): Class names used by the site
+        fonts (dict): Collects output font name -> (source path, codepoints)
+
+    Returns:
+        tuple: (list of rules, list of license comments), or (None, []) when
+        the fontawesomefree package is not installed
+    """
+    if fontawesomefree is None:
+        return None, []
+    root = os.path.join(os.path.dirname(fontawesomefree.__file__), 'static', 'fontawesomefree')
+    nodes, licenses = parse_css(_read(os.path.join(root, 'css', 'all.css')))
+    nodes = purge_css(nodes, classes)
+
+    styles = {stem for stem, selectors in FONT_AWESOME_STYLES.items() if classes.intersection(selectors)}
+    codepoints = set()
+    for node in nodes:
+        if isinstance(node, Rule):
+            for prop, value in node.declarations:
+                if prop == 'content' and value.startswith('"\\'):
+                    codepoints.add(int(value.strip('"')[1:], 16))
+
+    rules = []
+    for node in nodes:
+        if isinstance(node, AtRule) and node.name == 'font-face':
+            declarations = dict(node.declarations)
+            sources = URL_RE.findall(declarations.get('src', ''))
+            stem = os.path.splitext(os.path.basename(sources[0]))[0] if sources else None
+            if stem not in styles:
+                continue
+            name = f"{stem}.woff2"
+            fonts[name] = (os.path.join(root, 'webfonts', name), codepoints)
+            node = AtRule('font-face', '', declarations=[
+                (prop, f"url({_font_url(name)}) format(\"woff2\")" if prop == 'src' else value)
+                for prop, value in node.declarations
+            ])
+        rules.append(node)
+    return rules, licenses
+
+
+def aos_rules(attributes):
+    """
+    Scroll-reveal styles for the ``data-aos`` animations in use
+
+    The hidden state and the ``aos-animate`` end state follow the AOS
+    library, which main.js's initializeScrollReveal() replaces.
+
+    Args:
+        attributes (dict): Scanned ``data-*`` attribute values
+
+    Returns:
+        tuple: (list of rules, set of unsupported animation names)
+    """
+    used = attributes.get('data-aos', set())
+    rules = []
+    if used:
+        rules.append(Rule('[data-aos]', [('transition-timing-function', 'ease')]))
+    for name in sorted(used & set(AOS_ANIMATIONS)):
+        transform = AOS_ANIMATIONS[name]
+        hidden = [('opacity', '0'), ('transition-property', 'opacity, transform')]
+        if transform:
+            hidden.append(('transform', transform))
+        shown = [('opacity', '1'), ('transform', 'translate3d(0, 0, 0)' + (' scale(1)' if 'scale' in (transform or '') else ''))]
+        rules.append(Rule(f'[data-aos="{name}"]', hidden))
+        rules.append(Rule(f'[data-aos="{name}"].aos-animate', shown))
+    return rules, used - set(AOS_ANIMATIONS)
+
+
+def _selector_classes(nodes):
+    classes = set()
+    for node in nodes:
+        if isinstance(node, Rule):
+            classes.update(_unescape(name) for name in SELECTOR_CLASS_RE.findall(node.selector))
+        elif node.rules is not None:
+            classes |= _selector_classes(node.rules)
+    return classes
+
+
+# Output
+
+def _fallback_links(missing_fonts, font_awesome_missing):
+    """Non-blocking CDN stylesheets for sources that are not available locally"""
+    links = []
+    if missing_fonts:
+        families = '&amp;'.join(
+            f"family={family}:wght@{';'.join(sorted(weights))}" for family, weights in sorted(missing_fonts.items())
+        )
+        links.append('<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>')
+        links.append(f'<link rel="stylesheet" href="{GOOGLE_FONTS_CSS}?{families}&amp;display=swap" media="print" onload="this.media=\'all\'">')
+    if font_awesome_missing:
+        links.append(f'<link rel="stylesheet" href="{FONT_AWESOME_CDN}" media="print" onload="this.media=\'all\'">')
+    return links
+
+
+def _critical_template(css, static_prefix, links):
+    """Wrap the critical CSS in a template that resolves font URLs with {% static %}"""
+    pieces = re.split(r'\x00font:([^\x00]+)\x00', css)
+    style = []
+    for i, piece in enumerate(pieces):
+        if i % 2:
+            style.append(f"{{% endverbatim %}}{{% static '{static_prefix}/fonts/{piece}' %}}{{% verbatim %}}")
+        else:
+            style.append(piece)
+    bundle = f"{{% static '{static_prefix}/site.css' %}}"
+    lines = [
+        '{# Generated by manage.py build_assets from the templates and core/asset_sources; do not edit #}',
+        '{% load static %}',
+        f"<style>{{% verbatim %}}{''.join(style)}{{% endverbatim %}}</style>",
+        f'<link rel="preload" href="{bundle}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">',
+        f'<noscript><link rel="stylesheet" href="{bundle}"></noscript>',
+    ]
+    return '\n'.join(lines + links) + '\n'
+
+
+def build_assets(options=None):
+    """
+    Build the CSS bundle, fonts and critical CSS template in memory
+
+    Args:
+        options (dict): Asset settings (default: get_asset_settings())
+
+    Returns:
+        dict: 'files' (output path relative to BASE_DIR -> bytes),
+        'fonts' (font file name -> (source, codepoints)), 'unstyled'
+        (classes in class attributes that no rule matches), 'unsupported'
+        (Tailwind classes core/tailwind.py cannot generate), 'fallbacks'
+        (CDN links still needed), 'missing_fonts' (text font files to add
+        to ``SOURCE_DIR/fonts`` so they are not) and 'unknown_animations'
+    """
+    options = options or get_asset_settings()
+    paths = content_files(options)
+    scan = Scan.from_text('\n'.join(_read(path) for path in paths))
+    critical = Scan.from_text(critical_markup(options, paths))
+    # Scroll-reveal attributes decide visibility, so they are critical everywhere
+    critical.attributes['data-aos'] = scan.attributes.get('data-aos', set())
+
+    preflight_nodes, _ = parse_css(_read(_path(os.path.join(options['SOURCE_DIR'], 'preflight.css'))))
+    stylesheets = [parse_css(_read(_path(path))) for path in options['STYLESHEETS']]
+
+    fonts = {}
+    text_faces, missing_fonts = text_font_faces(scan, options, fonts)
+    icon_nodes, icon_licenses = font_awesome_rules(scan.tokens, fonts)
+    critical_icon_nodes = purge_css(icon_nodes, critical.tokens) if icon_nodes is not None else []
+    animation_nodes, unknown_animations = aos_rules(scan.attributes)
+    utility_entries, utility_classes = generate_utilities(scan.tokens)
+    critical_entries, _ = generate_utilities(critical.tokens)
+
+    bundle_nodes = preflight_nodes + text_faces + utility_nodes(utility_entries) + (icon_nodes or []) + animation_nodes
+    bundle = (
+        serialize_css(preflight_nodes + text_faces + utility_nodes(utility_entries))
+        + serialize_css(icon_nodes or [], icon_licenses)
+        + serialize_css(animation_nodes)
+    )
+    for nodes, _ in stylesheets:
+        bundle += serialize_css(nodes)
+
+    critical_nodes = (
+        preflight_nodes + text_faces + utility_nodes(critical_entries) + critical_icon_nodes + animation_nodes
+    )
+    critical_css = serialize_css(critical_nodes)
+    for nodes, _ in stylesheets:
+        critical_css += serialize_css(purge_css(nodes, critical.tokens, critical.attributes))
+
+    static_root = os.path.normpath(_path('core/static'))
+    static_prefix = os.path.relpath(_path(options['OUTPUT_DIR']), static_root).replace(os.sep, '/')
+    bundle_css = re.sub(r'\x00font:([^\x00]+)\x00', r'fonts/\1', bundle)
+    links = _fallback_links(missing_fonts, icon_nodes is None)
+
+    prefixes = {google_name: prefix for _, prefix, google_name in TEXT_FONTS.values()}
+    styled = set(utility_classes) | _selector_classes(bundle_nodes) | {
+        name for nodes, _ in stylesheets for name in _selector_classes(nodes)
+    }
+    return {
+        'files': {
+            os.path.join(options['OUTPUT_DIR'], 'site.css'): (bundle_css + '\n').encode('utf-8'),
+            options['TEMPLATE']: _critical_template(critical_css, static_prefix, links).encode('utf-8'),
+        },
+        'fonts': fonts,
+        'unstyled': sorted(scan.class_attributes - styled - {'group'}),
+        'unsupported': unsupported_utilities(scan.class_attributes - styled),
+        'fallbacks': links,
+        'missing_fonts': sorted(
+            f"{prefixes[family]}-{weight}.woff2" for family, weights in missing_fonts.items() for weight in weights
+        ),
+        'unknown_animations': sorted(unknown_animations),
+        'sizes': {'bundle': len(bundle_css), 'critical': len(critical_css)},
+    }
+
+
+def render_fonts(fonts, directory):
+    """
+    Write the fonts collected by ``build_assets()``
+
+    Args:
+        fonts (dict): Font file name -> (source path, codepoints)
+        directory (str): Destination directory
+
+    Returns:
+        dict: Font file name -> bytes written
+    """
+    os.makedirs(directory, exist_ok=True)
+    written = {}
+    for name, (source, codepoints) in sorted(fonts.items()):
+        destination = os.path.join(directory, name)
+        if _write_font(source, destination, codepoints):
+            with open(destination, 'rb') as f:
+                written[name] = f.read()
+    return written
+
+
+def digest(data):
+    """Short content hash used to compare outputs in --check mode"""
+    return hashlib.md5(data, usedforsecurity=False).hexdigest()
+
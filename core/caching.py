@@ -0,0 +1,292 @@
+"""
+Caching helpers for Srihari Developers website
+
+Content version counters live in the shared Django cache so every worker
+sees a bump made by any other worker. Per-process caches compare their
+stored version against the shared counter and reload only when it moved.
+
+Counters expire after ``CONTENT_VERSIONS['TTL']`` seconds, which bounds how
+long a change that bypassed ``bump_version`` can go unnoticed. They are
+time-based, so a counter that expired or was evicted never comes back
+with a value a client or worker saw before.
+"""
+
+from asgiref.sync import iscoroutinefunction
+from datetime import datetime, timezone
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from functools import wraps
+import threading
+import hashlib
+import logging
+import time
+
+from firebase_config.cache import get_cache_settings
+
+from .models import CompanyInfo
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'core:version:{name}'
+VERSION_TIME_KEY = 'core:version-time:{name}'
+
+DEFAULT_VERSION_SETTINGS = {
+    'TTL': 600,  # Seconds a counter lives; bounds staleness when a change was missed
+    'SHARED': None,  # Whether every host shares the default cache; None guesses from its backend
+}
+
+# Cache backends private to one host
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.filebased.FileBasedCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+# Used when the CompanyInfo row has not been created yet
+DEFAULT_COMPANY_INFO = {
+    'company_name': 'Srihari Developers',
+    'tagline': 'Building Dreams, Creating Realities',
+    'description': 'Leading construction company in Tirupati specializing in residential and commercial projects.',
+    'phone': '+91-9014376635',
+    'email': 'info@sriharidevelopers.com',
+    'address': 'VSM BUILDING, Renigunta Rd, Tirupati, Andhra Pradesh 517501'
+}
+
+
+def get_version_settings():
+    """
+    Merge the project's CONTENT_VERSIONS setting over the defaults
+
+    Returns:
+        dict: Effective version counter settings
+    """
+    options = dict(DEFAULT_VERSION_SETTINGS)
+    options.update(getattr(settings, 'CONTENT_VERSIONS', {}))
+    return options
+
+
+def versions_are_shared():
+    """
+    Whether a bump on any host is seen by every other host
+
+    Returns:
+        bool: ``CONTENT_VERSIONS['SHARED']`` if set, else whether the default
+        cache backend is one that lives outside the host (Redis, Memcached, ...)
+    """
+    shared = get_version_settings()['SHARED']
+    if shared is not None:
+        return shared
+    return settings.CACHES['default']['BACKEND'] not in LOCAL_CACHE_BACKENDS
+
+
+def _new_version():
+    """A counter value later than any handed out before"""
+    return time.time_ns() // 1000
+
+
+def get_version(name):
+    """
+    Get the current version counter for a piece of content
+
+    A missing counter, new or expired, starts at a fresh value and counts
+    as a change now.
+
+    Args:
+        name (str): Content name, e.g. 'company_info'
+
+    Returns:
+        int: Version number
+    """
+    key = VERSION_KEY.format(name=name)
+    version = cache.get(key)
+    if version is None:
+        ttl = get_version_settings()['TTL']
+        if cache.add(key, _new_version(), timeout=ttl):
+            cache.set(VERSION_TIME_KEY.format(name=name), time.time(), timeout=ttl)
+        version = cache.get(key)
+        if version is None:
+            # Dummy cache, or evicted at once
+            version = _new_version()
+    return version
+
+
+def get_versions(names):
+    """
+    Get several version counters with a single cache round trip
+
+    Args:
+        names (iterable): Content names
+
+    Returns:
+        tuple: Version numbers in the order of ``names``
+    """
+    names = list(names)
+    keys = [VERSION_KEY.format(name=name) for name in names]
+    found = cache.get_many(keys)
+    return tuple(found[key] if key in found else get_version(name) for name, key in zip(names, keys))
+
+
+def bump_version(name):
+    """
+    Invalidate every worker's cached copy of a piece of content
+
+    Args:
+        name (str): Content name, e.g. 'company_info'
+
+    Returns:
+        int: The new version number
+    """
+    ttl = get_version_settings()['TTL']
+    version = _new_version()
+    cache.set_many({
+        VERSION_KEY.format(name=name): version,
+        VERSION_TIME_KEY.format(name=name): time.time(),
+    }, timeout=ttl)
+    return version
+
+
+def get_last_modified(names):
+    """
+    Get the latest time any of the named pieces of content changed
+
+    If no change was recorded yet (e.g. the cache was cleared), the current
+    time is recorded and used, which can only make validators more cautious.
+
+    Args:
+        names (iterable): Content names
+
+    Returns:
+        datetime: Aware UTC datetime of the most recent change
+    """
+    keys = [VERSION_TIME_KEY.format(name=name) for name in names]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, time.time(), timeout=get_version_settings()['TTL'])
+            found[key] = cache.get(key, time.time())
+    return datetime.fromtimestamp(int(max(found.values())), tz=timezone.utc)
+
+
+def has_pending_messages(request):
+    """Whether flash messages are waiting to be shown to this visitor"""
+    storage = getattr(request, '_messages', None)
+    return storage is not None and len(storage) > 0
+
+
+def versioned_condition(*names):
+    """
+    Answer conditional GETs from content version counters
+
+    The ETag is derived from the version counters of ``names`` plus the
+    request path and query string; Last-Modified is the time of the most
+    recent version bump. Neither requires reading the content itself, so a
+    matching If-None-Match/If-Modified-Since gets a 304 without running the view.
+
+    The counters are only trusted when every host shares them and Firestore
+    changes reach them through the query cache's listeners. Otherwise the
+    view runs and the ETag is a digest of the body it returned, so a 304 is
+    never based on a counter another host or a missed change left behind.
+
+    Validators are only attached to 200 responses that may be stored, never
+    to errors, redirects or degraded ``no-store`` pages. A request with flash
+    messages waiting always runs the view without validators, so the page
+    that shows them is rendered and never revalidated later.
+
+    Works like ``django.views.decorators.http.condition`` but also wraps
+    async views.
+
+    Args:
+        names (str): Content names the view depends on
+    """
+    def counters_are_reliable():
+        return versions_are_shared() and get_cache_settings()['ENABLED']
+
+    def validators(request):
+        if not counters_are_reliable():
+            return None, None
+        versions = get_versions(names)
+        raw = f"{versions}:{request.path}:{request.GET.urlencode()}"
+        etag = quote_etag(hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest())
+        return etag, get_last_modified(names)
+
+    def precondition(request, etag, last_modified):
+        if etag is None:
+            return None
+        return get_conditional_response(request, etag=etag, last_modified=int(last_modified.timestamp()))
+
+    def add_validators(request, response, etag, last_modified):
+        if (
+            request.method not in ('GET', 'HEAD')
+            or response.status_code != 200
+            or response.streaming
+            or 'no-store' in response.get('Cache-Control', '')
+        ):
+            return response
+        if etag is None:
+            etag = quote_etag(hashlib.md5(response.content, usedforsecurity=False).hexdigest())
+            response.headers.setdefault('ETag', etag)
+            return get_conditional_response(request, etag=response['ETag'], response=response)
+        if not response.has_header('Last-Modified'):
+            response.headers['Last-Modified'] = http_date(last_modified.timestamp())
+        response.headers.setdefault('ETag', etag)
+        return response
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            async def _view_wrapper(request, *args, **kwargs):
+                if has_pending_messages(request):
+                    return await view_func(request, *args, **kwargs)
+                etag, last_modified = validators(request)
+                response = precondition(request, etag, last_modified)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                return add_validators(request, response, etag, last_modified)
+        else:
+            def _view_wrapper(request, *args, **kwargs):
+                if has_pending_messages(request):
+                    return view_func(request, *args, **kwargs)
+                etag, last_modified = validators(request)
+                response = precondition(request, etag, last_modified)
+                if response is None:
+                    response = view_func(request, *args, **kwargs)
+                return add_validators(request, response, etag, last_modified)
+
+        return wraps(view_func)(_view_wrapper)
+
+    return decorator
+
+
+_company_info = {'version': None, 'value': None}
+_company_info_lock = threading.Lock()
+
+
+def get_company_info():
+    """
+    Get the CompanyInfo row, loaded once per worker until it changes
+
+    Returns:
+        CompanyInfo or dict: The saved company info, or DEFAULT_COMPANY_INFO
+    """
+    version = get_version('company_info')
+    if _company_info['version'] == version:
+        return _company_info['value']
+
+    with _company_info_lock:
+        if _company_info['version'] != version:
+            try:
+                value = CompanyInfo.objects.first() or DEFAULT_COMPANY_INFO
+            except Exception as e:
+                logger.error(f"Error loading company info: {str(e)}")
+                return DEFAULT_COMPANY_INFO
+            _company_info['value'] = value
+            _company_info['version'] = version
+    return _company_info['value']
+
+
+def clear_company_info():
+    """Drop this worker's cached CompanyInfo"""
+    with _company_info_lock:
+        _company_info['version'] = None
+        _company_info['value'] = None
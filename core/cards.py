@@ -0,0 +1,128 @@
+"""
+Project cards for Srihari Developers website
+
+Cards are cached as template fragments (``{% cache %}`` in the templates,
+``template_fragments`` cache alias) keyed by the record's id and version,
+so a page of unchanged projects is mostly cache reads. The values the card
+markup derives from a record (filter category, status colour, image URL)
+are worked out here once per record version instead of by filter chains on
+every render; templates read them from ``record['card']``.
+
+The card's image markup changes once its source has been processed
+(core/images.py), so the version also carries the image's state; only that
+is looked up on each render.
+
+A project read from the Django models carries its category's name from the
+related ProjectCategory row, which can change without the project's
+``updated_at`` moving, so its version also includes the
+``project_categories`` version counter (bumped by core/signals.py).
+"""
+
+from collections import OrderedDict
+from datetime import date, datetime
+import hashlib
+import json
+import threading
+
+from .caching import get_version
+from .images import image_state
+from .repository import ORM
+
+# Project names containing these are residential when no category is set
+RESIDENTIAL_KEYWORDS = ('apartment', 'villa', 'enclave')
+
+STATUS_COLORS = {
+    'ongoing': 'bg-blue-500',
+    'completed': 'bg-green-500',
+    'planning': 'bg-yellow-500',
+}
+DEFAULT_STATUS_COLOR = 'bg-gray-500'
+
+# Shown for projects without an image_url
+DEFAULT_PROJECT_IMAGE = (
+    'https://images.unsplash.com/photo-1560518883-ce09059eeffa?ixlib=rb-4.0.3&auto=format&fit=crop&w=1200&q=80'
+)
+
+# Descriptions kept per (kind, id, version)
+MAX_DESCRIPTIONS = 2000
+
+_descriptions = OrderedDict()
+_descriptions_lock = threading.Lock()
+
+
+def record_version(record):
+    """
+    Version of a record for cache keys
+
+    Args:
+        record (dict): Project record
+
+    Returns:
+        str: Its ``updated_at`` timestamp, or a digest of its fields for
+        records without one (documents written without it)
+    """
+    updated_at = record.get('updated_at')
+    if isinstance(updated_at, (datetime, date)):
+        return updated_at.isoformat()
+    if updated_at:
+        return str(updated_at)
+    fields = {name: value for name, value in record.items() if name != 'card'}
+    payload = json.dumps(fields, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def _describe(kind, record, build, related_version=None):
+    version = record_version(record)
+    if related_version is not None:
+        version = f"{version}:{related_version}"
+    key = (kind, record.get('id'), version)
+    with _descriptions_lock:
+        description = _descriptions.get(key)
+        if description is not None:
+            _descriptions.move_to_end(key)
+            return description
+
+    description = build(record)
+    description['version'] = version
+    with _descriptions_lock:
+        _descriptions[key] = description
+        if len(_descriptions) > MAX_DESCRIPTIONS:
+            _descriptions.popitem(last=False)
+    return description
+
+
+def _project_card(record):
+    status = (record.get('status') or '').lower()
+    category = (record.get('category') or '').lower()
+    if not category:
+        name = (record.get('name') or '').lower()
+        category = 'residential' if any(word in name for word in RESIDENTIAL_KEYWORDS) else 'commercial'
+    return {
+        'status': status,
+        'status_color': STATUS_COLORS.get(status, DEFAULT_STATUS_COLOR),
+        'category': category,
+        'image': record.get('image_url') or DEFAULT_PROJECT_IMAGE,
+    }
+
+
+def describe_projects(records):
+    """
+    Attach card values to project records
+
+    Args:
+        records (list): Project records; each gets a ``card`` dict with
+            ``version``, ``status``, ``status_color``, ``category`` and ``image``
+
+    Returns:
+        list: The same records
+    """
+    category_version = None
+    for record in records:
+        related_version = None
+        if getattr(record, 'source', None) == ORM:
+            if category_version is None:
+                category_version = get_version('project_categories')
+            related_version = category_version
+        card = _describe('project', record, _project_card, related_version)
+        record['card'] = dict(card, version=f"{card['version']}:{image_state(card['image'])}")
+    return records
@@ -0,0 +1,223 @@
+"""
+Response compression and HTML minification for Srihari Developers website
+
+WhiteNoise serves static files precompressed; ``CompressionMiddleware``
+(core/middleware.py) does the same for pages and API responses as they are
+produced. It picks Brotli or gzip from the request's ``Accept-Encoding``,
+compresses streaming responses chunk by chunk, and leaves bodies under
+``MIN_SIZE`` alone, since the framing would outweigh the saving.
+
+With ``MINIFY_HTML`` set, HTML pages are also stripped of indentation and
+comments before compression. The minifier only collapses whitespace where
+HTML ignores it: ``<pre>``, ``<textarea>``, ``<script>`` and ``<style>``
+bodies and quoted attribute values are left untouched, and the
+``<!--page-cache:...-->`` markers the page cache relies on are kept.
+``python -m benchmarks.compression`` measures the CPU cost of each step
+against the bytes it saves.
+"""
+
+from django.conf import settings
+from django.utils.text import compress_sequence, compress_string
+import re
+
+# Brotli is optional; without it responses are gzipped
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_COMPRESSION_SETTINGS = {
+    'ENABLED': True,
+    'MIN_SIZE': 1024,  # Bytes; smaller bodies are sent as they are
+    'BROTLI_QUALITY': 5,  # 0-11; higher is smaller but much slower
+    'CONTENT_TYPES': [
+        'text/html', 'text/plain', 'text/css', 'text/csv', 'text/xml',
+        'application/json', 'application/javascript', 'application/xml', 'image/svg+xml',
+    ],
+    'MINIFY_HTML': True,
+    'SERVER_TIMING': True,
+}
+
+# Random padding added to gzip headers, as django.middleware.gzip does, to
+# make BREACH-style length guessing harder
+GZIP_MAX_RANDOM_BYTES = 100
+
+# Comments kept by the minifier: page cache markers and IE conditionals
+PRESERVED_COMMENT_RE = re.compile(r'<!--(?:page-cache:|/page-cache:|\[if|<!\[endif)')
+HTML_TOKEN_RE = re.compile(
+    r'<!--.*?-->'
+    r'|<(pre|textarea|script|style)\b.*?</\1\s*>'
+    r'''|<[/!?a-zA-Z](?:"[^"]*"|'[^']*'|[^'">])*>''',
+    re.DOTALL | re.IGNORECASE,
+)
+TAG_WHITESPACE_RE = re.compile(r'("[^"]*"|\'[^\']*\')|\s+')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def get_compression_settings():
+    """
+    Get response compression settings with defaults
+
+    Returns:
+        dict: Settings from ``settings.COMPRESSION`` merged over the defaults
+    """
+    options = DEFAULT_COMPRESSION_SETTINGS.copy()
+    options.update(getattr(settings, 'COMPRESSION', {}))
+    return options
+
+
+def _collapse(match):
+    return '\n' if '\n' in match.group() else ' '
+
+
+def _minify_tag(tag):
+    return TAG_WHITESPACE_RE.sub(lambda m: m.group(1) or ' ', tag)
+
+
+def minify_html(html):
+    """
+    Collapse insignificant whitespace and drop comments
+
+    Each run of whitespace in text becomes one space, or one newline if it
+    spanned lines, so inline layout is unchanged.
+
+    Args:
+        html (str): Rendered page
+
+    Returns:
+        str: The page, minified
+    """
+    parts = []
+    position = 0
+    for match in HTML_TOKEN_RE.finditer(html):
+        parts.append(WHITESPACE_RE.sub(_collapse, html[position:match.start()]))
+        token = match.group()
+        if token.startswith('<!--'):
+            if PRESERVED_COMMENT_RE.match(token):
+                parts.append(token)
+        elif match.group(1):
+            # Raw text element: only its opening tag is touched
+            end = token.index('>') + 1
+            parts.append(_minify_tag(token[:end]) + token[end:])
+        else:
+            parts.append(_minify_tag(token))
+        position = match.end()
+    parts.append(WHITESPACE_RE.sub(_collapse, html[position:]))
+    return ''.join(parts)
+
+
+def parse_accept_encoding(header):
+    """
+    Parse an ``Accept-Encoding`` header
+
+    Args:
+        header (str): Header value, e.g. ``'gzip, deflate, br;q=0.9'``
+
+    Returns:
+        dict: Lowercase coding -> q-value
+    """
+    codings = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        codings[coding.strip().lower()] = quality
+    return codings
+
+
+def choose_encoding(header):
+    """
+    Pick the response encoding for an ``Accept-Encoding`` header
+
+    Brotli is preferred when installed, then gzip; the client's q-values
+    decide between them, and ``*`` stands for codings it did not list.
+
+    Args:
+        header (str): ``Accept-Encoding`` value
+
+    Returns:
+        str or None: ``'br'``, ``'gzip'``, or None to send the body as is
+    """
+    codings = parse_accept_encoding(header)
+    wildcard = codings.get('*', 0.0)
+    candidates = (['br'] if brotli is not None else []) + ['gzip']
+    best, best_quality = None, 0.0
+    for coding in candidates:
+        quality = codings.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress(data, encoding, options=None):
+    """
+    Compress a whole body
+
+    Args:
+        data (bytes): Body
+        encoding (str): ``'br'`` or ``'gzip'``
+        options (dict, optional): Compression settings
+
+    Returns:
+        bytes: Compressed body
+    """
+    options = options or get_compression_settings()
+    if encoding == 'br':
+        return brotli.compress(data, quality=options['BROTLI_QUALITY'])
+    return compress_string(data, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+
+
+def _brotli_sequence(chunks, quality):
+    compressor = brotli.Compressor(quality=quality)
+    for chunk in chunks:
+        # Flushed per chunk so the client sees data as soon as the view yields it
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def _abrotli_sequence(chunks, quality):
+    compressor = brotli.Compressor(quality=quality)
+    async for chunk in chunks:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def _agzip_sequence(chunks):
+    # Like django.middleware.gzip: each chunk is a complete gzip member
+    async for chunk in chunks:
+        yield compress_string(chunk, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+
+
+def compress_stream(chunks, encoding, options=None, is_async=False):
+    """
+    Compress a streaming body as it is produced
+
+    Args:
+        chunks (iterable or async iterable): Body chunks (bytes)
+        encoding (str): ``'br'`` or ``'gzip'``
+        options (dict, optional): Compression settings
+        is_async (bool): Whether ``chunks`` is an async iterable
+
+    Returns:
+        iterable or async iterable: Compressed chunks
+    """
+    options = options or get_compression_settings()
+    if encoding == 'br':
+        if is_async:
+            return _abrotli_sequence(chunks, options['BROTLI_QUALITY'])
+        return _brotli_sequence(chunks, options['BROTLI_QUALITY'])
+    if is_async:
+        return _agzip_sequence(chunks)
+    return compress_sequence(chunks, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
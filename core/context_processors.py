@@ -0,0 +1,16 @@
+"""
+Template context processors for Srihari Developers website
+"""
+
+from django.utils.functional import SimpleLazyObject
+
+from .caching import get_company_info
+
+
+def company_info(request):
+    """
+    Add the cached company info to every template context
+
+    The value is lazy, so pages that never use it cost nothing.
+    """
+    return {'company_info': SimpleLazyObject(get_company_info)}
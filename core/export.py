@@ -0,0 +1,230 @@
+"""
+Streaming exports of contact inquiries
+
+Rows come lazily from an ORM ``iterator()`` or from Firestore batches
+(``ContactService.stream_contacts()``) and are encoded as CSV or NDJSON,
+optionally gzipped, one chunk at a time. Memory use stays the same however
+many inquiries there are, whether the output goes to a
+``StreamingHttpResponse`` or to a file.
+
+Inquiries are written by site visitors, so CSV cells that a spreadsheet
+would read as a formula (starting with ``=``, ``+``, ``-``, ``@``, tab or
+carriage return) are prefixed with ``'`` and open as plain text.
+"""
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+import csv
+import json
+import logging
+import zlib
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FIELDS = ('id', 'name', 'email', 'phone', 'inquiry_type', 'message', 'responded', 'created_at')
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+# Rows are encoded into chunks of about this many bytes before being written
+CHUNK_SIZE = 64 * 1024
+
+ORM_CHUNK_SIZE = 2000
+
+# Leading characters that make spreadsheet apps evaluate a cell
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class ExportEncoder(DjangoJSONEncoder):
+    """JSON encoder that falls back to ``str()`` for Firestore-specific values"""
+
+    def default(self, o):
+        try:
+            return super().default(o)
+        except TypeError:
+            return str(o)
+
+
+class _Echo:
+    """File-like object whose ``write()`` hands the line back to the CSV writer's caller"""
+
+    def write(self, value):
+        return value
+
+
+def orm_records(queryset, fields=EXPORT_FIELDS, chunk_size=ORM_CHUNK_SIZE):
+    """
+    Iterate over inquiries in the database, newest first, without caching them
+
+    Args:
+        queryset (QuerySet): ContactInquiry rows, e.g. an admin selection
+        fields (tuple): Fields to read
+        chunk_size (int): Rows fetched from the database at a time
+
+    Returns:
+        iterator: One dict per row
+    """
+    return queryset.order_by('-created_at', '-id').values(*fields).iterator(chunk_size=chunk_size)
+
+
+def firestore_records(service, batch_size=500):
+    """
+    Iterate over contact documents in Firestore, newest first
+
+    Args:
+        service (ContactService): Service to read through
+        batch_size (int): Documents per Firestore call
+
+    Returns:
+        iterator: One dict per document
+    """
+    return service.stream_contacts(batch_size=batch_size)
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_lines(records, fields=EXPORT_FIELDS):
+    """
+    Encode records as CSV, header first
+
+    Text that would be read as a spreadsheet formula is prefixed with ``'``.
+
+    Args:
+        records (iterable): Dicts keyed by field name
+        fields (tuple): Columns, in order; missing keys are left empty
+
+    Yields:
+        str: One CSV line per record
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for record in records:
+        yield writer.writerow([_csv_value(record.get(field)) for field in fields])
+
+
+def ndjson_lines(records, fields=EXPORT_FIELDS):
+    """
+    Encode records as newline-delimited JSON
+
+    Args:
+        records (iterable): Dicts keyed by field name
+        fields (tuple): Keys to keep, in order; missing keys are null
+
+    Yields:
+        str: One JSON object per line
+    """
+    for record in records:
+        yield json.dumps({field: record.get(field) for field in fields}, cls=ExportEncoder) + '\n'
+
+
+def _chunked(lines):
+    """Join encoded lines into chunks of about CHUNK_SIZE bytes"""
+    buffer = []
+    size = 0
+    for line in lines:
+        data = line.encode('utf-8')
+        buffer.append(data)
+        size += len(data)
+        if size >= CHUNK_SIZE:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def gzip_chunks(chunks, level=6):
+    """
+    Gzip a stream of byte chunks incrementally
+
+    Args:
+        chunks (iterable): Uncompressed bytes
+        level (int): zlib compression level
+
+    Yields:
+        bytes: Pieces of a single gzip member
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_chunks(records, export_format='csv', compress=False, fields=EXPORT_FIELDS):
+    """
+    Encode records for download
+
+    Args:
+        records (iterable): Dicts keyed by field name
+        export_format (str): 'csv' or 'ndjson'
+        compress (bool): Gzip the output
+        fields (tuple): Fields to export
+
+    Returns:
+        iterator: Byte chunks of the encoded export
+    """
+    if export_format not in FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+    lines = csv_lines(records, fields) if export_format == 'csv' else ndjson_lines(records, fields)
+    chunks = _chunked(lines)
+    if compress:
+        chunks = gzip_chunks(chunks)
+    return chunks
+
+
+def export_filename(name, export_format='csv', compress=False):
+    """
+    Build a timestamped download filename
+
+    Args:
+        name (str): Base name, e.g. 'contacts'
+        export_format (str): 'csv' or 'ndjson'
+        compress (bool): Whether the export is gzipped
+
+    Returns:
+        str: e.g. 'contacts-20240101-120000.csv.gz'
+    """
+    stamp = timezone.localtime().strftime('%Y%m%d-%H%M%S')
+    extension = FORMATS[export_format][1] + ('.gz' if compress else '')
+    return f"{name}-{stamp}.{extension}"
+
+
+def export_response(records, name, export_format='csv', compress=False, fields=EXPORT_FIELDS):
+    """
+    Stream an export as a file download
+
+    Gzipped exports are sent as ``application/gzip`` files rather than with
+    ``Content-Encoding``, so browsers save them compressed.
+
+    Args:
+        records (iterable): Dicts keyed by field name
+        name (str): Base filename
+        export_format (str): 'csv' or 'ndjson'
+        compress (bool): Gzip the output
+        fields (tuple): Fields to export
+
+    Returns:
+        StreamingHttpResponse: The download
+    """
+    content_type = 'application/gzip' if compress else f"{FORMATS[export_format][0]}; charset=utf-8"
+    response = StreamingHttpResponse(
+        export_chunks(records, export_format, compress, fields),
+        content_type=content_type,
+    )
+    filename = export_filename(name, export_format, compress)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    logger.info(f"Streaming export {filename}")
+    return response
@@ -0,0 +1,444 @@
+"""
+Responsive images for Srihari Developers website
+
+Project photos, testimonial portraits and the stock photography in the
+templates are remote URLs. ``{% responsive_image %}`` (core/templatetags/images.py)
+points ``srcset`` at local derivatives instead, served by the ``core:image``
+view under a key derived from the source URL:
+
+    /images/<key>/<width>.<format>
+
+The first request for a key fetches the source once into
+``MEDIA_ROOT/images/<key>/`` and records its size and a tiny blurred
+placeholder in ``meta.json``. Each width/format derivative is encoded the
+first time it is asked for and written next to it, so later requests, from
+any worker on this host, are plain file reads. URLs never change for a given
+source and settings version, so responses are cached as immutable.
+
+Only URLs a template has rendered are registered, and only on allowed hosts,
+so the view is not an open proxy. Registrations live in the ``CACHE_ALIAS``
+cache, which must be shared by every worker and never cull entries; every
+redirect hop of a fetch is checked against the allowed hosts too.
+"""
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from io import BytesIO
+from urllib.parse import urlsplit
+from urllib.request import HTTPRedirectHandler, Request, build_opener
+import base64
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Pillow is optional; without it the tag emits plain <img> tags
+try:
+    from PIL import Image, ImageFilter, ImageOps
+except ImportError:
+    Image = ImageFilter = ImageOps = None
+
+# AVIF needs the pillow-avif-plugin on Pillow < 11
+try:
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pillow_avif = None
+
+DEFAULT_IMAGE_SETTINGS = {
+    'DIRECTORY': 'images',  # Under MEDIA_ROOT
+    'WIDTHS': [160, 320, 480, 640, 800, 1200, 1600],
+    'DEFAULT_WIDTH': 800,  # Used for the plain src of browsers without srcset
+    'FORMATS': ['avif', 'webp'],  # Preferred first; unsupported ones are skipped
+    'QUALITY': {'avif': 50, 'webp': 75},
+    'PLACEHOLDER_WIDTH': 16,
+    'ALLOWED_HOSTS': ['images.unsplash.com', 'firebasestorage.googleapis.com', 'storage.googleapis.com'],
+    'MAX_BYTES': 15 * 1024 * 1024,
+    'TIMEOUT': 10,  # Seconds to fetch a source
+    'RETRY_AFTER': 300,  # Seconds before a failed source is fetched again
+    'MAX_AGE': 31536000,
+    'VERSION': '1',  # Change to regenerate every derivative
+    'CACHE_ALIAS': 'images',  # Source URL registrations; shared, never culled
+}
+
+CONTENT_TYPES = {
+    'avif': 'image/avif',
+    'webp': 'image/webp',
+}
+
+PIL_FORMATS = {
+    'avif': 'AVIF',
+    'webp': 'WEBP',
+}
+
+SOURCE_KEY = 'core:image-source:{key}'
+FAILED_KEY = 'core:image-failed:{key}'
+
+# Seconds before a key without meta.json is looked up on disk again
+META_RECHECK = 30
+
+# Seconds before a worker writes a registration it already made again, in
+# case the cache was cleared since
+REGISTER_REFRESH = 3600
+
+
+class ImageUnavailable(Exception):
+    """The source image could not be fetched or decoded"""
+
+
+def get_image_settings():
+    """
+    Get image pipeline settings with defaults
+
+    Returns:
+        dict: Settings from ``settings.IMAGES`` merged over the defaults
+    """
+    options = DEFAULT_IMAGE_SETTINGS.copy()
+    options.update(getattr(settings, 'IMAGES', {}))
+    return options
+
+
+def available_formats(options=None):
+    """
+    Derivative formats this Pillow build can encode
+
+    Args:
+        options (dict, optional): Image settings; defaults to ``get_image_settings()``
+
+    Returns:
+        list: Format names from ``FORMATS``, in order of preference
+    """
+    if Image is None:
+        return []
+    options = options or get_image_settings()
+    Image.init()
+    return [fmt for fmt in options['FORMATS'] if PIL_FORMATS.get(fmt) in Image.SAVE]
+
+
+def is_allowed(url, options=None):
+    """Whether ``url`` is an http(s) URL on one of the allowed hosts"""
+    options = options or get_image_settings()
+    parts = urlsplit(url or '')
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        return False
+    hosts = options['ALLOWED_HOSTS']
+    return '*' in hosts or parts.hostname in hosts
+
+
+def image_key(url, options=None):
+    """Stable key for a source URL and the current settings version"""
+    options = options or get_image_settings()
+    return hashlib.sha256(f"{options['VERSION']}:{url}".encode()).hexdigest()[:24]
+
+
+def _directory(key, options):
+    return os.path.join(settings.MEDIA_ROOT, options['DIRECTORY'], key)
+
+
+def _write_atomic(path, data):
+    """Write ``data`` to ``path`` so readers never see a partial file"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+# Registration and metadata
+
+_registered = {}  # key -> time registered
+_meta = {}  # key -> (meta dict or None, time looked up)
+_meta_lock = threading.Lock()
+
+
+def register(url, options=None):
+    """
+    Record that a template rendered ``url`` so the image view may fetch it
+
+    Args:
+        url (str): Source URL, already checked with ``is_allowed``
+        options (dict, optional): Image settings
+
+    Returns:
+        str: The image key
+    """
+    options = options or get_image_settings()
+    key = image_key(url, options)
+    registered = _registered.get(key)
+    if registered is None or time.monotonic() - registered > REGISTER_REFRESH:
+        # Shared cache so a worker that never rendered the page can serve it
+        caches[options['CACHE_ALIAS']].set(SOURCE_KEY.format(key=key), url, timeout=None)
+        _registered[key] = time.monotonic()
+    return key
+
+
+def source_url(key, options=None):
+    """
+    Look up the source URL registered for ``key``
+
+    Returns:
+        str or None: The URL, or None if no template has rendered it
+    """
+    options = options or get_image_settings()
+    meta = read_meta(key, options)
+    if meta:
+        return meta['url']
+    return caches[options['CACHE_ALIAS']].get(SOURCE_KEY.format(key=key))
+
+
+def read_meta(key, options=None):
+    """
+    Read a processed source's metadata
+
+    Kept in memory once found; a missing file is looked up again after
+    ``META_RECHECK`` seconds so renders pick up sources processed meanwhile.
+
+    Returns:
+        dict or None: ``url``, ``width``, ``height``, ``alpha`` and ``placeholder``
+    """
+    options = options or get_image_settings()
+    cached = _meta.get(key)
+    if cached and (cached[0] is not None or time.monotonic() - cached[1] < META_RECHECK):
+        return cached[0]
+
+    path = os.path.join(_directory(key, options), 'meta.json')
+    try:
+        with open(path, encoding='utf-8') as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        meta = None
+    with _meta_lock:
+        _meta[key] = (meta, time.monotonic())
+    return meta
+
+
+def image_state(url, options=None):
+    """
+    Describe what ``{% responsive_image %}`` renders for ``url``, for cache keys
+
+    Args:
+        url (str): Remote image URL
+        options (dict, optional): Image settings
+
+    Returns:
+        str: ``'plain'`` for a plain ``<img>``, else the image key followed
+        by ``-ready`` once the source is processed or ``-pending`` before
+    """
+    options = options or get_image_settings()
+    if not available_formats(options) or not is_allowed(url, options):
+        return 'plain'
+    key = image_key(url, options)
+    return f"{key}-ready" if read_meta(key, options) else f"{key}-pending"
+
+
+# Fetching and encoding
+
+_key_locks = {}
+_key_locks_lock = threading.Lock()
+
+
+def _lock_for(key):
+    with _key_locks_lock:
+        return _key_locks.setdefault(key, threading.Lock())
+
+
+class _AllowedRedirectHandler(HTTPRedirectHandler):
+    """Follow a redirect only if its target is on an allowed host"""
+
+    def __init__(self, options):
+        self.options = options
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        if not is_allowed(newurl, self.options):
+            fp.close()
+            raise ImageUnavailable(f"Redirected to a host that is not allowed: {newurl}")
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+def _fetch(url, options):
+    """Download a source, refusing anything larger than ``MAX_BYTES``"""
+    request = Request(url, headers={'User-Agent': 'sriharidevelopers-images/1.0'})
+    opener = build_opener(_AllowedRedirectHandler(options))
+    with opener.open(request, timeout=options['TIMEOUT']) as response:
+        data = response.read(options['MAX_BYTES'] + 1)
+    if len(data) > options['MAX_BYTES']:
+        raise ImageUnavailable(f"Larger than {options['MAX_BYTES']} bytes")
+    return data
+
+
+def _open(data):
+    """Decode a source and apply its EXIF orientation"""
+    image = Image.open(BytesIO(data))
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+    return image
+
+
+def _placeholder(image, options):
+    """A blurred thumbnail of ``image`` as a ``data:`` URI of a few hundred bytes"""
+    width = options['PLACEHOLDER_WIDTH']
+    height = max(1, round(image.height * width / image.width))
+    thumbnail = image.convert('RGB').resize((width, height), Image.BILINEAR).filter(ImageFilter.GaussianBlur(1))
+    buffer = BytesIO()
+    thumbnail.save(buffer, 'WEBP', quality=30)
+    return 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def load_source(key, options=None):
+    """
+    Fetch and describe a source the first time it is needed
+
+    Args:
+        key (str): Image key
+        options (dict, optional): Image settings
+
+    Returns:
+        tuple: (``PIL.Image.Image``, meta dict)
+
+    Raises:
+        ImageUnavailable: If the key is unknown, or the source cannot be
+            fetched or decoded. Failures are remembered for ``RETRY_AFTER`` seconds.
+    """
+    options = options or get_image_settings()
+    directory = _directory(key, options)
+    source_path = os.path.join(directory, 'source')
+
+    url = source_url(key, options)
+    if url is None:
+        raise ImageUnavailable(f"Unknown image {key}")
+    if cache.get(FAILED_KEY.format(key=key)):
+        raise ImageUnavailable(f"Recently failed: {url}")
+
+    try:
+        try:
+            with open(source_path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            started = time.perf_counter()
+            data = _fetch(url, options)
+            _write_atomic(source_path, data)
+            logger.info(f"Fetched {url} ({len(data)} bytes in {time.perf_counter() - started:.2f}s)")
+        image = _open(data)
+    except Exception as e:
+        cache.set(FAILED_KEY.format(key=key), True, timeout=options['RETRY_AFTER'])
+        logger.warning(f"Image source unavailable: {url}: {e}")
+        raise ImageUnavailable(str(e)) from e
+
+    meta = read_meta(key, options)
+    if meta is None:
+        try:
+            placeholder = _placeholder(image, options)
+        except Exception as e:
+            logger.warning(f"Could not encode a placeholder for {url}: {e}")
+            raise ImageUnavailable(str(e)) from e
+        meta = {
+            'url': url,
+            'width': image.width,
+            'height': image.height,
+            'alpha': image.mode == 'RGBA',
+            'placeholder': placeholder,
+        }
+        _write_atomic(os.path.join(directory, 'meta.json'), json.dumps(meta).encode('utf-8'))
+        with _meta_lock:
+            _meta[key] = (meta, time.monotonic())
+    return image, meta
+
+
+def derivative_path(key, width, fmt, options=None):
+    """
+    Path of a derivative, encoding it first if needed
+
+    Sources narrower than ``width`` are encoded at their own width; images
+    are never scaled up.
+
+    Args:
+        key (str): Image key
+        width (int): One of ``WIDTHS``
+        fmt (str): One of ``available_formats()``
+        options (dict, optional): Image settings
+
+    Returns:
+        str: Absolute path of the encoded file
+
+    Raises:
+        ImageUnavailable: If the source cannot be fetched or decoded, or the
+            derivative cannot be encoded
+    """
+    options = options or get_image_settings()
+    path = os.path.join(_directory(key, options), f'{width}.{fmt}')
+    if os.path.exists(path):
+        return path
+
+    with _lock_for(key):
+        if os.path.exists(path):
+            return path
+        image, meta = load_source(key, options)
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        started = time.perf_counter()
+        buffer = BytesIO()
+        try:
+            image.save(buffer, PIL_FORMATS[fmt], quality=options['QUALITY'].get(fmt, 75))
+        except Exception as e:
+            logger.warning(f"Could not encode {key}/{width}.{fmt}: {e}")
+            raise ImageUnavailable(str(e)) from e
+        _write_atomic(path, buffer.getvalue())
+        logger.debug(f"Encoded {key}/{width}.{fmt} ({buffer.tell()} bytes in {time.perf_counter() - started:.2f}s)")
+    return path
+
+
+def prepare(url, options=None):
+    """
+    Fetch a source and encode every derivative ahead of the first visitor
+
+    Args:
+        url (str): Source URL
+        options (dict, optional): Image settings
+
+    Returns:
+        int: Number of derivatives now on disk
+
+    Raises:
+        ImageUnavailable: If the URL is not allowed or cannot be processed
+    """
+    options = options or get_image_settings()
+    if not is_allowed(url, options):
+        raise ImageUnavailable(f"Host not allowed: {url}")
+    key = register(url, options)
+    _, meta = load_source(key, options)
+    count = 0
+    for width in widths_for(meta, options):
+        for fmt in available_formats(options):
+            derivative_path(key, width, fmt, options)
+            count += 1
+    return count
+
+
+def widths_for(meta, options=None):
+    """
+    Width buckets worth offering for a source
+
+    Args:
+        meta (dict or None): Source metadata, or None if not processed yet
+        options (dict, optional): Image settings
+
+    Returns:
+        list: Buckets no wider than the source (at least the smallest one);
+        every bucket while the source size is unknown
+    """
+    options = options or get_image_settings()
+    widths = sorted(options['WIDTHS'])
+    if not meta:
+        return widths
+    return [width for width in widths if width <= meta['width']] or widths[:1]
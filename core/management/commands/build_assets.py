@@ -0,0 +1,99 @@
+"""
+Management command to build the self-hosted CSS bundle, fonts and critical CSS
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+import os
+import tempfile
+
+from core.assets import FONT_AWESOME_CDN, build_assets, digest, font_subset, get_asset_settings, render_fonts
+
+
+class Command(BaseCommand):
+    help = 'Scan the templates for the classes they use and write the purged CSS bundle, fonts and critical CSS'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Do not write; fail if the committed bundle is out of date, still needs a CDN or misses a Tailwind class',
+        )
+
+    def handle(self, *args, **options):
+        asset_settings = get_asset_settings()
+        result = build_assets(asset_settings)
+        font_dir = os.path.join(asset_settings['OUTPUT_DIR'], 'fonts')
+
+        outputs = dict(result['files'])
+        with tempfile.TemporaryDirectory() as directory:
+            for name, data in render_fonts(result['fonts'], directory).items():
+                outputs[os.path.join(font_dir, name)] = data
+
+        existing_fonts = set()
+        if os.path.isdir(os.path.join(settings.BASE_DIR, font_dir)):
+            existing_fonts = {os.path.join(font_dir, name) for name in os.listdir(os.path.join(settings.BASE_DIR, font_dir))}
+        stale = sorted(existing_fonts - set(outputs))
+
+        if options['check']:
+            outdated = [path for path, data in sorted(outputs.items()) if self._current_digest(path) != digest(data)]
+            problems = []
+            if outdated or stale:
+                problems.append(f"Out of date: {', '.join(outdated + stale)}; run build_assets")
+            if result['fallbacks']:
+                problems.append(self._fallback_problem(result, asset_settings))
+            if result['unsupported']:
+                problems.append(self._unsupported_problem(result))
+            if problems:
+                raise CommandError('\n'.join(problems))
+            self.stdout.write(self.style.SUCCESS('Asset bundle is up to date'))
+            return
+
+        for path, data in sorted(outputs.items()):
+            full_path = os.path.join(settings.BASE_DIR, path)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, 'wb') as f:
+                f.write(data)
+        for path in stale:
+            os.remove(os.path.join(settings.BASE_DIR, path))
+
+        sizes = result['sizes']
+        fonts = [path for path in outputs if path.startswith(font_dir)]
+        self.stdout.write(
+            f"site.css: {sizes['bundle']} bytes; critical CSS: {sizes['critical']} bytes; "
+            f"{len(fonts)} fonts ({sum(len(outputs[path]) for path in fonts)} bytes)"
+        )
+        if font_subset is None:
+            self.stdout.write(self.style.WARNING('fontTools is not installed: fonts were copied without subsetting'))
+        if result['fallbacks']:
+            self.stdout.write(self.style.WARNING(self._fallback_problem(result, asset_settings)))
+        if result['unsupported']:
+            self.stdout.write(self.style.WARNING(self._unsupported_problem(result)))
+        if result['unknown_animations']:
+            self.stdout.write(self.style.WARNING(f"Unsupported data-aos animations: {', '.join(result['unknown_animations'])}"))
+        if options['verbosity'] > 1 and result['unstyled']:
+            self.stdout.write(f"Classes without styles (script hooks or typos): {', '.join(result['unstyled'])}")
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(outputs)} files"))
+
+    @staticmethod
+    def _fallback_problem(result, asset_settings):
+        """Say which sources are missing while the bundle still loads CDN stylesheets"""
+        problems = []
+        if result['missing_fonts']:
+            font_dir = os.path.join(asset_settings['SOURCE_DIR'], 'fonts')
+            problems.append(f"add {', '.join(result['missing_fonts'])} to {font_dir} (see its README.md)")
+        if any(FONT_AWESOME_CDN in link for link in result['fallbacks']):
+            problems.append('install fontawesomefree')
+        return f"Still loading from a CDN: {'; '.join(problems)}; then run build_assets"
+
+    @staticmethod
+    def _unsupported_problem(result):
+        """Name the Tailwind classes that would be left unstyled"""
+        return f"Tailwind classes without styles: {', '.join(result['unsupported'])}; add them to core/tailwind.py"
+
+    @staticmethod
+    def _current_digest(path):
+        try:
+            with open(os.path.join(settings.BASE_DIR, path), 'rb') as f:
+                return digest(f.read())
+        except FileNotFoundError:
+            return None
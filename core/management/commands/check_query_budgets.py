@@ -0,0 +1,80 @@
+"""
+Management command to check views against their query budgets
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import get_resolver, resolve, Resolver404
+
+from core.querybudget import get_query_budget_settings, get_view_budget, track_queries
+from core.repository import project_repository, testimonial_repository
+from firebase_config.cache import get_query_cache
+
+
+def _budgeted_paths(resolver, prefix=''):
+    """Yield paths of argument-free URL patterns whose views declare a budget"""
+    for pattern in resolver.url_patterns:
+        route = str(pattern.pattern)
+        if hasattr(pattern, 'url_patterns'):
+            yield from _budgeted_paths(pattern, prefix + route)
+        elif '<' not in route and get_view_budget(pattern.callback) is not None:
+            yield '/' + (prefix + route).lstrip('^').rstrip('$')
+
+
+class Command(BaseCommand):
+    help = 'Request budgeted views and fail if one exceeds its SQL/Firestore budget or repeats a query'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths',
+            nargs='*',
+            help='Paths to check, e.g. /project/1/ (default: every budgeted view without URL arguments)',
+        )
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or sorted(set(_budgeted_paths(get_resolver())))
+        threshold = get_query_budget_settings()['DUPLICATE_THRESHOLD']
+        failures = 0
+
+        # Budgets describe steady state, once each worker knows where content lives
+        for repository in (project_repository, testimonial_repository):
+            repository.resolve_source()
+
+        # Measure cold requests: no page cache hits, no cached Firestore reads
+        with override_settings(PAGE_CACHE={'ENABLED': False}):
+            client = Client(raise_request_exception=False)
+            for path in paths:
+                try:
+                    budget = get_view_budget(resolve(path.split('?')[0]).func)
+                except Resolver404:
+                    raise CommandError(f"No view for {path}")
+
+                get_query_cache().clear()
+                with track_queries() as stats:
+                    response = client.get(path)
+
+                problems = stats.violations(budget, threshold)
+                if response.status_code >= 500:
+                    problems.append(f"HTTP {response.status_code}")
+                line = (
+                    f"{path}: {stats.query_count} queries, {stats.firestore_count} Firestore RPCs"
+                    f" (budget {self._format_budget(budget)})"
+                )
+                if problems:
+                    failures += 1
+                    self.stdout.write(self.style.ERROR(line))
+                    for problem in problems:
+                        self.stdout.write(f"    {problem}")
+                else:
+                    self.stdout.write(self.style.SUCCESS(line))
+
+        if failures:
+            raise CommandError(f"{failures} view(s) over budget")
+
+    @staticmethod
+    def _format_budget(budget):
+        if budget is None:
+            return 'none'
+        return ', '.join(
+            f"{key} {'-' if value is None else value}" for key, value in budget.items()
+        )
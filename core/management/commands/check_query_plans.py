@@ -0,0 +1,67 @@
+"""
+Management command to check that hot queries are served by their indexes
+"""
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from core.models import ContactInquiry, Project, Testimonial
+from core.pagination import DEFAULT_PAGE_SIZE, keyset_filter
+
+
+def _hot_queries():
+    """(label, queryset, index expected in the plan) for the site's hot queries"""
+    now = timezone.now()
+    return [
+        ('featured projects', Project.objects.filter(featured=True)[:6], 'project_featured_created_idx'),
+        (
+            'projects page',
+            keyset_filter(Project.objects.all(), (now, 1000))[:DEFAULT_PAGE_SIZE + 1],
+            'project_created_idx',
+        ),
+        ('featured testimonials', Testimonial.objects.filter(is_featured=True)[:6], 'testimonial_featured_idx'),
+        (
+            'unanswered inquiries',
+            ContactInquiry.objects.filter(responded=False)[:100],
+            'inquiry_unresponded_idx',
+        ),
+        (
+            'inquiries by type',
+            ContactInquiry.objects.filter(inquiry_type='general')[:100],
+            'inquiry_type_created_idx',
+        ),
+        (
+            'inquiries by date',
+            ContactInquiry.objects.filter(created_at__gte=now - timedelta(days=30), created_at__lt=now)[:100],
+            'inquiry_created_idx',
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN QUERY PLAN on hot queries and fail if one skips its index or sorts in a temp B-tree'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError(f"Query plan checks expect SQLite, not {connection.vendor}")
+
+        failures = 0
+        for label, queryset, index in _hot_queries():
+            plan = queryset.explain()
+            problems = []
+            if f"INDEX {index}" not in plan:
+                problems.append(f"does not use {index}")
+            if 'USE TEMP B-TREE' in plan:
+                problems.append('sorts in a temp B-tree')
+
+            if problems:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f"{label}: {', '.join(problems)}"))
+                for line in plan.splitlines():
+                    self.stdout.write(f"    {line}")
+            else:
+                self.stdout.write(self.style.SUCCESS(f"{label}: uses {index}"))
+
+        if failures:
+            raise CommandError(f"{failures} query plan(s) without their index")
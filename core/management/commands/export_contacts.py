@@ -0,0 +1,56 @@
+"""
+Management command to export contact inquiries as CSV or NDJSON at constant memory
+"""
+from django.core.management.base import BaseCommand, CommandError
+import sys
+
+from core.export import FORMATS, ORM_CHUNK_SIZE, export_chunks, firestore_records, orm_records
+from core.models import ContactInquiry
+
+
+class Command(BaseCommand):
+    help = 'Stream every contact inquiry from the database or Firestore to a CSV or NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            choices=['orm', 'firestore'],
+            default='orm',
+            help='Read inquiries from the database (default) or the Firestore contacts collection',
+        )
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv', help='Output format (default: csv)')
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output')
+        parser.add_argument('--output', default='-', help='Output path (default: stdout)')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=ORM_CHUNK_SIZE,
+            help=f'Rows or documents read at a time (default: {ORM_CHUNK_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        if options['source'] == 'firestore':
+            from firebase_config.utils import contact_service
+            if not contact_service.is_available():
+                raise CommandError('Firestore is not available')
+            records = firestore_records(contact_service, batch_size=options['batch_size'])
+        else:
+            records = orm_records(ContactInquiry.objects.all(), chunk_size=options['batch_size'])
+
+        chunks = export_chunks(records, options['format'], options['gzip'])
+        if options['output'] == '-':
+            self._write(chunks, sys.stdout.buffer)
+            return
+
+        with open(options['output'], 'wb') as f:
+            written = self._write(chunks, f)
+        self.stderr.write(self.style.SUCCESS(f"Wrote {written} bytes to {options['output']}"))
+
+    @staticmethod
+    def _write(chunks, stream):
+        written = 0
+        for chunk in chunks:
+            stream.write(chunk)
+            written += len(chunk)
+        stream.flush()
+        return written
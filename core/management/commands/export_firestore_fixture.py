@@ -0,0 +1,67 @@
+"""
+Management command to export projects and testimonials as a Firestore fixture
+"""
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+import json
+
+from core.models import Project, Testimonial
+from core.repository import Record
+
+# Firestore collection -> Django model holding the same documents
+COLLECTIONS = {
+    'projects': Project,
+    'testimonials': Testimonial,
+}
+
+
+def _to_document(instance):
+    """Shape a model instance like the Firestore document the site reads"""
+    document = dict(Record.from_instance(instance))
+    document['id'] = str(document['id'])
+    return document
+
+
+class Command(BaseCommand):
+    help = 'Write projects and testimonials to a JSON fixture for the in-memory Firestore backend'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='-', help='Fixture path (default: stdout)')
+        parser.add_argument(
+            '--scale',
+            type=int,
+            default=1,
+            help='Repeat every document this many times, with distinct IDs and timestamps',
+        )
+
+    def handle(self, *args, **options):
+        fixture = {}
+        for collection, model in COLLECTIONS.items():
+            queryset = model.objects.all()
+            if any(isinstance(field, models.ForeignKey) for field in model._meta.concrete_fields):
+                queryset = queryset.select_related()
+            originals = [_to_document(instance) for instance in queryset]
+
+            documents = []
+            for copy_number in range(options['scale']):
+                for original in originals:
+                    document = dict(original)
+                    if copy_number:
+                        document['id'] = f"{original['id']}-{copy_number}"
+                        # Older copies, so the originals still sort first
+                        for field in ('created_at', 'updated_at'):
+                            if document.get(field):
+                                document[field] = document[field] - timedelta(minutes=copy_number)
+                    documents.append(document)
+            fixture[collection] = documents
+
+        content = json.dumps(fixture, cls=DjangoJSONEncoder, indent=2)
+        if options['output'] == '-':
+            self.stdout.write(content)
+        else:
+            with open(options['output'], 'w') as f:
+                f.write(content)
+            counts = ', '.join(f"{len(documents)} {name}" for name, documents in fixture.items())
+            self.stdout.write(self.style.SUCCESS(f"Wrote {counts} to {options['output']}"))
@@ -0,0 +1,64 @@
+"""
+Management command to write spooled form submissions to Firestore
+"""
+from django.core.management.base import BaseCommand
+import time
+
+from firebase_config.spool import get_spool, get_spool_settings, flush_spool
+
+
+class Command(BaseCommand):
+    help = 'Write queued contact and inquiry submissions to Firestore in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--daemon',
+            action='store_true',
+            help='Keep running and flush every --interval seconds',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=None,
+            help='Seconds between flushes in daemon mode (default: FIREBASE_SPOOL FLUSH_INTERVAL)',
+        )
+        parser.add_argument(
+            '--requeue-dead',
+            action='store_true',
+            help='Move dead-lettered submissions back into the spool before flushing',
+        )
+
+    def handle(self, *args, **options):
+        spool_settings = get_spool_settings()
+        spool = get_spool()
+        interval = options['interval'] or spool_settings['FLUSH_INTERVAL']
+
+        if options['requeue_dead']:
+            self.stdout.write(f"Requeued {spool.requeue_dead()} dead-lettered submissions")
+
+        while True:
+            written = 0
+            while True:
+                count = flush_spool(spool, batch_size=spool_settings['BATCH_SIZE'])
+                written += count
+                if count < spool_settings['BATCH_SIZE']:
+                    break
+
+            pending = spool.pending_count()
+            if written or not options['daemon']:
+                self.stdout.write(f"Wrote {written} submissions to Firestore, {pending} still pending")
+
+            if not options['daemon']:
+                break
+            time.sleep(interval)
+
+        dead = spool.dead_count()
+        if dead:
+            self.stdout.write(self.style.ERROR(
+                f"{dead} submissions were rejected by Firestore and moved to spool_dead; "
+                "fix the cause, then run with --requeue-dead"
+            ))
+        if pending:
+            self.stdout.write(self.style.WARNING("Some submissions are waiting for a retry"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Submission spool is empty"))
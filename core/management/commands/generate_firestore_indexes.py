@@ -0,0 +1,99 @@
+"""
+Management command to generate firestore.indexes.json from the service layer's queries
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+import asyncio
+import inspect
+import json
+import os
+
+from firebase_config.async_utils import AsyncFirebaseService
+from firebase_config.indexes import build_index_config
+from firebase_config.memory import AsyncMemoryClient, MemoryClient, MemoryStore
+from firebase_config.utils import FirebaseService
+
+READ_METHOD_PREFIXES = ('get_', 'count_', 'has_')
+
+
+def _services(base, client):
+    """Instances of every service class with ``db`` pointing at ``client``"""
+    services = []
+    pending = list(base.__subclasses__())
+    while pending:
+        service_class = pending.pop(0)
+        pending.extend(service_class.__subclasses__())
+        recording_class = type(f"Recording{service_class.__name__}", (service_class,), {
+            'db': client,
+            'is_available': lambda self: True,
+        })
+        services.append(recording_class())
+    return services
+
+
+def _read_calls(service):
+    """Yield a zero-argument call for every public read method of a service"""
+    for name, method in inspect.getmembers(service, inspect.ismethod):
+        if not name.startswith(READ_METHOD_PREFIXES):
+            continue
+        arguments = {
+            parameter.name: 'example'
+            for parameter in inspect.signature(method).parameters.values()
+            if parameter.default is inspect.Parameter.empty
+        }
+        yield lambda method=method, arguments=arguments: method(**arguments)
+
+
+class Command(BaseCommand):
+    help = 'Run every service-layer read against a recording client and write the composite indexes they need'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default=os.path.join(settings.BASE_DIR, 'firestore.indexes.json'),
+            help='Where to write the index file (default: firestore.indexes.json in the project root; - for stdout)',
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Do not write; fail if the existing file is out of date',
+        )
+
+    def handle(self, *args, **options):
+        store = MemoryStore()
+        client = MemoryClient(store, record_queries=True)
+        async_client = AsyncMemoryClient(store, record_queries=True)
+
+        # Straight to the recording clients: no cached results, no listeners
+        with override_settings(FIREBASE_CACHE={'ENABLED': False}):
+            for service in _services(FirebaseService, client):
+                for call in _read_calls(service):
+                    call()
+
+            async def run_async_reads():
+                for service in _services(AsyncFirebaseService, async_client):
+                    for call in _read_calls(service):
+                        await call()
+
+            asyncio.run(run_async_reads())
+
+        shapes = [query.shape() for query in client.queries + async_client.queries]
+        content = json.dumps(build_index_config(shapes), indent=2) + '\n'
+
+        if options['check']:
+            try:
+                with open(options['output']) as f:
+                    current = f.read()
+            except FileNotFoundError:
+                current = None
+            if current != content:
+                raise CommandError(f"{options['output']} is out of date; run generate_firestore_indexes")
+            self.stdout.write(self.style.SUCCESS(f"{options['output']} is up to date"))
+        elif options['output'] == '-':
+            self.stdout.write(content, ending='')
+        else:
+            with open(options['output'], 'w') as f:
+                f.write(content)
+            count = len(json.loads(content)['indexes'])
+            self.stdout.write(self.style.SUCCESS(f"Wrote {count} composite indexes to {options['output']}"))
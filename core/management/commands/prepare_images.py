@@ -0,0 +1,62 @@
+"""
+Management command to fetch remote images and encode their responsive derivatives
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+import glob
+import os
+import re
+
+from core.images import ImageUnavailable, available_formats, get_image_settings, is_allowed, prepare
+from core.models import Project, Testimonial
+
+# Literal sources passed to {% responsive_image %} in templates
+TEMPLATE_SOURCE_RE = re.compile(r"""{%\s*responsive_image\s+(?:\S+\|default:)?['"](https?://[^'"]+)['"]""")
+
+
+def _template_sources():
+    sources = set()
+    for path in glob.glob(os.path.join(settings.BASE_DIR, 'core', 'templates', '**', '*.html'), recursive=True):
+        with open(path, encoding='utf-8') as f:
+            sources.update(TEMPLATE_SOURCE_RE.findall(f.read()))
+    return sources
+
+
+class Command(BaseCommand):
+    help = 'Fetch project, testimonial and template images and encode every width/format ahead of the first visitor'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'urls',
+            nargs='*',
+            help='Source URLs to prepare (default: every image the site renders)',
+        )
+
+    def handle(self, *args, **options):
+        image_settings = get_image_settings()
+        if not available_formats(image_settings):
+            raise CommandError('Pillow with WebP or AVIF support is required')
+
+        urls = set(options['urls'])
+        if not urls:
+            urls = _template_sources()
+            urls.update(Project.objects.exclude(image_url__isnull=True).exclude(image_url='').values_list('image_url', flat=True))
+            urls.update(Testimonial.objects.exclude(client_image__isnull=True).exclude(client_image='').values_list('client_image', flat=True))
+
+        prepared = failed = 0
+        for url in sorted(urls):
+            if not is_allowed(url, image_settings):
+                self.stdout.write(f"Skipped (host not allowed): {url}")
+                continue
+            try:
+                count = prepare(url, image_settings)
+            except ImageUnavailable as e:
+                failed += 1
+                self.stderr.write(self.style.ERROR(f"Failed: {url}: {e}"))
+                continue
+            prepared += 1
+            self.stdout.write(f"{count} derivatives: {url}")
+
+        if failed:
+            raise CommandError(f"{failed} of {len(urls)} images could not be prepared")
+        self.stdout.write(self.style.SUCCESS(f"Prepared {prepared} images"))
@@ -0,0 +1,109 @@
+"""
+Management command to report where worker startup time goes
+"""
+from django.core.management.base import BaseCommand
+from collections import defaultdict
+import subprocess
+import json
+import sys
+import os
+
+
+# Runs in a fresh interpreter so nothing is already imported
+PROBE_SCRIPT = """
+import json, time
+t0 = time.perf_counter()
+import django
+django.setup()
+t1 = time.perf_counter()
+from django.conf import settings
+from django.urls import get_resolver
+get_resolver(settings.ROOT_URLCONF).url_patterns
+from sriharidevelopers.wsgi import application
+t2 = time.perf_counter()
+phases = {'django.setup()': t1 - t0, 'URLconf, views and WSGI app': t2 - t1}
+if FIREBASE:
+    from firebase_config.firebase_admin_setup import warmup_firebase
+    warmup_firebase(background=False)
+    phases['Firebase initialization'] = time.perf_counter() - t2
+print(json.dumps(phases))
+"""
+
+
+class Command(BaseCommand):
+    help = 'Print an import-time breakdown of worker startup'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--firebase',
+            action='store_true',
+            help='Also initialize Firebase, as FIREBASE_WARMUP or a first request would',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=15,
+            help='Number of packages and modules to list (default: 15)',
+        )
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'sriharidevelopers.settings')
+        # Keep the report about this process, not a background flusher
+        env['FIREBASE_SPOOL_AUTOSTART'] = 'False'
+        env['FIREBASE_WARMUP'] = 'False'
+
+        script = f"FIREBASE = {bool(options['firebase'])}\n" + PROBE_SCRIPT
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', script],
+            capture_output=True, text=True, env=env,
+        )
+        if result.returncode != 0:
+            self.stderr.write(result.stderr[-2000:])
+            return
+
+        phases = json.loads(result.stdout.strip().splitlines()[-1])
+        modules = self._parse_importtime(result.stderr)
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Startup phases'))
+        for name, seconds in phases.items():
+            self.stdout.write(f"  {seconds * 1000:9.1f} ms  {name}")
+        self.stdout.write(f"  {sum(phases.values()) * 1000:9.1f} ms  total")
+
+        packages = defaultdict(int)
+        for name, (self_us, cumulative_us) in modules.items():
+            packages[name.split('.')[0]] += self_us
+
+        self.stdout.write(self.style.MIGRATE_HEADING('\nImport time by top-level package (self)'))
+        for name, micros in sorted(packages.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f"  {micros / 1000:9.1f} ms  {name}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING('\nSlowest modules (cumulative)'))
+        slowest = sorted(modules.items(), key=lambda item: -item[1][1])[:options['top']]
+        for name, (self_us, cumulative_us) in slowest:
+            self.stdout.write(f"  {cumulative_us / 1000:9.1f} ms  {name}")
+
+        heavy = [name for name in ('firebase_admin', 'google.cloud.firestore', 'grpc') if name in modules]
+        if heavy and not options['firebase']:
+            self.stdout.write(self.style.WARNING(
+                f"\nImported at startup without --firebase: {', '.join(heavy)}"
+            ))
+
+    @staticmethod
+    def _parse_importtime(output):
+        """
+        Parse ``python -X importtime`` output
+
+        Returns:
+            dict: Module name to (self, cumulative) microseconds
+        """
+        modules = {}
+        for line in output.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            try:
+                self_us, cumulative_us, name = line[len('import time:'):].split('|')
+                modules[name.strip()] = (int(self_us), int(cumulative_us))
+            except ValueError:
+                continue
+        return modules
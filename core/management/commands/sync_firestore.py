@@ -0,0 +1,78 @@
+"""
+Management command to mirror Firestore collections into the Django models
+"""
+from django.core.management.base import BaseCommand, CommandError
+import logging
+import time
+
+from core.mirror import MIRRORED_MODELS, get_mirror_settings, sync_collection
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Copy Firestore documents changed since the last run into the local database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'collections',
+            nargs='*',
+            help='Collections to mirror (default: FIRESTORE_MIRROR COLLECTIONS)',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Read every document and remove rows whose documents were deleted',
+        )
+        parser.add_argument(
+            '--daemon',
+            action='store_true',
+            help='Keep running and sync every --interval seconds',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=None,
+            help='Seconds between syncs in daemon mode (default: FIRESTORE_MIRROR INTERVAL)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Documents per Firestore read (default: FIRESTORE_MIRROR BATCH_SIZE)',
+        )
+
+    def handle(self, *args, **options):
+        mirror_settings = get_mirror_settings()
+        collections = options['collections'] or mirror_settings['COLLECTIONS']
+        unknown = [collection for collection in collections if collection not in MIRRORED_MODELS]
+        if unknown:
+            raise CommandError(f"Not mirrored: {', '.join(unknown)} (choose from {', '.join(MIRRORED_MODELS)})")
+        interval = options['interval'] or mirror_settings['INTERVAL']
+
+        full = options['full']
+        while True:
+            failures = 0
+            for collection in collections:
+                try:
+                    result = sync_collection(collection, full=full, batch_size=options['batch_size'])
+                except Exception as e:
+                    failures += 1
+                    logger.error(f"Mirroring {collection} failed: {str(e)}")
+                    self.stderr.write(self.style.ERROR(f"{collection}: {str(e)}"))
+                    continue
+                if result['upserted'] or result['deleted'] or not options['daemon']:
+                    self.stdout.write(
+                        f"{collection} ({'full' if result['full'] else 'incremental'}): "
+                        f"{result['upserted']} written, {result['deleted']} deleted, {result['skipped']} skipped"
+                    )
+
+            if not options['daemon']:
+                break
+            # --full applies to the first round; later ones follow FULL_SYNC_INTERVAL
+            full = False
+            time.sleep(interval)
+
+        if failures:
+            raise CommandError(f"{failures} collection(s) could not be mirrored")
+        self.stdout.write(self.style.SUCCESS('Mirror is up to date'))
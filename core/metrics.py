@@ -0,0 +1,293 @@
+"""
+Metrics for Srihari Developers website
+
+A small in-process registry of counters and histograms rendered in the
+Prometheus text format by the ``/metrics`` view.
+
+Under gunicorn each worker keeps its own registry. When METRICS['DIRECTORY']
+is set, workers periodically write a snapshot to ``metrics-<pid>.json`` in
+that directory and ``/metrics`` sums the snapshots of every worker, so the
+numbers don't depend on which worker answered the scrape. Clear the
+directory when the service restarts.
+"""
+
+from collections import defaultdict
+from django.conf import settings
+import threading
+import logging
+import atexit
+import json
+import glob
+import time
+import os
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_METRICS_SETTINGS = {
+    'ENABLED': True,
+    'DIRECTORY': None,
+    'FLUSH_INTERVAL': 5,
+    'TOKEN': '',
+    'SERVER_TIMING': True,
+    'BUCKETS': (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+}
+
+# name -> (type, help)
+METRICS = {
+    'http_request_duration_seconds': ('histogram', 'Time spent in Django per request, by URL name'),
+    'http_responses_total': ('counter', 'Responses by URL name, method and status code'),
+    'firestore_rpc_duration_seconds': ('histogram', 'Firestore RPC latency by service method'),
+    'firestore_rpc_errors_total': ('counter', 'Failed Firestore RPCs by service method'),
+    'firestore_query_cache_requests_total': ('counter', 'Firestore query cache lookups by result'),
+    'page_cache_requests_total': ('counter', 'Page cache lookups by result'),
+}
+
+
+def get_metrics_settings():
+    """
+    Merge the project's METRICS setting over the defaults
+
+    Returns:
+        dict: Effective metrics settings
+    """
+    options = dict(DEFAULT_METRICS_SETTINGS)
+    options.update(getattr(settings, 'METRICS', {}))
+    return options
+
+
+class MetricsRegistry:
+    """Counters and histograms for one process"""
+
+    def __init__(self, buckets, directory=None, flush_interval=5):
+        self.buckets = tuple(buckets)
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)
+        self._histograms = {}
+        self._collectors = []
+        self._last_flush = time.monotonic()
+
+    def inc(self, name, labels=(), amount=1):
+        """
+        Increase a counter
+
+        Args:
+            name (str): Metric name from METRICS
+            labels (tuple): (label, value) pairs
+            amount (float): Increment
+        """
+        with self._lock:
+            self._counters[(name, tuple(labels))] += amount
+
+    def observe(self, name, value, labels=()):
+        """
+        Record one observation in a histogram
+
+        Args:
+            name (str): Metric name from METRICS
+            value (float): Observed value, e.g. seconds
+            labels (tuple): (label, value) pairs
+        """
+        key = (name, tuple(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # Per-bucket counts, then sum and count
+                histogram = self._histograms[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[index] += 1
+                    break
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def add_collector(self, collector):
+        """
+        Register a callable returning current counter values
+
+        Args:
+            collector (callable): Returns (name, labels, value) tuples; used
+                for counters kept elsewhere, such as cache hit counts
+        """
+        self._collectors.append(collector)
+
+    def snapshot(self):
+        """
+        Copy this process's metrics into a JSON-serializable dict
+
+        Returns:
+            dict: 'counters' and 'histograms' as [name, labels, value] lists
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(value) for key, value in self._histograms.items()}
+        for collector in self._collectors:
+            try:
+                for name, labels, value in collector():
+                    counters[(name, tuple(labels))] = value
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {str(e)}")
+        return {
+            'buckets': list(self.buckets),
+            'counters': [[name, list(labels), value] for (name, labels), value in counters.items()],
+            'histograms': [[name, list(labels), value] for (name, labels), value in histograms.items()],
+        }
+
+    def flush(self):
+        """Write this process's snapshot for other workers to read"""
+        if not self.directory:
+            return
+        self._last_flush = time.monotonic()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"metrics-{self.pid}.json")
+            temp_path = f"{path}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics snapshot: {str(e)}")
+
+    def maybe_flush(self):
+        """Flush if FLUSH_INTERVAL has passed since the last flush"""
+        if self.directory and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def collect(self):
+        """
+        Sum the snapshots of every worker
+
+        Returns:
+            list: Snapshots to merge; just this process's without a directory
+        """
+        if not self.directory:
+            return [self.snapshot()]
+
+        self.flush()
+        snapshots = []
+        for path in glob.glob(os.path.join(self.directory, 'metrics-*.json')):
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable metrics snapshot {path}: {str(e)}")
+        return snapshots
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    rendered = ','.join(
+        '{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in pairs
+    )
+    return '{' + rendered + '}'
+
+
+def _format_value(value):
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def render(snapshots):
+    """
+    Merge snapshots and render them in the Prometheus text format
+
+    Args:
+        snapshots (list): Results of ``MetricsRegistry.snapshot``
+
+    Returns:
+        str: Exposition text
+    """
+    counters = defaultdict(float)
+    histograms = {}
+    buckets = None
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            counters[(name, tuple(tuple(pair) for pair in labels))] += value
+        if buckets is None:
+            buckets = snapshot['buckets']
+        elif snapshot['buckets'] != buckets:
+            # Written before a bucket change; can't be merged
+            continue
+        for name, labels, value in snapshot['histograms']:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            if key in histograms:
+                histograms[key] = [a + b for a, b in zip(histograms[key], value)]
+            else:
+                histograms[key] = list(value)
+
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == 'counter':
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        else:
+            for (metric, labels), value in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(buckets, value):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {value[-1]}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value[-2])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {value[-1]}")
+    return '\n'.join(lines) + '\n'
+
+
+def _query_cache_counts():
+    from firebase_config.cache import get_query_cache
+    stats = get_query_cache().stats()
+    return [
+        ('firestore_query_cache_requests_total', [('result', 'hit')], stats['hits']),
+        ('firestore_query_cache_requests_total', [('result', 'stale')], stats['stale_hits']),
+        ('firestore_query_cache_requests_total', [('result', 'miss')], stats['misses']),
+    ]
+
+
+def observe_firestore_rpc(label, seconds, error):
+    """Firestore RPC listener recording latency and errors per service method"""
+    registry = get_registry()
+    registry.observe('firestore_rpc_duration_seconds', seconds, [('rpc', label)])
+    if error is not None:
+        registry.inc('firestore_rpc_errors_total', [('rpc', label), ('error', type(error).__name__)])
+
+
+_registry = None
+_init_lock = threading.Lock()
+
+
+def get_registry():
+    """
+    Get this process's metrics registry
+
+    A registry inherited across a fork is replaced, so a worker never
+    reports its parent's counts under its own pid.
+
+    Returns:
+        MetricsRegistry: Shared registry instance
+    """
+    global _registry
+    if _registry is None or _registry.pid != os.getpid():
+        with _init_lock:
+            if _registry is None or _registry.pid != os.getpid():
+                options = get_metrics_settings()
+                registry = MetricsRegistry(
+                    options['BUCKETS'],
+                    directory=options['DIRECTORY'],
+                    flush_interval=options['FLUSH_INTERVAL'],
+                )
+                registry.add_collector(_query_cache_counts)
+                if options['DIRECTORY']:
+                    atexit.register(registry.flush)
+                _registry = registry
+    return _registry
@@ -0,0 +1,370 @@
+"""
+Middleware for Srihari Developers website
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils.cache import patch_vary_headers
+import hashlib
+import logging
+import time
+import re
+
+from .caching import get_versions
+from .compression import choose_encoding, compress, compress_stream, get_compression_settings, minify_html
+from .metrics import get_metrics_settings, get_registry
+from .querybudget import (
+    QueryBudgetExceeded, get_query_budget_settings, get_view_budget, track_queries,
+)
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_PAGE_CACHE_SETTINGS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 600,
+    'VIEWS': [],
+    'VERSION': '',
+    'CONTENT': ['company_info', 'projects', 'testimonials'],
+}
+
+CSRF_PLACEHOLDER = '<!--page-cache:csrf-->'
+MESSAGES_PLACEHOLDER = '<!--page-cache:messages-placeholder-->'
+
+CSRF_INPUT_RE = re.compile(r'(<input type="hidden" name="csrfmiddlewaretoken" value=")[^"]*(">)')
+MESSAGES_RE = re.compile(r'<!--page-cache:messages-->.*?<!--/page-cache:messages-->', re.DOTALL)
+
+
+def get_page_cache_settings():
+    """
+    Merge the project's PAGE_CACHE setting over the defaults
+
+    Returns:
+        dict: Effective page cache settings
+    """
+    options = dict(DEFAULT_PAGE_CACHE_SETTINGS)
+    options.update(getattr(settings, 'PAGE_CACHE', {}))
+    return options
+
+
+class PageCacheMiddleware:
+    """
+    Serve rendered public pages to anonymous visitors from cache
+
+    Pages are stored with the per-user parts punched out: the CSRF token in
+    ``{% csrf_token %}`` inputs and the flash messages region of base.html.
+    Both are filled in for the current visitor when the page is served.
+    Cache keys include the deploy version, the static files manifest hash and
+    the content version counters, so saving a project, testimonial or company
+    info expires affected pages.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = get_page_cache_settings()
+        self.views = set(self.options['VIEWS'])
+        compression = get_compression_settings()
+        self.minify = compression['ENABLED'] and compression['MINIFY_HTML']
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self._store_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self._store_response(request, await self.get_response(request))
+
+    def _store_response(self, request, response):
+        cache_key = getattr(request, '_page_cache_key', None)
+        if cache_key is not None and self._should_store(response):
+            html = response.content.decode(response.charset)
+            if self.minify:
+                # Minified once here, so cache hits skip CompressionMiddleware's pass
+                html = minify_html(html)
+                response.content = html.encode(response.charset)
+                response.html_minified = True
+            html = CSRF_INPUT_RE.sub(r'\g<1>' + CSRF_PLACEHOLDER + r'\g<2>', html)
+            html = MESSAGES_RE.sub(MESSAGES_PLACEHOLDER, html)
+            self.cache.set(cache_key, html, self.options['TIMEOUT'])
+            response['X-Page-Cache'] = 'miss'
+        return response
+
+    @property
+    def cache(self):
+        return caches[self.options['CACHE_ALIAS']]
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self._is_cacheable_request(request):
+            return None
+
+        try:
+            cache_key = self._cache_key(request)
+            html = self.cache.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Page cache lookup failed: {str(e)}")
+            return None
+
+        if html is None:
+            request._page_cache_key = cache_key
+            return None
+
+        return self._serve(request, html)
+
+    def _is_cacheable_request(self, request):
+        if not self.options['ENABLED'] or request.method not in ('GET', 'HEAD'):
+            return False
+        match = request.resolver_match
+        if match is None or match.view_name not in self.views:
+            return False
+        user = getattr(request, 'user', None)
+        return user is None or not user.is_authenticated
+
+    def _cache_key(self, request):
+        versions = get_versions(self.options['CONTENT'])
+        url = request.build_absolute_uri()
+        digest = hashlib.md5(url.encode(), usedforsecurity=False).hexdigest()
+        version = '.'.join(str(v) for v in versions)
+        # Pages link hashed static URLs, so a new collectstatic gets new pages
+        static_version = (getattr(staticfiles_storage, 'manifest_hash', None) or '')[:12]
+        return f"page:{self.options['VERSION']}:{static_version}:{version}:{digest}"
+
+    @staticmethod
+    def _should_store(response):
+        return (
+            response.status_code == 200
+            and not response.streaming
+            and response.get('Content-Type', '').startswith('text/html')
+            and 'no-store' not in response.get('Cache-Control', '')
+        )
+
+    @staticmethod
+    def _serve(request, html):
+        if CSRF_PLACEHOLDER in html:
+            html = html.replace(CSRF_PLACEHOLDER, get_token(request))
+        if MESSAGES_PLACEHOLDER in html:
+            messages_html = render_to_string('partials/messages.html', {
+                'messages': messages.get_messages(request),
+            })
+            html = html.replace(MESSAGES_PLACEHOLDER, messages_html)
+
+        response = HttpResponse(html)
+        response['X-Page-Cache'] = 'hit'
+        response.html_minified = True
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Brotli/gzip-compress dynamic responses, minifying HTML first
+
+    Static files are left to WhiteNoise. Bodies under COMPRESSION['MIN_SIZE'],
+    responses that are already encoded or marked ``no-transform``, and content
+    types not listed in COMPRESSION['CONTENT_TYPES'] are sent as they are.
+    Streaming responses are compressed chunk by chunk. HTML minification
+    (see core/compression.py) is skipped for pages the page cache already
+    minified. Compression time is reported in the Server-Timing header.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = get_compression_settings()
+        self.content_types = set(self.options['CONTENT_TYPES'])
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if not self.options['ENABLED']:
+            return response
+        return self._process(request, response)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if not self.options['ENABLED']:
+            return response
+        return self._process(request, response)
+
+    def _process(self, request, response):
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if (
+            content_type not in self.content_types
+            or response.has_header('Content-Encoding')
+            or 'no-transform' in response.get('Cache-Control', '')
+        ):
+            return response
+
+        start = time.perf_counter()
+        if (
+            self.options['MINIFY_HTML'] and content_type == 'text/html' and not response.streaming
+            and not getattr(response, 'html_minified', False)
+        ):
+            response.content = minify_html(response.content.decode(response.charset)).encode(response.charset)
+            response.html_minified = True
+            if response.has_header('Content-Length'):
+                response['Content-Length'] = str(len(response.content))
+
+        if not response.streaming and len(response.content) < self.options['MIN_SIZE']:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding, self.options, is_async=response.is_async,
+            )
+            # The compressed length is not known until the stream ends
+            del response.headers['Content-Length']
+        else:
+            compressed = compress(response.content, encoding, self.options)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # A strong ETag names the uncompressed bytes; weak ones still match If-None-Match
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+
+        if self.options['SERVER_TIMING']:
+            timing = f'compress;desc="{encoding}";dur={(time.perf_counter() - start) * 1000:.1f}'
+            if response.has_header('Server-Timing'):
+                timing = f"{response['Server-Timing']}, {timing}"
+            response['Server-Timing'] = timing
+        return response
+
+
+class QueryBudgetMiddleware:
+    """
+    Count SQL queries and Firestore RPCs per request and enforce view budgets
+
+    Requests over the budget declared with ``core.querybudget.query_budget``,
+    or repeating one SQL statement DUPLICATE_THRESHOLD times, are logged,
+    or raise QueryBudgetExceeded when QUERY_BUDGET['RAISE'] is set. Counts
+    are reported in X-Query-Count and X-Firestore-RPCs headers.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = get_query_budget_settings()
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.options['ENABLED']:
+            return self.get_response(request)
+        with track_queries() as stats:
+            response = self.get_response(request)
+        return self._check(request, response, stats)
+
+    async def __acall__(self, request):
+        if not self.options['ENABLED']:
+            return await self.get_response(request)
+        with track_queries() as stats:
+            response = await self.get_response(request)
+        return self._check(request, response, stats)
+
+    def _check(self, request, response, stats):
+        if self.options['HEADERS']:
+            response['X-Query-Count'] = str(stats.query_count)
+            response['X-Firestore-RPCs'] = str(stats.firestore_count)
+
+        match = request.resolver_match
+        budget = get_view_budget(match.func) if match else None
+        problems = stats.violations(budget, self.options['DUPLICATE_THRESHOLD'])
+        if problems:
+            message = f"Query budget exceeded for {request.path}:\n" + '\n'.join(problems)
+            if self.options['RAISE']:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Record request latency and response status per URL name
+
+    Also adds a Server-Timing header splitting the request's time into
+    Django total, SQL and Firestore, so slow responses can be broken down
+    from the browser's network panel.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = get_metrics_settings()
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.options['ENABLED']:
+            return self.get_response(request)
+        start = time.perf_counter()
+        with track_queries() as stats:
+            response = self.get_response(request)
+        return self._record(request, response, stats, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        if not self.options['ENABLED']:
+            return await self.get_response(request)
+        start = time.perf_counter()
+        with track_queries() as stats:
+            response = await self.get_response(request)
+        return self._record(request, response, stats, time.perf_counter() - start)
+
+    def _record(self, request, response, stats, duration):
+        match = request.resolver_match
+        # URL names, not paths, keep label cardinality bounded
+        labels = [('view', match.view_name if match else 'unmatched'), ('method', request.method)]
+        registry = get_registry()
+        registry.observe('http_request_duration_seconds', duration, labels)
+        registry.inc('http_responses_total', labels + [('status', str(response.status_code))])
+
+        page_cache = response.get('X-Page-Cache')
+        if page_cache:
+            registry.inc('page_cache_requests_total', [('result', page_cache)])
+
+        if self.options['SERVER_TIMING']:
+            timings = [
+                f'app;dur={duration * 1000:.1f}',
+                f'db;desc="{stats.query_count} queries";dur={stats.query_time * 1000:.1f}',
+                f'firestore;desc="{stats.firestore_count} RPCs";dur={stats.firestore_time * 1000:.1f}',
+            ]
+            if page_cache:
+                timings.append(f'page-cache;desc="{page_cache}"')
+            if response.has_header('Server-Timing'):
+                timings.insert(0, response['Server-Timing'])
+            response['Server-Timing'] = ', '.join(timings)
+
+        registry.maybe_flush()
+        return response
@@ -0,0 +1,59 @@
+from django.db import migrations
+
+
+# (FTS5 table, content table, indexed columns)
+SEARCH_TABLES = [
+    ('core_project_fts', 'core_project', ('name', 'location', 'description')),
+    ('core_contactinquiry_fts', 'core_contactinquiry', ('name', 'email', 'phone', 'message')),
+]
+
+
+def _create_statements(fts_table, table, columns):
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    delete_row = (
+        f"INSERT INTO {fts_table}({fts_table}, rowid, {column_list}) "
+        f"VALUES ('delete', old.id, {old_values});"
+    )
+    insert_row = f"INSERT INTO {fts_table}(rowid, {column_list}) VALUES (new.id, {new_values});"
+    return [
+        # External-content table: the index stores tokens only, rows stay in {table}
+        f"CREATE VIRTUAL TABLE {fts_table} USING fts5("
+        f"{column_list}, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER {fts_table}_insert AFTER INSERT ON {table} BEGIN {insert_row} END",
+        f"CREATE TRIGGER {fts_table}_delete AFTER DELETE ON {table} BEGIN {delete_row} END",
+        # Only edits to indexed columns touch the index
+        f"CREATE TRIGGER {fts_table}_update AFTER UPDATE OF {column_list} ON {table} "
+        f"BEGIN {delete_row} {insert_row} END",
+        f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')",
+    ]
+
+
+def create_search_tables(apps, schema_editor):
+    """Create FTS5 indexes on SQLite; other backends keep LIKE searches"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for fts_table, table, columns in SEARCH_TABLES:
+        for statement in _create_statements(fts_table, table, columns):
+            schema_editor.execute(statement)
+
+
+def drop_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for fts_table, _, _ in SEARCH_TABLES:
+        for trigger in ('insert', 'delete', 'update'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {fts_table}_{trigger}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {fts_table}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_add_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_tables, drop_search_tables),
+    ]
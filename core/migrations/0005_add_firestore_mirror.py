@@ -0,0 +1,68 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:32
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_add_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MirrorState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('collection', models.CharField(max_length=100, unique=True)),
+                ('watermark', models.DateTimeField(blank=True, help_text='Latest updated_at copied from Firestore', null=True)),
+                ('synced_at', models.DateTimeField(blank=True, null=True)),
+                ('full_synced_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MirrorTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('collection', models.CharField(max_length=100)),
+                ('firestore_id', models.CharField(max_length=128)),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='contactinquiry',
+            name='firestore_id',
+            field=models.CharField(blank=True, editable=False, max_length=128, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='firestore_id',
+            field=models.CharField(blank=True, editable=False, max_length=128, null=True),
+        ),
+        migrations.AddField(
+            model_name='testimonial',
+            name='firestore_id',
+            field=models.CharField(blank=True, editable=False, max_length=128, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='contactinquiry',
+            constraint=models.UniqueConstraint(condition=models.Q(('firestore_id__isnull', False)), fields=('firestore_id',), name='inquiry_firestore_id_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='project',
+            constraint=models.UniqueConstraint(condition=models.Q(('firestore_id__isnull', False)), fields=('firestore_id',), name='project_firestore_id_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='testimonial',
+            constraint=models.UniqueConstraint(condition=models.Q(('firestore_id__isnull', False)), fields=('firestore_id',), name='testimonial_firestore_id_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='mirrortombstone',
+            index=models.Index(fields=['collection', 'deleted_at'], name='mirror_tombstone_deleted_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='mirrortombstone',
+            constraint=models.UniqueConstraint(fields=('collection', 'firestore_id'), name='mirror_tombstone_unique'),
+        ),
+    ]
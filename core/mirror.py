@@ -0,0 +1,434 @@
+"""
+Firestore-to-database mirror for Srihari Developers website
+
+Firestore stays the system of record; ``sync_collection`` copies its
+documents into the Django models so reads can be served from the local
+database (see the ``mirror`` source in core/repository.py).
+
+Each run pulls only the documents whose ``updated_at`` is later than the
+collection's stored watermark (less an OVERLAP window, since concurrent
+writers don't commit in timestamp order), and writes them in bulk: rows
+are matched on ``firestore_id``; new ones are inserted and changed ones
+updated with a few bulk statements per batch, and unchanged ones skipped.
+
+Firestore can't be asked what was deleted, so deletions arrive two ways:
+
+* soft deletes: a document with ``deleted: true`` and a fresh ``updated_at``
+* full passes, which page through every document in ID order and delete
+  local rows whose document is gone, walking both ID lists side by side so
+  neither is held in memory
+
+Either way the row is removed and a ``MirrorTombstone`` records when. A full
+pass runs on the first sync and then every FULL_SYNC_INTERVAL seconds; it
+also picks up documents written without ``updated_at``. Rows created
+locally without a ``firestore_id`` are never touched. Nor are rows whose
+document is still waiting in the submission spool (firebase_config/spool.py)
+or was dead-lettered there, or rows created after the pass started: the
+contact view saves its row under the document's ID before the document is
+written.
+
+Some fields belong to the database rather than the document, such as an
+inquiry's ``responded``, which is set in the admin. They are copied when a
+row is first created and never overwritten afterwards (LOCAL_FIELDS).
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.utils import timezone
+import logging
+import time
+
+from .caching import bump_version
+from .models import ContactInquiry, MirrorState, MirrorTombstone, Project, Testimonial
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIRROR_SETTINGS = {
+    'COLLECTIONS': ['projects', 'testimonials', 'contacts'],
+    'BATCH_SIZE': 500,
+    'INTERVAL': 30,
+    'OVERLAP': 60,
+    'MAX_LAG': 300,
+    'FULL_SYNC_INTERVAL': 86400,
+}
+
+# Firestore collection -> model mirroring it
+MIRRORED_MODELS = {
+    'projects': Project,
+    'testimonials': Testimonial,
+    'contacts': ContactInquiry,
+}
+
+# Fields edited in the admin, which later copies of the document must not undo
+LOCAL_FIELDS = {
+    'contacts': ('responded',),
+}
+
+# Set by soft-deleting writers instead of deleting the document
+DELETED_FIELD = 'deleted'
+
+SYNCED_KEY = 'core:mirror-synced:{collection}'
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# IDs per DELETE, well under SQLite's bound parameter limit
+DELETE_BATCH_SIZE = 500
+
+# How long a worker trusts its last look at a collection's sync time
+FRESHNESS_CHECK_INTERVAL = 5
+
+_freshness = {}
+
+
+def get_mirror_settings():
+    """
+    Merge the project's FIRESTORE_MIRROR setting over the defaults
+
+    Returns:
+        dict: Effective mirror settings
+    """
+    options = dict(DEFAULT_MIRROR_SETTINGS)
+    options.update(getattr(settings, 'FIRESTORE_MIRROR', {}))
+    return options
+
+
+def _service(collection):
+    from firebase_config.utils import contact_service, project_service, testimonial_service
+    return {
+        'projects': project_service,
+        'testimonials': testimonial_service,
+        'contacts': contact_service,
+    }[collection]
+
+
+def _aware(value):
+    """Firestore treats naive datetimes as UTC; so does the mirror"""
+    if isinstance(value, datetime) and timezone.is_naive(value):
+        return timezone.make_aware(value, dt_timezone.utc)
+    return value
+
+
+def _related_id(field, value, related_ids):
+    """Foreign keys arrive as the related row's name, the way Record flattens them"""
+    if value in (None, ''):
+        return None
+    key = (field.related_model, str(value))
+    if key not in related_ids:
+        related, _ = field.related_model.objects.get_or_create(name=str(value))
+        related_ids[key] = related.pk
+    return related_ids[key]
+
+
+def document_to_instance(model, document, related_ids):
+    """
+    Build an unsaved model instance from a Firestore document
+
+    Fields missing from the document get the model's defaults; other
+    document fields are ignored.
+
+    Args:
+        model (Model): Mirroring model
+        document (dict): Document carrying its ``id``
+        related_ids (dict): Cache of looked-up foreign keys, shared across a run
+
+    Returns:
+        Model: Instance with ``firestore_id`` set
+
+    Raises:
+        ValidationError: If a value can't be converted to its field's type
+    """
+    instance = model(firestore_id=str(document['id']))
+    for field in model._meta.concrete_fields:
+        if field.primary_key or field.name == 'firestore_id' or field.name not in document:
+            continue
+        value = document[field.name]
+        if field.is_relation:
+            setattr(instance, field.attname, _related_id(field, value, related_ids))
+        elif value is not None or field.null:
+            setattr(instance, field.attname, _aware(field.to_python(value)))
+
+    # Timestamps the document lacks default to its last update (see upsert_instances())
+    updated_at = _aware(document.get('updated_at'))
+    for field in _timestamp_fields(model):
+        if getattr(instance, field.attname) is None:
+            setattr(instance, field.attname, updated_at)
+    return instance
+
+
+def _timestamp_fields(model):
+    """Required datetime fields, which the mirror fills when a document lacks them"""
+    return [
+        field for field in model._meta.concrete_fields
+        if isinstance(field, models.DateTimeField) and not field.null
+    ]
+
+
+def upsert_instances(collection, model, instances):
+    """
+    Insert or update mirrored rows, matched on ``firestore_id``
+
+    Rows whose values already match the document are left alone, so
+    re-reading the overlap window writes nothing. The collection's
+    LOCAL_FIELDS are only written when a row is inserted.
+
+    Args:
+        collection (str): Firestore collection name
+        model (Model): Mirroring model
+        instances (list): Unsaved instances with distinct ``firestore_id``
+
+    Returns:
+        int: Number of rows inserted or changed
+    """
+    if not instances:
+        return 0
+    local_fields = LOCAL_FIELDS.get(collection, ())
+    fields = [
+        field for field in model._meta.concrete_fields
+        if not field.primary_key and field.name != 'firestore_id' and field.name not in local_fields
+    ]
+    attnames = [field.attname for field in fields]
+    ids = [instance.firestore_id for instance in instances]
+    existing = {
+        row['firestore_id']: row
+        for row in model.objects.filter(firestore_id__in=ids).values('pk', 'firestore_id', *attnames)
+    }
+
+    now = timezone.now()
+    timestamp_attnames = [field.attname for field in _timestamp_fields(model)]
+    new = []
+    changed = []
+    for instance in instances:
+        row = existing.get(instance.firestore_id)
+        for attname in timestamp_attnames:
+            # Still missing: keep the row's value, or start from now
+            if getattr(instance, attname) is None:
+                setattr(instance, attname, row[attname] if row is not None else now)
+        if row is None:
+            new.append(instance)
+        elif any(getattr(instance, attname) != row[attname] for attname in attnames):
+            instance.pk = row['pk']
+            changed.append(instance)
+    if not new and not changed:
+        return 0
+
+    # bulk_create() stamps auto_now/auto_now_add fields with the current time
+    auto_fields = [
+        field.attname for field in fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    timestamps = [[getattr(instance, attname) for attname in auto_fields] for instance in new]
+    with transaction.atomic():
+        if new:
+            model.objects.bulk_create(new)
+            created = dict(
+                model.objects.filter(firestore_id__in=[instance.firestore_id for instance in new])
+                .values_list('firestore_id', 'pk')
+            )
+            for instance, values in zip(new, timestamps):
+                instance.pk = created[instance.firestore_id]
+                for attname, value in zip(auto_fields, values):
+                    setattr(instance, attname, value)
+            # ...so put the document's back
+            if auto_fields:
+                model.objects.bulk_update(new, auto_fields)
+        if changed:
+            model.objects.bulk_update(changed, [field.name for field in fields])
+        # A document that came back is no longer deleted
+        MirrorTombstone.objects.filter(collection=collection, firestore_id__in=ids).delete()
+    return len(new) + len(changed)
+
+
+def delete_rows(collection, model, firestore_ids):
+    """
+    Delete mirrored rows whose documents are gone and record tombstones
+
+    Args:
+        collection (str): Firestore collection name
+        model (Model): Mirroring model
+        firestore_ids (list): Document IDs
+
+    Returns:
+        int: Number of rows deleted
+    """
+    deleted = 0
+    for start in range(0, len(firestore_ids), DELETE_BATCH_SIZE):
+        chunk = firestore_ids[start:start + DELETE_BATCH_SIZE]
+        with transaction.atomic():
+            count, _ = model.objects.filter(firestore_id__in=chunk).delete()
+            MirrorTombstone.objects.bulk_create(
+                [MirrorTombstone(collection=collection, firestore_id=firestore_id) for firestore_id in chunk],
+                ignore_conflicts=True,
+            )
+        deleted += count
+    return deleted
+
+
+def _local_ids(model, batch_size, created_before):
+    """IDs of rows mirrored before ``created_before``, in ascending order, read a page at a time"""
+    after = None
+    while True:
+        queryset = model.objects.filter(firestore_id__isnull=False, created_at__lt=created_before)
+        if after is not None:
+            queryset = queryset.filter(firestore_id__gt=after)
+        page = list(queryset.order_by('firestore_id').values_list('firestore_id', flat=True)[:batch_size])
+        yield from page
+        if len(page) < batch_size:
+            return
+        after = page[-1]
+
+
+class _Batches:
+    """Applies batches of documents to one collection's model and tallies the results"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.model = MIRRORED_MODELS[collection]
+        self.related_ids = {}
+        self.upserted = 0
+        self.deleted = 0
+        self.skipped = 0
+        self.watermark = None
+
+    def apply(self, documents, missing_ids=()):
+        instances = []
+        deleted_ids = list(missing_ids)
+        for document in documents:
+            updated_at = _aware(document.get('updated_at'))
+            if isinstance(updated_at, datetime) and (self.watermark is None or updated_at > self.watermark):
+                self.watermark = updated_at
+            if document.get(DELETED_FIELD):
+                deleted_ids.append(str(document['id']))
+                continue
+            try:
+                instances.append(document_to_instance(self.model, document, self.related_ids))
+            except (ValidationError, ValueError, TypeError) as e:
+                self.skipped += 1
+                logger.warning(f"Skipping {self.collection}/{document.get('id')}: {str(e)}")
+        self.upserted += upsert_instances(self.collection, self.model, instances)
+        self.deleted += delete_rows(self.collection, self.model, deleted_ids)
+
+
+def _unwritten_ids(collection):
+    """Document IDs local rows may already carry that the submission spool hasn't written"""
+    try:
+        from firebase_config.spool import get_spool
+    except ImportError:
+        return set()
+    return get_spool().document_ids(collection)
+
+
+def _full_pass(service, batches, batch_size, started_at):
+    """Copy every document and delete rows whose documents are gone"""
+    # Read before any document, so an entry flushed during the pass still counts
+    unwritten_ids = _unwritten_ids(batches.collection)
+    local_ids = _local_ids(batches.model, batch_size, created_before=started_at)
+    local_id = next(local_ids, None)
+    after = None
+    while True:
+        documents = service.get_changed_documents(after=after, limit=batch_size)
+        missing_ids = []
+        for document in documents:
+            document_id = str(document['id'])
+            while local_id is not None and local_id < document_id:
+                missing_ids.append(local_id)
+                local_id = next(local_ids, None)
+            if local_id == document_id:
+                local_id = next(local_ids, None)
+        if len(documents) < batch_size:
+            # Whatever is left locally sorts after the last document
+            while local_id is not None:
+                missing_ids.append(local_id)
+                local_id = next(local_ids, None)
+        batches.apply(documents, [firestore_id for firestore_id in missing_ids if firestore_id not in unwritten_ids])
+        if len(documents) < batch_size:
+            return
+        after = str(documents[-1]['id'])
+
+
+def _incremental_pass(service, batches, since, batch_size):
+    """Copy documents updated after ``since``"""
+    after = None
+    while True:
+        documents = service.get_changed_documents(since=since, after=after, limit=batch_size)
+        batches.apply(documents)
+        if len(documents) < batch_size:
+            return
+        last = documents[-1]
+        after = (last['updated_at'], str(last['id']))
+
+
+def sync_collection(collection, full=False, batch_size=None):
+    """
+    Bring one collection's mirror up to date
+
+    Args:
+        collection (str): Firestore collection name, a key of MIRRORED_MODELS
+        full (bool): Force a full pass
+        batch_size (int): Documents per Firestore read, default BATCH_SIZE
+
+    Returns:
+        dict: 'full', 'upserted', 'deleted' and 'skipped' for this run
+
+    Raises:
+        Exception: If Firestore can't be read; the watermark is left as it was
+    """
+    options = get_mirror_settings()
+    batch_size = batch_size or options['BATCH_SIZE']
+    service = _service(collection)
+    state, _ = MirrorState.objects.get_or_create(collection=collection)
+    started_at = timezone.now()
+    full = (
+        full
+        or state.full_synced_at is None
+        or started_at - state.full_synced_at >= timedelta(seconds=options['FULL_SYNC_INTERVAL'])
+    )
+
+    batches = _Batches(collection)
+    if full:
+        _full_pass(service, batches, batch_size, started_at)
+    else:
+        # No watermark yet: no document had updated_at, so only later writes can match
+        watermark = state.watermark or EPOCH
+        _incremental_pass(service, batches, watermark - timedelta(seconds=options['OVERLAP']), batch_size)
+
+    if batches.watermark is not None and (state.watermark is None or batches.watermark > state.watermark):
+        state.watermark = batches.watermark
+    state.synced_at = started_at
+    if full:
+        state.full_synced_at = started_at
+    state.save()
+    cache.set(SYNCED_KEY.format(collection=collection), started_at.timestamp(), None)
+
+    if batches.upserted or batches.deleted:
+        bump_version(collection)
+    logger.info(
+        f"Mirrored {collection} ({'full' if full else 'incremental'}): "
+        f"{batches.upserted} written, {batches.deleted} deleted, {batches.skipped} skipped"
+    )
+    return {'full': full, 'upserted': batches.upserted, 'deleted': batches.deleted, 'skipped': batches.skipped}
+
+
+def mirror_is_fresh(collection):
+    """
+    Check whether a collection's mirror was synced within MAX_LAG seconds
+
+    Reads the sync time from the shared cache, at most every
+    FRESHNESS_CHECK_INTERVAL seconds per worker.
+
+    Args:
+        collection (str): Firestore collection name
+
+    Returns:
+        bool: True if reads can be served from the mirror
+    """
+    now = time.monotonic()
+    checked = _freshness.get(collection)
+    if checked is None or checked[0] < now:
+        synced_at = cache.get(SYNCED_KEY.format(collection=collection))
+        checked = (now + FRESHNESS_CHECK_INTERVAL, synced_at)
+        _freshness[collection] = checked
+    synced_at = checked[1]
+    return synced_at is not None and time.time() - synced_at <= get_mirror_settings()['MAX_LAG']
@@ -45,11 +45,27 @@ class Project(models.Model):
     completion_date = models.DateField(blank=True, null=True)
     category = models.ForeignKey(ProjectCategory, on_delete=models.SET_NULL, null=True, blank=True)
     featured = models.BooleanField(default=False, help_text="Show on homepage")
+    firestore_id = models.CharField(max_length=128, null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Homepage/related projects: featured=True, newest first. Partial, because
+            # SQLite filters booleans as WHERE "featured", which a (featured, ...) index can't serve
+            models.Index(
+                fields=['-created_at'], condition=models.Q(featured=True), name='project_featured_created_idx',
+            ),
+            # Keyset pages ordered by (-created_at, -id)
+            models.Index(fields=['-created_at', '-id'], name='project_created_idx'),
+        ]
+        constraints = [
+            # Partial, so adding it on SQLite doesn't rebuild the table (and drop the search triggers)
+            models.UniqueConstraint(
+                fields=['firestore_id'], condition=models.Q(firestore_id__isnull=False), name='project_firestore_id_unique',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.location}"
@@ -77,12 +93,26 @@ class ContactInquiry(models.Model):
         ],
         default='general'
     )
+    firestore_id = models.CharField(max_length=128, null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     responded = models.BooleanField(default=False)
 
     class Meta:
         verbose_name_plural = "Contact Inquiries"
         ordering = ['-created_at']
+        indexes = [
+            # Admin changelist: list_filter on responded/inquiry_type, date_hierarchy and ordering on created_at
+            models.Index(
+                fields=['-created_at'], condition=models.Q(responded=False), name='inquiry_unresponded_idx',
+            ),
+            models.Index(fields=['inquiry_type', '-created_at'], name='inquiry_type_created_idx'),
+            models.Index(fields=['-created_at'], name='inquiry_created_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['firestore_id'], condition=models.Q(firestore_id__isnull=False), name='inquiry_firestore_id_unique',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.inquiry_type}"
@@ -97,10 +127,22 @@ class Testimonial(models.Model):
     rating = models.IntegerField(choices=[(i, i) for i in range(1, 6)], default=5)
     client_image = models.URLField(blank=True, null=True)
     is_featured = models.BooleanField(default=False)
+    firestore_id = models.CharField(max_length=128, null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['-created_at'], condition=models.Q(is_featured=True), name='testimonial_featured_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['firestore_id'], condition=models.Q(firestore_id__isnull=False),
+                name='testimonial_firestore_id_unique',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.client_name} - {self.project_name}"
@@ -140,4 +182,33 @@ class CompanyInfo(models.Model):
         # Ensure only one instance exists
         if not self.pk and CompanyInfo.objects.exists():
             raise ValueError("Only one CompanyInfo instance is allowed")
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+
+class MirrorState(models.Model):
+    """Progress of the Firestore mirror (see core/mirror.py) for one collection"""
+    collection = models.CharField(max_length=100, unique=True)
+    watermark = models.DateTimeField(null=True, blank=True, help_text="Latest updated_at copied from Firestore")
+    synced_at = models.DateTimeField(null=True, blank=True)
+    full_synced_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.collection} @ {self.watermark}"
+
+
+class MirrorTombstone(models.Model):
+    """A Firestore document whose mirrored row was deleted"""
+    collection = models.CharField(max_length=100)
+    firestore_id = models.CharField(max_length=128)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['collection', 'firestore_id'], name='mirror_tombstone_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['collection', 'deleted_at'], name='mirror_tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.collection}/{self.firestore_id}"
@@ -0,0 +1,140 @@
+"""
+Keyset (cursor) pagination helpers for Srihari Developers website
+
+Pages are addressed by an opaque cursor that encodes the ``created_at``
+timestamp and ID of the last item on the previous page, so fetching any
+page costs the same regardless of how deep it is. The same cursor format
+is used for Firestore documents and Django model rows.
+"""
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+import base64
+import json
+
+
+DEFAULT_PAGE_SIZE = 12
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor token cannot be decoded"""
+
+
+def encode_cursor(created_at, item_id):
+    """
+    Build an opaque cursor token for the item a page ended on
+
+    Args:
+        created_at (datetime): Creation time of the last item
+        item_id (str or int): ID of the last item
+
+    Returns:
+        str: URL-safe cursor token
+    """
+    payload = json.dumps({'t': created_at.isoformat(), 'id': item_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Decode a cursor token produced by ``encode_cursor``
+
+    Args:
+        token (str): Cursor token from a request
+
+    Returns:
+        tuple: (created_at, item_id)
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        created_at = parse_datetime(payload['t'])
+        item_id = payload['id']
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {token}") from e
+    if created_at is None or not isinstance(item_id, (str, int)):
+        raise InvalidCursor(f"Invalid cursor: {token}")
+    return created_at, item_id
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """
+    Clamp a ``limit`` query parameter to a sane page size
+
+    Args:
+        value (str or None): Raw parameter value
+        default (int): Page size when the parameter is missing or invalid
+        maximum (int): Largest page size allowed
+
+    Returns:
+        int: Page size between 1 and ``maximum``
+    """
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, maximum))
+
+
+def paginate_queryset(queryset, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Fetch one keyset page from a queryset ordered by ``-created_at, -id``
+
+    Args:
+        queryset (QuerySet): Rows with ``created_at`` and ``id`` fields
+        cursor (tuple): Decoded (created_at, id) of the previous page's last row
+        limit (int): Page size
+
+    Returns:
+        tuple: (list of rows, next cursor token or None)
+    """
+    rows = list(keyset_filter(queryset, cursor)[:limit + 1])
+    return page_with_cursor(rows, limit, lambda row: (row.created_at, row.id))
+
+
+def keyset_filter(queryset, cursor=None):
+    """
+    Order a queryset by ``-created_at, -id`` and skip rows up to a cursor
+
+    Args:
+        queryset (QuerySet): Rows with ``created_at`` and ``id`` fields
+        cursor (tuple): Decoded (created_at, id) of the previous page's last row
+
+    Returns:
+        QuerySet: Rows after the cursor, newest first
+    """
+    queryset = queryset.order_by('-created_at', '-id')
+    if cursor is None:
+        return queryset
+    created_at, item_id = cursor
+    try:
+        item_id = int(item_id)
+    except (TypeError, ValueError) as e:
+        raise InvalidCursor(f"Invalid cursor ID: {item_id}") from e
+    # The redundant created_at <= bound lets the database walk a created_at index
+    return queryset.filter(
+        Q(created_at__lte=created_at),
+        Q(created_at__lt=created_at) | Q(id__lt=item_id),
+    )
+
+
+def page_with_cursor(items, limit, key):
+    """
+    Trim an over-fetched page and build the cursor for the next one
+
+    Args:
+        items (list): Up to ``limit + 1`` items in page order
+        limit (int): Page size
+        key (callable): Returns (created_at, id) for an item
+
+    Returns:
+        tuple: (list of at most ``limit`` items, next cursor token or None)
+    """
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    created_at, item_id = key(items[-1])
+    if created_at is None:
+        return items, None
+    return items, encode_cursor(created_at, item_id)
@@ -0,0 +1,189 @@
+"""
+Query budgets for Srihari Developers views
+
+Counts the ORM queries and Firestore RPCs each request makes, flags SQL
+that runs repeatedly with different parameters (the N+1 pattern), and
+checks the totals against budgets declared on views with ``query_budget``.
+
+The counting is done by a database execute wrapper installed on every
+connection, reporting into a context variable; it is only active inside
+``track_queries`` (the middleware and the ``check_query_budgets`` command).
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from django.conf import settings
+from django.db.backends.signals import connection_created
+import contextvars
+import logging
+import time
+
+from firebase_config.tracking import track_rpcs
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_QUERY_BUDGET_SETTINGS = {
+    'ENABLED': False,
+    'RAISE': False,
+    'HEADERS': True,
+    'DUPLICATE_THRESHOLD': 3,
+}
+
+
+def get_query_budget_settings():
+    """
+    Merge the project's QUERY_BUDGET setting over the defaults
+
+    Returns:
+        dict: Effective query budget settings
+    """
+    options = dict(DEFAULT_QUERY_BUDGET_SETTINGS)
+    options.update(getattr(settings, 'QUERY_BUDGET', {}))
+    return options
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a view goes over its budget or repeats a query"""
+
+
+class QueryStats:
+    """ORM queries and Firestore RPCs made while tracking"""
+
+    def __init__(self):
+        self.queries = []
+        self.query_time = 0.0
+        self.firestore = Counter()
+        self.firestore_time = 0.0
+
+    def record_rpc(self, label, seconds, error=None):
+        """Count one Firestore RPC; used as the ``track_rpcs`` recorder"""
+        self.firestore[label] += 1
+        self.firestore_time += seconds
+
+    @property
+    def query_count(self):
+        return len(self.queries)
+
+    @property
+    def firestore_count(self):
+        return sum(self.firestore.values())
+
+    def duplicates(self, threshold):
+        """
+        Find SQL statements run at least ``threshold`` times
+
+        Statements are compared before parameters are bound, so a query
+        repeated per row with a different ID counts as the same statement.
+
+        Returns:
+            dict: SQL -> number of executions
+        """
+        counts = Counter(self.queries)
+        return {sql: count for sql, count in counts.items() if count >= threshold}
+
+    def violations(self, budget=None, threshold=3):
+        """
+        Describe every way these stats break ``budget``
+
+        Args:
+            budget (dict): 'queries' and/or 'firestore' limits, or None
+            threshold (int): Repeats of one statement flagged as N+1
+
+        Returns:
+            list: Human-readable problems, empty when within budget
+        """
+        problems = []
+        budget = budget or {}
+        if budget.get('queries') is not None and self.query_count > budget['queries']:
+            problems.append(f"{self.query_count} SQL queries, budget is {budget['queries']}")
+        if budget.get('firestore') is not None and self.firestore_count > budget['firestore']:
+            problems.append(f"{self.firestore_count} Firestore RPCs, budget is {budget['firestore']}")
+        for sql, count in self.duplicates(threshold).items():
+            problems.append(f"Repeated {count} times (N+1?): {sql}")
+        return problems
+
+
+_current = contextvars.ContextVar('query_stats', default=None)
+
+
+def _count_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries.append(sql)
+        stats.query_time += time.perf_counter() - start
+
+
+def _install_wrapper(sender, connection, **kwargs):
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+def install():
+    """Count queries on every database connection opened from now on"""
+    connection_created.connect(_install_wrapper, dispatch_uid='core.querybudget')
+
+
+@contextmanager
+def track_queries():
+    """
+    Collect ORM queries and Firestore RPCs made in this context
+
+    Nested calls share the outer stats, so the metrics and query budget
+    middleware see the same numbers for a request.
+
+    Yields:
+        QueryStats: Filled in as queries run
+    """
+    stats = _current.get()
+    if stats is not None:
+        yield stats
+        return
+
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        with track_rpcs(stats.record_rpc):
+            yield stats
+    finally:
+        _current.reset(token)
+
+
+def query_budget(queries=None, firestore=None):
+    """
+    Declare how many SQL queries and Firestore RPCs a view may make
+
+    Budgets cover a cold request: empty query cache, no page cache hit.
+
+    Args:
+        queries (int): Maximum ORM queries, or None for no limit
+        firestore (int): Maximum Firestore RPCs, or None for no limit
+    """
+    def decorator(view_func):
+        view_func.query_budget = {'queries': queries, 'firestore': firestore}
+        return view_func
+    return decorator
+
+
+def get_view_budget(view_func):
+    """Budget declared on ``view_func`` with ``query_budget``, or None"""
+    return getattr(view_func, 'query_budget', None)
+
+
+def assert_query_budget(stats, budget=None, threshold=None):
+    """
+    Fail when ``stats`` breaks ``budget`` or contains N+1 repeats
+
+    Raises:
+        QueryBudgetExceeded: Listing every problem found
+    """
+    if threshold is None:
+        threshold = get_query_budget_settings()['DUPLICATE_THRESHOLD']
+    problems = stats.violations(budget, threshold)
+    if problems:
+        raise QueryBudgetExceeded('\n'.join(problems))
@@ -0,0 +1,466 @@
+"""
+Content repository for Srihari Developers website
+
+Views read projects and testimonials through one API that returns
+``Record`` objects, whichever store served them. Firestore reads go through
+the service layer (and its query cache); the Django models are the other
+source.
+
+Each collection has an authoritative source. In the default ``auto`` mode
+it is learned from the first read: a non-empty Firestore result makes
+Firestore authoritative, and an empty collection makes the Django models
+authoritative, so later reads go straight to the database instead of
+paying a Firestore round trip first. The decision is kept per worker for
+``DECISION_TTL`` seconds or until the collection changes in Firestore.
+A failed Firestore read is never taken for an empty one: it is served
+from the models, whatever the decided source, and noted for
+``track_fallbacks`` so the page is not cached as the real content.
+
+In ``mirror`` mode, collections kept up to date by ``sync_firestore`` (see
+core/mirror.py) are read from the models; if the mirror falls behind by
+more than its MAX_LAG, reads fall back to ``auto``.
+"""
+
+from asgiref.sync import sync_to_async
+from contextlib import contextmanager
+from django.conf import settings
+import contextvars
+import threading
+import asyncio
+import logging
+import time
+
+from .mirror import mirror_is_fresh
+from .models import Project, Testimonial
+from .pagination import DEFAULT_PAGE_SIZE, keyset_filter, page_with_cursor
+
+# Firebase integration (disable for Vercel deployment)
+try:
+    from firebase_config.utils import project_service, testimonial_service
+    from firebase_config.utils import FirestoreReadError
+    from firebase_config.async_utils import async_project_service, async_testimonial_service
+except ImportError:
+    project_service = None
+    testimonial_service = None
+    async_project_service = None
+    async_testimonial_service = None
+    # Never raised: without the services no Firestore read is attempted
+    FirestoreReadError = Exception
+
+logger = logging.getLogger(__name__)
+
+FIRESTORE = 'firestore'
+ORM = 'orm'
+MIRROR = 'mirror'
+
+DEFAULT_REPOSITORY_SETTINGS = {
+    'SOURCE': 'auto',
+    'DECISION_TTL': 300,
+}
+
+
+def get_repository_settings():
+    """
+    Merge the project's CONTENT_REPOSITORY setting over the defaults
+
+    Returns:
+        dict: Effective repository settings
+    """
+    options = dict(DEFAULT_REPOSITORY_SETTINGS)
+    options.update(getattr(settings, 'CONTENT_REPOSITORY', {}))
+    return options
+
+
+class Record(dict):
+    """
+    A project or testimonial with the same keys whichever source served it
+
+    Always carries ``id``; foreign keys are flattened to their display
+    name. ``source`` names the store the record was read from.
+    """
+
+    __slots__ = ('source',)
+
+    def __init__(self, data, source):
+        super().__init__(data)
+        self.source = source
+
+    @classmethod
+    def from_document(cls, document, fields=None):
+        """
+        Build a record from a Firestore document dict
+
+        Args:
+            document (dict): Document data carrying its ``id``
+            fields (tuple): Keep only these fields, or None for all
+
+        Returns:
+            Record: Normalized record
+        """
+        if fields is None:
+            return cls(document, FIRESTORE)
+        data = {'id': document.get('id')}
+        data.update((field, document.get(field)) for field in fields)
+        return cls(data, FIRESTORE)
+
+    @classmethod
+    def from_instance(cls, instance, fields=None):
+        """
+        Build a record from a Django model instance
+
+        Args:
+            instance (Model): Row to convert; relations in ``fields`` should
+                be loaded with ``select_related``
+            fields (tuple): Keep only these fields, or None for all
+
+        Returns:
+            Record: Normalized record
+        """
+        data = {'id': instance.pk}
+        for field in instance._meta.concrete_fields:
+            if field.primary_key or (fields is not None and field.name not in fields):
+                continue
+            if field.is_relation:
+                related = getattr(instance, field.name)
+                data[field.name] = str(related) if related is not None else None
+            else:
+                data[field.name] = field.value_from_object(instance)
+        return cls(data, ORM)
+
+
+_decisions = {}
+_decisions_lock = threading.Lock()
+
+_fallbacks = contextvars.ContextVar('repository_fallbacks', default=None)
+
+
+@contextmanager
+def track_fallbacks():
+    """
+    Collect the collections served from the models because Firestore failed
+
+    Nested calls share the outer set, and concurrent reads gathered in this
+    context report into it too.
+
+    Yields:
+        set: Collection names, filled in as reads fall back
+    """
+    collections = _fallbacks.get()
+    if collections is not None:
+        yield collections
+        return
+
+    collections = set()
+    token = _fallbacks.set(collections)
+    try:
+        yield collections
+    finally:
+        _fallbacks.reset(token)
+
+
+def forget_source(collection):
+    """
+    Drop the remembered source of a collection, e.g. after it changed in Firestore
+
+    Args:
+        collection (str): Firestore collection name
+    """
+    with _decisions_lock:
+        _decisions.pop(collection, None)
+
+
+class ContentRepository:
+    """Reads one kind of content from its authoritative source"""
+
+    COLLECTION_NAME = None
+    model = None
+
+    def __init__(self, service=None, async_service=None):
+        self.service = service
+        self.async_service = async_service
+
+    def source(self):
+        """
+        Get the authoritative source for this collection
+
+        Returns:
+            str or None: FIRESTORE, ORM, or None while undecided
+        """
+        configured = get_repository_settings()['SOURCE']
+        if configured in (FIRESTORE, ORM):
+            return configured
+        if configured == MIRROR and mirror_is_fresh(self.COLLECTION_NAME):
+            return ORM
+        decision = _decisions.get(self.COLLECTION_NAME)
+        if decision is None or decision[1] < time.monotonic():
+            return None
+        return decision[0]
+
+    def remember(self, source):
+        """Record ``source`` as authoritative for DECISION_TTL seconds"""
+        options = get_repository_settings()
+        if options['SOURCE'] not in ('auto', MIRROR):
+            return
+        with _decisions_lock:
+            previous = _decisions.get(self.COLLECTION_NAME)
+            if previous is None or previous[0] != source:
+                logger.info(f"Serving {self.COLLECTION_NAME} from {source}")
+            _decisions[self.COLLECTION_NAME] = (source, time.monotonic() + options['DECISION_TTL'])
+
+    def resolve_source(self):
+        """
+        Decide the authoritative source now instead of on the first read
+
+        Returns:
+            str or None: The decided source, or None if Firestore could not
+            be asked
+        """
+        source = self.source()
+        if source is None and self.service is not None:
+            populated = self.service.has_documents()
+            if populated is not None:
+                self.remember(FIRESTORE if populated else ORM)
+                source = FIRESTORE if populated else ORM
+        return source
+
+    def _accept_empty(self, populated):
+        """
+        Decide whether an empty Firestore result is the answer
+
+        Args:
+            populated (bool or None): Result of ``service.has_documents()``
+
+        Returns:
+            bool: True to serve the empty result, False to read the models
+        """
+        if populated is None:
+            # Firestore is down; the models are the best we have
+            return False
+        self.remember(FIRESTORE if populated else ORM)
+        return populated or self.source() == FIRESTORE
+
+    def _fell_back(self):
+        """Note that a Firestore read failed and the models answered instead"""
+        collections = _fallbacks.get()
+        if collections is not None:
+            collections.add(self.COLLECTION_NAME)
+
+    def _fetch(self, firestore_read, orm_read):
+        """
+        Read from the authoritative source
+
+        Args:
+            firestore_read (callable): Returns a list of records from Firestore;
+                raises ``FirestoreReadError`` if the read failed
+            orm_read (callable): Returns a list of records from the models
+
+        Returns:
+            tuple: (list of records, source that served them)
+        """
+        if self.source() != ORM and self.service is not None:
+            try:
+                records = firestore_read()
+            except FirestoreReadError:
+                self._fell_back()
+                return orm_read(), ORM
+            # Configured rather than learned: an empty result is the answer
+            if records or get_repository_settings()['SOURCE'] == FIRESTORE:
+                self.remember(FIRESTORE)
+                return records, FIRESTORE
+            if self._accept_empty(self.service.has_documents()):
+                return records, FIRESTORE
+        return orm_read(), ORM
+
+    async def _afetch(self, firestore_read, orm_read):
+        """
+        Async ``_fetch``; ``firestore_read`` is a coroutine function
+
+        Returns:
+            tuple: (list of records, source that served them)
+        """
+        if self.source() != ORM and self.async_service is not None:
+            try:
+                records = await firestore_read()
+            except FirestoreReadError:
+                self._fell_back()
+                return await sync_to_async(orm_read)(), ORM
+            # Configured rather than learned: an empty result is the answer
+            if records or get_repository_settings()['SOURCE'] == FIRESTORE:
+                self.remember(FIRESTORE)
+                return records, FIRESTORE
+            if self._accept_empty(await sync_to_async(self.service.has_documents)()):
+                return records, FIRESTORE
+        return await sync_to_async(orm_read)(), ORM
+
+    def _queryset(self, fields=None):
+        """Model rows limited to ``fields``, with relations among them joined"""
+        queryset = self.model.objects.all()
+        if fields is not None:
+            queryset = queryset.only('id', *fields)
+        relations = [
+            field.name for field in self.model._meta.concrete_fields
+            if field.is_relation and (fields is None or field.name in fields)
+        ]
+        if relations:
+            queryset = queryset.select_related(*relations)
+        return queryset
+
+    @staticmethod
+    def _records(instances, fields=None):
+        return [Record.from_instance(instance, fields) for instance in instances]
+
+    @staticmethod
+    def _documents(documents, fields=None):
+        return [Record.from_document(document, fields) for document in documents]
+
+
+class ProjectRepository(ContentRepository):
+    """Projects from Firestore or the Project model"""
+
+    COLLECTION_NAME = 'projects'
+    model = Project
+
+    def page(self, cursor=None, limit=DEFAULT_PAGE_SIZE, fields=None, with_total=True):
+        """
+        Get one keyset page of projects, newest first
+
+        Args:
+            cursor (tuple): Decoded cursor of the previous page, or None
+            limit (int): Page size
+            fields (tuple): Fields to read; ``created_at`` is always added
+            with_total (bool): Also count all projects
+
+        Returns:
+            tuple: (records, next cursor token or None, total project count
+            or None when ``with_total`` is False)
+
+        Raises:
+            InvalidCursor: If the cursor does not fit the models' IDs
+        """
+        read_fields = tuple(fields) + ('created_at',) if fields is not None else None
+
+        def from_firestore():
+            documents = self.service.get_projects_page(limit=limit, after=cursor, fields=read_fields)
+            return self._documents(documents, read_fields)
+
+        def from_orm():
+            rows = keyset_filter(self._queryset(read_fields), cursor)[:limit + 1]
+            return self._records(rows, read_fields)
+
+        records, source = self._fetch(from_firestore, from_orm)
+        page, next_cursor = page_with_cursor(records, limit, lambda record: (record.get('created_at'), record['id']))
+        total = None
+        if with_total:
+            total = self._count(source)
+        return page, next_cursor, total
+
+    def _count(self, source):
+        """Count projects in ``source``, falling back to the models if Firestore fails"""
+        if source == FIRESTORE:
+            try:
+                return self.service.count_projects()
+            except FirestoreReadError:
+                self._fell_back()
+        return Project.objects.count()
+
+    def featured(self, limit=6, fields=None):
+        """
+        Get featured projects, newest first
+
+        Args:
+            limit (int): Maximum number of projects to return
+            fields (tuple): Fields to read, or None for all
+
+        Returns:
+            list: Project records
+        """
+        records, _ = self._fetch(
+            lambda: self._documents(self.service.get_featured_projects(limit=limit), fields),
+            lambda: self._featured_from_orm(limit, fields),
+        )
+        return records
+
+    async def afeatured(self, limit=6, fields=None):
+        """Async ``featured``"""
+        async def from_firestore():
+            return self._documents(await self.async_service.get_featured_projects(limit=limit), fields)
+
+        records, _ = await self._afetch(from_firestore, lambda: self._featured_from_orm(limit, fields))
+        return records
+
+    async def adetail(self, project_id, related_limit=4):
+        """
+        Get a project and other featured projects to show beside it
+
+        Args:
+            project_id (str): Firestore document ID or model primary key
+            related_limit (int): Maximum number of related projects
+
+        Returns:
+            tuple: (project record or None, list of related project records)
+        """
+        related = []
+
+        async def from_firestore():
+            nonlocal related
+            project, featured = await asyncio.gather(
+                self.async_service.get_project_by_id(project_id),
+                self.async_service.get_featured_projects(limit=related_limit + 1),
+            )
+            related = [p for p in self._documents(featured) if p.get('id') != project_id][:related_limit]
+            return self._documents([project]) if project else []
+
+        def from_orm():
+            nonlocal related
+            try:
+                project = self._queryset().get(id=project_id)
+            except (Project.DoesNotExist, ValueError):
+                return []
+            related = self._records(self._queryset().filter(featured=True).exclude(id=project.id)[:related_limit])
+            return [Record.from_instance(project)]
+
+        records, _ = await self._afetch(from_firestore, from_orm)
+        return (records[0] if records else None), related
+
+    def _featured_from_orm(self, limit, fields):
+        return self._records(self._queryset(fields).filter(featured=True)[:limit], fields)
+
+
+class TestimonialRepository(ContentRepository):
+    """Testimonials from Firestore or the Testimonial model"""
+
+    COLLECTION_NAME = 'testimonials'
+    model = Testimonial
+
+    def featured(self, limit=6, fields=None):
+        """
+        Get featured testimonials, newest first
+
+        Args:
+            limit (int): Maximum number of testimonials to return
+            fields (tuple): Fields to read, or None for all
+
+        Returns:
+            list: Testimonial records
+        """
+        records, _ = self._fetch(
+            lambda: self._documents(self.service.get_featured_testimonials(limit=limit, fields=fields), fields),
+            lambda: self._featured_from_orm(limit, fields),
+        )
+        return records
+
+    async def afeatured(self, limit=6, fields=None):
+        """Async ``featured``"""
+        async def from_firestore():
+            documents = await self.async_service.get_featured_testimonials(limit=limit, fields=fields)
+            return self._documents(documents, fields)
+
+        records, _ = await self._afetch(from_firestore, lambda: self._featured_from_orm(limit, fields))
+        return records
+
+    def _featured_from_orm(self, limit, fields):
+        return self._records(self._queryset(fields).filter(is_featured=True)[:limit], fields)
+
+
+project_repository = ProjectRepository(project_service, async_project_service)
+testimonial_repository = TestimonialRepository(testimonial_service, async_testimonial_service)
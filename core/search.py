@@ -0,0 +1,149 @@
+"""
+Full-text search for Srihari Developers website
+
+Projects and contact inquiries are indexed in SQLite FTS5 tables (created
+by migration 0004 and kept in sync by triggers), so searches use the index
+instead of ``LIKE '%term%'`` scans. When the index is missing, e.g. on
+another database backend, searches fall back to ``icontains`` filters.
+"""
+
+from django.db import DatabaseError, connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+import logging
+
+from .models import ContactInquiry, Project
+
+logger = logging.getLogger(__name__)
+
+# Model -> (FTS5 table, indexed columns, bm25 weight per column)
+SEARCH_INDEXES = {
+    Project: ('core_project_fts', ('name', 'location', 'description'), (10.0, 5.0, 1.0)),
+    ContactInquiry: ('core_contactinquiry_fts', ('name', 'email', 'phone', 'message'), (10.0, 10.0, 10.0, 1.0)),
+}
+
+_available_tables = {}
+
+
+def fts_available(model):
+    """
+    Check whether the FTS5 index for ``model`` exists in the database
+
+    Args:
+        model (Model): A model in SEARCH_INDEXES
+
+    Returns:
+        bool: True when searches can use the index
+    """
+    table = SEARCH_INDEXES[model][0]
+    key = (connection.alias, table)
+    if key not in _available_tables:
+        _available_tables[key] = (
+            connection.vendor == 'sqlite' and table in connection.introspection.table_names()
+        )
+    return _available_tables[key]
+
+
+def match_expression(text):
+    """
+    Turn user input into a safe FTS5 MATCH expression
+
+    Every whitespace-separated term is quoted (so FTS5 operators in the
+    input are plain text) and matched as a prefix; all terms must match.
+
+    Args:
+        text (str): Search box input
+
+    Returns:
+        str: MATCH expression, or '' when there is nothing to search for
+    """
+    terms = [term.replace('"', '""') for term in text.split()]
+    return ' '.join(f'"{term}"*' for term in terms if term.strip('"'))
+
+
+def filter_queryset(queryset, text):
+    """
+    Narrow a queryset to rows matching ``text``, keeping its ordering
+
+    Args:
+        queryset (QuerySet): Rows of a model in SEARCH_INDEXES
+        text (str): Search input
+
+    Returns:
+        QuerySet: Matching rows
+    """
+    model = queryset.model
+    table, columns, _ = SEARCH_INDEXES[model]
+    expression = match_expression(text)
+    if not expression:
+        return queryset
+    if not fts_available(model):
+        return queryset.filter(_contains(columns, text))
+    return queryset.filter(
+        pk__in=RawSQL(f'SELECT rowid FROM {table} WHERE {table} MATCH %s', [expression])
+    )
+
+
+def ranked_ids(model, text, limit, offset=0):
+    """
+    Get IDs of the best matches for ``text``, best first
+
+    Args:
+        model (Model): A model in SEARCH_INDEXES
+        text (str): Search input
+        limit (int): Maximum number of IDs
+        offset (int): Number of better matches to skip
+
+    Returns:
+        list: Primary keys in rank order
+    """
+    table, columns, weights = SEARCH_INDEXES[model]
+    expression = match_expression(text)
+    if not expression:
+        return []
+    if not fts_available(model):
+        # Without the index there is no relevance score; newest first instead
+        queryset = model.objects.filter(_contains(columns, text)).order_by('-created_at', '-id')
+        return list(queryset.values_list('pk', flat=True)[offset:offset + limit])
+
+    weight_args = ', '.join(str(weight) for weight in weights)
+    sql = (
+        f'SELECT rowid FROM {table} WHERE {table} MATCH %s '
+        f'ORDER BY bm25({table}, {weight_args}), rowid DESC LIMIT %s OFFSET %s'
+    )
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [expression, limit, offset])
+            return [row[0] for row in cursor.fetchall()]
+    except DatabaseError as e:
+        logger.error(f"Full-text search on {table} failed: {str(e)}")
+        return []
+
+
+def search(queryset, text, limit, offset=0):
+    """
+    Get the best matching rows for ``text``, best first
+
+    Args:
+        queryset (QuerySet): Rows of a model in SEARCH_INDEXES, e.g. with ``only()``
+        text (str): Search input
+        limit (int): Maximum number of rows
+        offset (int): Number of better matches to skip
+
+    Returns:
+        list: Model instances in rank order
+    """
+    ids = ranked_ids(queryset.model, text, limit, offset)
+    rows = queryset.in_bulk(ids)
+    return [rows[pk] for pk in ids if pk in rows]
+
+
+def _contains(columns, text):
+    """``icontains`` fallback: every term must appear in some column"""
+    condition = Q()
+    for term in text.split():
+        term_condition = Q()
+        for column in columns:
+            term_condition |= Q(**{f'{column}__icontains': term})
+        condition &= term_condition
+    return condition
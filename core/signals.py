@@ -0,0 +1,32 @@
+"""
+Signal handlers for Srihari Developers core app
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .caching import bump_version, clear_company_info
+from .models import CompanyInfo, Project, ProjectCategory, Testimonial
+
+
+@receiver([post_save, post_delete], sender=CompanyInfo)
+def invalidate_company_info(sender, **kwargs):
+    """Make every worker reload CompanyInfo after it changes"""
+    clear_company_info()
+    bump_version('company_info')
+
+
+@receiver([post_save, post_delete], sender=Project)
+@receiver([post_save, post_delete], sender=ProjectCategory)
+def invalidate_projects(sender, **kwargs):
+    """Expire cached pages and validators that show projects"""
+    bump_version('projects')
+    if sender is ProjectCategory:
+        # Project cards show the category name; see core/cards.py
+        bump_version('project_categories')
+
+
+@receiver([post_save, post_delete], sender=Testimonial)
+def invalidate_testimonials(sender, **kwargs):
+    """Expire cached pages and validators that show testimonials"""
+    bump_version('testimonials')
@@ -412,6 +412,41 @@ function initializeAnimations() {
     initializeCounters();
 }
 
+/**
+ * Scroll reveal for [data-aos] elements
+ * Stands in for the AOS library: adds 'aos-animate' as elements scroll into
+ * view; the animation styles are generated by manage.py build_assets
+ */
+function initializeScrollReveal(options = {}) {
+    const settings = Object.assign({ duration: 400, delay: 0, offset: 120, once: false }, options);
+    const elements = document.querySelectorAll('[data-aos]');
+
+    elements.forEach(el => {
+        el.style.transitionDuration = `${el.dataset.aosDuration || settings.duration}ms`;
+        el.style.transitionDelay = `${el.dataset.aosDelay || settings.delay}ms`;
+    });
+
+    if (!('IntersectionObserver' in window)) {
+        elements.forEach(el => el.classList.add('aos-animate'));
+        return;
+    }
+
+    const observer = new IntersectionObserver(function(entries) {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                entry.target.classList.add('aos-animate');
+                if (settings.once) {
+                    observer.unobserve(entry.target);
+                }
+            } else if (!settings.once) {
+                entry.target.classList.remove('aos-animate');
+            }
+        });
+    }, { rootMargin: `0px 0px -${settings.offset}px 0px` });
+
+    elements.forEach(el => observer.observe(el));
+}
+
 /**
  * Initialize counter animations
  */
@@ -0,0 +1,59 @@
+"""
+Static file storage for Srihari Developers website
+
+``collectstatic`` writes every file under a content-hashed name (e.g.
+``css/style.3f2a9c1b7e4d.css``) next to Brotli and gzip copies, and records
+the mapping in ``staticfiles.json``. WhiteNoise serves hashed names with
+``Cache-Control: max-age=315360000, public, immutable``, so repeat visitors
+use their cached copy without revalidating. A new deploy changes the hash,
+and therefore the URL, of every file whose content changed.
+
+Django's manifest storage refuses to run ``collectstatic`` when a stylesheet
+references a file that does not exist, and ``{% static %}`` raises for
+names missing from the manifest. Here both fall back to the unhashed name
+and log a warning instead, so one stale ``url()`` or missing image does not
+break a deploy or a page.
+"""
+
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ForgivingManifestStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """Hashed, precompressed static files that tolerate missing references"""
+
+    manifest_strict = False
+
+    _collecting = False
+
+    def post_process(self, *args, **kwargs):
+        self._collecting = True
+        try:
+            yield from super().post_process(*args, **kwargs)
+        finally:
+            self._collecting = False
+
+    def hashed_name(self, name, content=None, filename=None):
+        """
+        Return the hashed name of a static file, or ``name`` if it is missing
+
+        Args:
+            name (str): Static path, possibly with a query string or fragment
+            content (File): File contents, when already open
+            filename (str): Path to hash instead of ``name``
+
+        Returns:
+            str: Hashed name, or ``name`` unchanged when the file does not exist
+        """
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            if content is not None:
+                raise
+            # At runtime this is also reached by WhiteNoise probing for
+            # hashed names, so only collectstatic reports it as a warning
+            log = logger.warning if self._collecting else logger.debug
+            log(f"Static file not found, leaving the reference unhashed: {name}")
+            return name
@@ -0,0 +1,808 @@
+"""
+Build-time Tailwind-compatible utility CSS
+
+Generates the rules for the Tailwind v3 utility classes the templates
+actually use, so pages no longer load cdn.tailwindcss.com and compile
+styles in the browser. Only the utilities, values and variants this site
+uses are supported; ``generate_utilities()`` reports any other class it is
+given so a new utility is noticed rather than silently unstyled.
+
+The brand colours and font families are the ones base.html used to pass to
+``tailwind.config``.
+
+This is not the standalone Tailwind CLI on purpose. The only build of it
+that installs without network access to GitHub or npm is the v4 binary
+(``tailwindcss-bin`` on PyPI, ~110 MB per platform). v4 drops utilities the
+templates rely on (``bg-opacity-*``, ``flex-shrink-*``), changes what
+``ring``, ``outline-none`` and the ``shadow``/``rounded`` scales produce, and
+emits ``@layer``/``@property`` rules the critical-CSS extractor in
+core/assets.py does not handle. Adopting it means migrating and re-checking
+every template. Until then, ``unsupported_utilities()`` makes
+``build_assets --check`` fail on any Tailwind class the markup uses that
+this module cannot generate, so a new one is added here, not missed.
+"""
+
+import re
+
+BRAND_COLORS = {
+    'brand-maroon': '#800000',
+    'brand-gold': '#CBA135',
+    'brand-cream': '#FFF8E1',
+    'brand-light-gold': '#F5E6A3',
+}
+
+FONT_FAMILIES = {
+    'playfair': "'Playfair Display', serif",
+    'poppins': "'Poppins', sans-serif",
+}
+
+# Tailwind v3 default palette, for the colour families this site uses
+PALETTE = {
+    'gray': ('#f9fafb', '#f3f4f6', '#e5e7eb', '#d1d5db', '#9ca3af', '#6b7280', '#4b5563', '#374151', '#1f2937', '#111827', '#030712'),
+    'red': ('#fef2f2', '#fee2e2', '#fecaca', '#fca5a5', '#f87171', '#ef4444', '#dc2626', '#b91c1c', '#991b1b', '#7f1d1d', '#450a0a'),
+    'yellow': ('#fefce8', '#fef9c3', '#fef08a', '#fde047', '#facc15', '#eab308', '#ca8a04', '#a16207', '#854d0e', '#713f12', '#422006'),
+    'green': ('#f0fdf4', '#dcfce7', '#bbf7d0', '#86efac', '#4ade80', '#22c55e', '#16a34a', '#15803d', '#166534', '#14532d', '#052e16'),
+    'blue': ('#eff6ff', '#dbeafe', '#bfdbfe', '#93c5fd', '#60a5fa', '#3b82f6', '#2563eb', '#1d4ed8', '#1e40af', '#1e3a8a', '#172554'),
+    'pink': ('#fdf2f8', '#fce7f3', '#fbcfe8', '#f9a8d4', '#f472b6', '#ec4899', '#db2777', '#be185d', '#9d174d', '#831843', '#500724'),
+}
+SHADES = ('50', '100', '200', '300', '400', '500', '600', '700', '800', '900', '950')
+
+COLORS = {'black': '#000000', 'white': '#ffffff'}
+COLORS.update(BRAND_COLORS)
+for _family, _values in PALETTE.items():
+    COLORS.update({f"{_family}-{shade}": value for shade, value in zip(SHADES, _values)})
+
+SPECIAL_COLORS = {'transparent': 'transparent', 'current': 'currentColor', 'inherit': 'inherit'}
+
+SPACING_KEYS = (
+    '0', 'px', '0.5', '1', '1.5', '2', '2.5', '3', '3.5', '4', '5', '6', '7', '8', '9', '10', '11', '12',
+    '14', '16', '20', '24', '28', '32', '36', '40', '44', '48', '52', '56', '60', '64', '72', '80', '96',
+)
+
+SCREENS = (('sm', '640px'), ('md', '768px'), ('lg', '1024px'), ('xl', '1280px'), ('2xl', '1536px'))
+
+# Pseudo-class variants, in the order Tailwind emits them
+PSEUDO_VARIANTS = {
+    'first': lambda selector: f"{selector}:first-child",
+    'last': lambda selector: f"{selector}:last-child",
+    'group-hover': lambda selector: f".group:hover {selector}",
+    'group-focus': lambda selector: f".group:focus {selector}",
+    'focus-within': lambda selector: f"{selector}:focus-within",
+    'hover': lambda selector: f"{selector}:hover",
+    'focus': lambda selector: f"{selector}:focus",
+    'active': lambda selector: f"{selector}:active",
+    'disabled': lambda selector: f"{selector}:disabled",
+}
+
+FONT_SIZES = {
+    'xs': ('0.75rem', '1rem'), 'sm': ('0.875rem', '1.25rem'), 'base': ('1rem', '1.5rem'),
+    'lg': ('1.125rem', '1.75rem'), 'xl': ('1.25rem', '1.75rem'), '2xl': ('1.5rem', '2rem'),
+    '3xl': ('1.875rem', '2.25rem'), '4xl': ('2.25rem', '2.5rem'), '5xl': ('3rem', '1'),
+    '6xl': ('3.75rem', '1'), '7xl': ('4.5rem', '1'), '8xl': ('6rem', '1'), '9xl': ('8rem', '1'),
+}
+FONT_WEIGHTS = {
+    'thin': '100', 'extralight': '200', 'light': '300', 'normal': '400', 'medium': '500',
+    'semibold': '600', 'bold': '700', 'extrabold': '800', 'black': '900',
+}
+LINE_HEIGHTS = {
+    'none': '1', 'tight': '1.25', 'snug': '1.375', 'normal': '1.5', 'relaxed': '1.625', 'loose': '2',
+}
+MAX_WIDTHS = {
+    'none': 'none', 'xs': '20rem', 'sm': '24rem', 'md': '28rem', 'lg': '32rem', 'xl': '36rem',
+    '2xl': '42rem', '3xl': '48rem', '4xl': '56rem', '5xl': '64rem', '6xl': '72rem', '7xl': '80rem',
+    'full': '100%', 'prose': '65ch', 'screen-sm': '640px', 'screen-md': '768px', 'screen-lg': '1024px',
+}
+RADII = {
+    'none': '0px', 'sm': '0.125rem', '': '0.25rem', 'md': '0.375rem', 'lg': '0.5rem',
+    'xl': '0.75rem', '2xl': '1rem', '3xl': '1.5rem', 'full': '9999px',
+}
+SHADOWS = {
+    'sm': ('0 1px 2px 0 rgb(0 0 0 / 0.05)', '0 1px 2px 0 var(--tw-shadow-color)'),
+    '': (
+        '0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)',
+        '0 1px 3px 0 var(--tw-shadow-color), 0 1px 2px -1px var(--tw-shadow-color)',
+    ),
+    'md': (
+        '0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)',
+        '0 4px 6px -1px var(--tw-shadow-color), 0 2px 4px -2px var(--tw-shadow-color)',
+    ),
+    'lg': (
+        '0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)',
+        '0 10px 15px -3px var(--tw-shadow-color), 0 4px 6px -4px var(--tw-shadow-color)',
+    ),
+    'xl': (
+        '0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)',
+        '0 20px 25px -5px var(--tw-shadow-color), 0 8px 10px -6px var(--tw-shadow-color)',
+    ),
+    '2xl': ('0 25px 50px -12px rgb(0 0 0 / 0.25)', '0 25px 50px -12px var(--tw-shadow-color)'),
+    'none': ('0 0 #0000', '0 0 #0000'),
+}
+TRANSITIONS = {
+    '': 'color, background-color, border-color, text-decoration-color, fill, stroke, opacity, box-shadow, transform, filter, backdrop-filter',
+    'all': 'all',
+    'colors': 'color, background-color, border-color, text-decoration-color, fill, stroke',
+    'opacity': 'opacity',
+    'shadow': 'box-shadow',
+    'transform': 'transform',
+}
+DISPLAYS = (
+    'block', 'inline-block', 'inline', 'flex', 'inline-flex', 'table', 'grid', 'inline-grid',
+    'contents', 'list-item', 'hidden',
+)
+
+TRANSFORM = (
+    'translate(var(--tw-translate-x), var(--tw-translate-y)) rotate(var(--tw-rotate)) '
+    'skewX(var(--tw-skew-x)) skewY(var(--tw-skew-y)) scaleX(var(--tw-scale-x)) scaleY(var(--tw-scale-y))'
+)
+SPACE_SELECTOR = ' > :not([hidden]) ~ :not([hidden])'
+NUMBER_RE = re.compile(r'^\d+(\.\d+)?$')
+
+
+def _spacing(key, negative=False):
+    if key == 'px':
+        value = '1px'
+    elif key == '0':
+        value = '0px'
+    elif key in SPACING_KEYS:
+        value = f"{float(key) * 0.25:g}rem"
+    else:
+        return None
+    return f"-{value}" if negative and key != '0' else value
+
+
+def _fraction(key):
+    if re.match(r'^\d+/\d+$', key):
+        numerator, denominator = key.split('/')
+        return f"{int(numerator) / int(denominator) * 100:g}%"
+    return None
+
+
+def _opacity(key):
+    if NUMBER_RE.match(key) and int(float(key)) <= 100 and float(key) % 5 == 0:
+        return f"{float(key) / 100:g}"
+    return None
+
+
+def _rgb(hex_color):
+    hex_color = hex_color.lstrip('#')
+    return ' '.join(str(int(hex_color[i:i + 2], 16)) for i in (0, 2, 4))
+
+
+def _color(name, prop, opacity_var):
+    if name in SPECIAL_COLORS:
+        return [(prop, SPECIAL_COLORS[name])]
+    if name in COLORS:
+        return [(opacity_var, '1'), (prop, f"rgb({_rgb(COLORS[name])} / var({opacity_var}))")]
+    return None
+
+
+def _gradient_stop(kind, name):
+    if name in SPECIAL_COLORS and name != 'transparent':
+        return None
+    color = 'transparent' if name == 'transparent' else COLORS.get(name)
+    if color is None:
+        return None
+    faded = 'rgb(0 0 0 / 0)' if name == 'transparent' else f"rgb({_rgb(color)} / 0)"
+    color = color.lower()
+    if kind == 'from':
+        return [
+            ('--tw-gradient-from', f"{color} var(--tw-gradient-from-position)"),
+            ('--tw-gradient-to', f"{faded} var(--tw-gradient-to-position)"),
+            ('--tw-gradient-stops', 'var(--tw-gradient-from), var(--tw-gradient-to)'),
+        ]
+    if kind == 'via':
+        return [
+            ('--tw-gradient-to', f"{faded} var(--tw-gradient-to-position)"),
+            ('--tw-gradient-stops', f"var(--tw-gradient-from), {color} var(--tw-gradient-via-position), var(--tw-gradient-to)"),
+        ]
+    return [('--tw-gradient-to', f"{color} var(--tw-gradient-to-position)")]
+
+
+def _split(name, prefixes):
+    """Return (prefix, rest) for the longest prefix in ``prefixes`` that ``name`` starts with"""
+    for prefix in sorted(prefixes, key=len, reverse=True):
+        if name == prefix:
+            return prefix, ''
+        if name.startswith(prefix + '-'):
+            return prefix, name[len(prefix) + 1:]
+    return None, None
+
+
+# Each matcher takes a utility name (no variants, leading '-' for negative
+# values) and returns (declarations, rank) or None. ``rank`` orders rules
+# within a group the way Tailwind does, so later rules win the same way.
+
+def _pointer_events(name):
+    if name in ('pointer-events-none', 'pointer-events-auto'):
+        return [('pointer-events', name.rsplit('-', 1)[1])], 0
+
+
+def _visibility(name):
+    values = {'visible': 'visible', 'invisible': 'hidden', 'collapse': 'collapse'}
+    if name in values:
+        return [('visibility', values[name])], 0
+
+
+def _position(name):
+    if name in ('static', 'fixed', 'absolute', 'relative', 'sticky'):
+        return [('position', name)], 0
+
+
+INSET_SIDES = {
+    'inset': ('inset',), 'inset-x': ('left', 'right'), 'inset-y': ('top', 'bottom'),
+    'top': ('top',), 'right': ('right',), 'bottom': ('bottom',), 'left': ('left',),
+}
+
+
+def _inset(name):
+    negative = name.startswith('-')
+    prefix, key = _split(name.lstrip('-'), INSET_SIDES)
+    if not prefix or not key:
+        return None
+    value = _spacing(key, negative) or _fraction(key) or {'auto': 'auto', 'full': '100%'}.get(key)
+    if value is None:
+        return None
+    if negative and not value.startswith('-'):
+        value = f"-{value}"
+    return [(side, value) for side in INSET_SIDES[prefix]], list(INSET_SIDES).index(prefix)
+
+
+def _z_index(name):
+    prefix, key = _split(name, ('z',))
+    if prefix and (key == 'auto' or key.isdigit()):
+        return [('z-index', key)], 0
+
+
+SPACING_SIDES = {
+    '': ('',), 'x': ('-left', '-right'), 'y': ('-top', '-bottom'),
+    't': ('-top',), 'r': ('-right',), 'b': ('-bottom',), 'l': ('-left',),
+}
+
+
+def _box_spacing(prop, letter, name, allow_auto):
+    negative = name.startswith('-')
+    match = re.match(rf'^{letter}([xytrbl]?)-(.+)$', name.lstrip('-'))
+    if not match:
+        return None
+    side, key = match.groups()
+    value = 'auto' if allow_auto and key == 'auto' and not negative else _spacing(key, negative)
+    if value is None:
+        return None
+    return [(f"{prop}{suffix}", value) for suffix in SPACING_SIDES[side]], list(SPACING_SIDES).index(side)
+
+
+def _margin(name):
+    return _box_spacing('margin', 'm', name, allow_auto=True)
+
+
+def _padding(name):
+    if name.startswith('-'):
+        return None
+    return _box_spacing('padding', 'p', name, allow_auto=False)
+
+
+def _line_clamp(name):
+    prefix, key = _split(name, ('line-clamp',))
+    if prefix and key.isdigit():
+        return [
+            ('overflow', 'hidden'), ('display', '-webkit-box'),
+            ('-webkit-box-orient', 'vertical'), ('-webkit-line-clamp', key),
+        ], 0
+
+
+def _display(name):
+    if name in DISPLAYS:
+        return [('display', 'none' if name == 'hidden' else name)], DISPLAYS.index(name)
+
+
+def _size(prop, letter, screen, name):
+    prefix, key = _split(name, (letter,))
+    if not prefix or not key:
+        return None
+    value = (
+        _spacing(key) or _fraction(key)
+        or {'auto': 'auto', 'full': '100%', 'screen': screen, 'min': 'min-content', 'max': 'max-content', 'fit': 'fit-content'}.get(key)
+    )
+    if value is None:
+        return None
+    return [(prop, value)], 0
+
+
+def _height(name):
+    return _size('height', 'h', '100vh', name)
+
+
+def _width(name):
+    return _size('width', 'w', '100vw', name)
+
+
+def _max_height(name):
+    prefix, key = _split(name, ('max-h',))
+    if not prefix or not key:
+        return None
+    value = _spacing(key) or {'full': '100%', 'screen': '100vh', 'none': 'none'}.get(key)
+    if value is not None:
+        return [('max-height', value)], 0
+
+
+def _max_width(name):
+    prefix, key = _split(name, ('max-w',))
+    if prefix and key in MAX_WIDTHS:
+        return [('max-width', MAX_WIDTHS[key])], 0
+
+
+def _flex(name):
+    values = {'flex-1': '1 1 0%', 'flex-auto': '1 1 auto', 'flex-initial': '0 1 auto', 'flex-none': 'none'}
+    if name in values:
+        return [('flex', values[name])], 0
+
+
+def _flex_shrink(name):
+    if name in ('flex-shrink', 'flex-shrink-0', 'shrink', 'shrink-0'):
+        return [('flex-shrink', '0' if name.endswith('-0') else '1')], 0
+
+
+def _flex_grow(name):
+    if name in ('flex-grow', 'flex-grow-0', 'grow', 'grow-0'):
+        return [('flex-grow', '0' if name.endswith('-0') else '1')], 0
+
+
+def _transform_value(declarations):
+    return declarations + [('transform', TRANSFORM)]
+
+
+def _translate(name):
+    negative = name.startswith('-')
+    match = re.match(r'^translate-([xy])-(.+)$', name.lstrip('-'))
+    if not match:
+        return None
+    axis, key = match.groups()
+    value = _spacing(key, negative) or _fraction(key) or {'full': '100%'}.get(key)
+    if value is None:
+        return None
+    if negative and not value.startswith('-'):
+        value = f"-{value}"
+    return _transform_value([(f"--tw-translate-{axis}", value)]), 0
+
+
+def _scale(name):
+    match = re.match(r'^scale(?:-([xy]))?-(\d+)$', name)
+    if not match:
+        return None
+    axis, key = match.groups()
+    value = f"{int(key) / 100:g}"
+    axes = (axis,) if axis else ('x', 'y')
+    return _transform_value([(f"--tw-scale-{a}", value) for a in axes]), 0
+
+
+def _transform(name):
+    if name == 'transform':
+        return [('transform', TRANSFORM)], 0
+    if name == 'transform-none':
+        return [('transform', 'none')], 1
+
+
+def _grid_template_columns(name):
+    prefix, key = _split(name, ('grid-cols',))
+    if prefix and key.isdigit():
+        return [('grid-template-columns', f"repeat({key}, minmax(0, 1fr))")], int(key)
+
+
+def _flex_direction(name):
+    values = ('flex-row', 'flex-row-reverse', 'flex-col', 'flex-col-reverse')
+    if name in values:
+        return [('flex-direction', name[5:].replace('col', 'column'))], values.index(name)
+
+
+def _flex_wrap(name):
+    if name in ('flex-wrap', 'flex-wrap-reverse', 'flex-nowrap'):
+        return [('flex-wrap', name[5:])], 0
+
+
+def _align_items(name):
+    values = {'items-start': 'flex-start', 'items-end': 'flex-end', 'items-center': 'center', 'items-baseline': 'baseline', 'items-stretch': 'stretch'}
+    if name in values:
+        return [('align-items', values[name])], 0
+
+
+def _justify_content(name):
+    values = {
+        'justify-start': 'flex-start', 'justify-end': 'flex-end', 'justify-center': 'center',
+        'justify-between': 'space-between', 'justify-around': 'space-around', 'justify-evenly': 'space-evenly',
+    }
+    if name in values:
+        return [('justify-content', values[name])], 0
+
+
+def _gap(name):
+    match = re.match(r'^gap(?:-([xy]))?-(.+)$', name)
+    if not match:
+        return None
+    axis, key = match.groups()
+    value = _spacing(key)
+    if value is None:
+        return None
+    prop = {None: 'gap', 'x': 'column-gap', 'y': 'row-gap'}[axis]
+    return [(prop, value)], 0
+
+
+def _space(name):
+    negative = name.startswith('-')
+    match = re.match(r'^space-([xy])-(.+)$', name.lstrip('-'))
+    if not match:
+        return None
+    axis, key = match.groups()
+    value = _spacing(key, negative)
+    if value is None:
+        return None
+    if axis == 'x':
+        declarations = [
+            ('--tw-space-x-reverse', '0'),
+            ('margin-right', f"calc({value} * var(--tw-space-x-reverse))"),
+            ('margin-left', f"calc({value} * calc(1 - var(--tw-space-x-reverse)))"),
+        ]
+    else:
+        declarations = [
+            ('--tw-space-y-reverse', '0'),
+            ('margin-top', f"calc({value} * calc(1 - var(--tw-space-y-reverse)))"),
+            ('margin-bottom', f"calc({value} * var(--tw-space-y-reverse))"),
+        ]
+    return declarations, 0
+
+
+def _overflow(name):
+    match = re.match(r'^overflow(?:-([xy]))?-(auto|hidden|clip|visible|scroll)$', name)
+    if match:
+        axis, value = match.groups()
+        return [(f"overflow-{axis}" if axis else 'overflow', value)], 1 if axis else 0
+
+
+RADIUS_CORNERS = {
+    '': ('border-radius',),
+    't': ('border-top-left-radius', 'border-top-right-radius'),
+    'r': ('border-top-right-radius', 'border-bottom-right-radius'),
+    'b': ('border-bottom-right-radius', 'border-bottom-left-radius'),
+    'l': ('border-top-left-radius', 'border-bottom-left-radius'),
+}
+
+
+def _border_radius(name):
+    match = re.match(r'^rounded(?:-([trbl]))?(?:-(.+))?$', name)
+    if not match:
+        return None
+    side, key = match.groups()
+    if side is None and key in RADIUS_CORNERS:
+        side, key = key, None
+    key = key or ''
+    if key not in RADII:
+        return None
+    return [(prop, RADII[key]) for prop in RADIUS_CORNERS[side or '']], list(RADIUS_CORNERS).index(side or '')
+
+
+BORDER_SIDES = {
+    '': ('border-width',), 'x': ('border-left-width', 'border-right-width'),
+    'y': ('border-top-width', 'border-bottom-width'), 't': ('border-top-width',),
+    'r': ('border-right-width',), 'b': ('border-bottom-width',), 'l': ('border-left-width',),
+}
+
+
+def _border_width(name):
+    match = re.match(r'^border(?:-([xytrbl]))?(?:-(0|2|4|8))?$', name)
+    if match:
+        side, width = match.groups()
+        side = side or ''
+        return [(prop, f"{width or 1}px") for prop in BORDER_SIDES[side]], list(BORDER_SIDES).index(side)
+
+
+def _border_style(name):
+    if name in ('border-solid', 'border-dashed', 'border-dotted', 'border-double', 'border-none'):
+        return [('border-style', name[7:])], 0
+
+
+def _color_matcher(prefix, prop, opacity_var):
+    def matcher(name):
+        if name.startswith(prefix + '-'):
+            declarations = _color(name[len(prefix) + 1:], prop, opacity_var)
+            if declarations:
+                return declarations, 0
+    return matcher
+
+
+def _opacity_matcher(prefix, opacity_var):
+    def matcher(name):
+        if name.startswith(prefix + '-'):
+            value = _opacity(name[len(prefix) + 1:])
+            if value is not None:
+                return [(opacity_var, value)], 0
+    return matcher
+
+
+def _background_image(name):
+    directions = {
+        't': 'top', 'tr': 'top right', 'r': 'right', 'br': 'bottom right',
+        'b': 'bottom', 'bl': 'bottom left', 'l': 'left', 'tl': 'top left',
+    }
+    match = re.match(r'^bg-gradient-to-(tr|tl|br|bl|t|r|b|l)$', name)
+    if match:
+        return [('background-image', f"linear-gradient(to {directions[match.group(1)]}, var(--tw-gradient-stops))")], 0
+    if name == 'bg-none':
+        return [('background-image', 'none')], 0
+
+
+def _gradient_color_stops(name):
+    match = re.match(r'^(from|via|to)-(.+)$', name)
+    if match:
+        declarations = _gradient_stop(*match.groups())
+        if declarations:
+            return declarations, ('from', 'via', 'to').index(match.group(1))
+
+
+def _object_fit(name):
+    if name in ('object-contain', 'object-cover', 'object-fill', 'object-none', 'object-scale-down'):
+        return [('object-fit', name[7:])], 0
+
+
+def _text_align(name):
+    if name in ('text-left', 'text-center', 'text-right', 'text-justify', 'text-start', 'text-end'):
+        return [('text-align', name[5:])], 0
+
+
+def _font_family(name):
+    prefix, key = _split(name, ('font',))
+    if prefix and key in FONT_FAMILIES:
+        return [('font-family', FONT_FAMILIES[key])], 0
+
+
+def _font_size(name):
+    prefix, key = _split(name, ('text',))
+    if prefix and key in FONT_SIZES:
+        size, line_height = FONT_SIZES[key]
+        return [('font-size', size), ('line-height', line_height)], list(FONT_SIZES).index(key)
+
+
+def _font_weight(name):
+    prefix, key = _split(name, ('font',))
+    if prefix and key in FONT_WEIGHTS:
+        return [('font-weight', FONT_WEIGHTS[key])], 0
+
+
+def _font_style(name):
+    if name in ('italic', 'not-italic'):
+        return [('font-style', 'italic' if name == 'italic' else 'normal')], 0
+
+
+def _line_height(name):
+    prefix, key = _split(name, ('leading',))
+    if prefix and key in LINE_HEIGHTS:
+        return [('line-height', LINE_HEIGHTS[key])], 0
+
+
+def _box_shadow(name):
+    match = re.match(r'^shadow(?:-(sm|md|lg|xl|2xl|none))?$', name)
+    if match:
+        shadow, colored = SHADOWS[match.group(1) or '']
+        return [
+            ('--tw-shadow', shadow),
+            ('--tw-shadow-colored', colored),
+            ('box-shadow', 'var(--tw-ring-offset-shadow, 0 0 #0000), var(--tw-ring-shadow, 0 0 #0000), var(--tw-shadow)'),
+        ], 0
+
+
+def _outline(name):
+    if name == 'outline-none':
+        return [('outline', '2px solid transparent'), ('outline-offset', '2px')], 0
+
+
+def _ring_width(name):
+    match = re.match(r'^ring(?:-(0|1|2|4|8))?$', name)
+    if match:
+        width = match.group(1) or '3'
+        return [
+            ('--tw-ring-offset-shadow', 'var(--tw-ring-inset) 0 0 0 var(--tw-ring-offset-width) var(--tw-ring-offset-color)'),
+            ('--tw-ring-shadow', f"var(--tw-ring-inset) 0 0 0 calc({width}px + var(--tw-ring-offset-width)) var(--tw-ring-color)"),
+            ('box-shadow', 'var(--tw-ring-offset-shadow), var(--tw-ring-shadow), var(--tw-shadow, 0 0 #0000)'),
+        ], 0
+
+
+def _ring_color(name):
+    if name.startswith('ring-'):
+        key = name[5:]
+        if key in SPECIAL_COLORS:
+            return [('--tw-ring-color', SPECIAL_COLORS[key])], 0
+        if key in COLORS:
+            return [('--tw-ring-opacity', '1'), ('--tw-ring-color', f"rgb({_rgb(COLORS[key])} / var(--tw-ring-opacity))")], 0
+
+
+def _transition_property(name):
+    prefix, key = _split(name, ('transition',))
+    if prefix and key in TRANSITIONS:
+        return [
+            ('transition-property', TRANSITIONS[key]),
+            ('transition-timing-function', 'cubic-bezier(0.4, 0, 0.2, 1)'),
+            ('transition-duration', '150ms'),
+        ], 0
+
+
+def _transition_duration(name):
+    prefix, key = _split(name, ('duration',))
+    if prefix and key.isdigit():
+        return [('transition-duration', f"{key}ms")], 0
+
+
+def _transition_delay(name):
+    prefix, key = _split(name, ('delay',))
+    if prefix and key.isdigit():
+        return [('transition-delay', f"{key}ms")], 0
+
+
+def _ease(name):
+    values = {
+        'ease-linear': 'linear', 'ease-in': 'cubic-bezier(0.4, 0, 1, 1)',
+        'ease-out': 'cubic-bezier(0, 0, 0.2, 1)', 'ease-in-out': 'cubic-bezier(0.4, 0, 0.2, 1)',
+    }
+    if name in values:
+        return [('transition-timing-function', values[name])], 0
+
+
+# Matchers in Tailwind's plugin order; rules are emitted in this order
+MATCHERS = (
+    _pointer_events, _visibility, _position, _inset, _z_index, _margin, _line_clamp, _display,
+    _height, _max_height, _width, _max_width, _flex, _flex_shrink, _flex_grow, _translate, _scale,
+    _transform, _grid_template_columns, _flex_direction, _flex_wrap, _align_items, _justify_content,
+    _gap, _space, _overflow, _border_radius, _border_width, _border_style,
+    _color_matcher('border', 'border-color', '--tw-border-opacity'),
+    _opacity_matcher('border-opacity', '--tw-border-opacity'),
+    _color_matcher('bg', 'background-color', '--tw-bg-opacity'),
+    _opacity_matcher('bg-opacity', '--tw-bg-opacity'),
+    _background_image, _gradient_color_stops, _object_fit, _padding, _text_align, _font_family,
+    _font_size, _font_weight, _font_style, _line_height,
+    _color_matcher('text', 'color', '--tw-text-opacity'),
+    _opacity_matcher('text-opacity', '--tw-text-opacity'),
+    _opacity_matcher('opacity', 'opacity'),
+    _box_shadow, _outline, _ring_width, _ring_color,
+    _opacity_matcher('ring-opacity', '--tw-ring-opacity'),
+    _transition_property, _transition_delay, _transition_duration, _ease,
+)
+
+
+# Tailwind v3 utilities that take a value, e.g. 'pt-4' or 'grid-cols-3',
+# and those that are a single keyword; used to tell a Tailwind class this
+# module lacks from a script hook like 'mobile-menu'
+UTILITY_RE = re.compile(
+    r'^(?:[mp][trblxy]?|space-[xy]|gap(?:-[xy])?|(?:min-|max-)?[wh]|inset(?:-[xy])?|top|right|bottom|left|z|order'
+    r'|grid-(?:cols|rows|flow)|(?:col|row)-(?:span|start|end)|flex|basis|grow|shrink|items|justify|content|self'
+    r'|place-(?:items|content|self)|text|font|leading|tracking|bg|from|via|to|border(?:-[trblxy])?|divide(?:-[xy])?'
+    r'|rounded(?:-[trbl]{1,2})?|shadow|ring(?:-offset)?|outline|opacity|duration|delay|ease|scale(?:-[xy])?|rotate'
+    r'|translate-[xy]|skew-[xy]|origin|blur|brightness|backdrop-blur|overflow(?:-[xy])?|object|whitespace|break'
+    r'|cursor|select|pointer-events|transition|aspect|line-clamp|columns|decoration|underline-offset|fill|stroke'
+    r'|list|align|animate)-[\w./%#\[\]-]+$'
+    r'|^(?:block|inline|inline-block|flex|inline-flex|grid|inline-grid|hidden|contents|table|static|fixed|absolute'
+    r'|relative|sticky|visible|invisible|container|italic|not-italic|underline|no-underline|uppercase|lowercase'
+    r'|capitalize|truncate|border|rounded|shadow|ring|outline|transform|filter|transition|grow|shrink|sr-only'
+    r'|antialiased|isolate)$'
+)
+
+
+def escape_class(name):
+    """
+    Escape a class name for use in a CSS selector
+
+    Args:
+        name (str): Class name, e.g. 'sm:px-6' or 'h-0.5'
+
+    Returns:
+        str: Selector-safe name, e.g. 'sm\\:px-6'
+    """
+    escaped = ''.join(char if char.isalnum() or char in '-_' else f"\\{char}" for char in name)
+    if name[:1].isdigit():
+        escaped = f"\\{ord(name[0]):x} {escaped[1:]}"
+    return escaped
+
+
+def parse_class(name):
+    """
+    Split a class into its variants and utility
+
+    Args:
+        name (str): e.g. 'md:hover:bg-white'
+
+    Returns:
+        tuple: (screen or None, pseudo-class variants, utility), or None if
+        a variant is not supported
+    """
+    *variants, utility = name.split(':')
+    screens = dict(SCREENS)
+    screen = None
+    pseudo = []
+    for variant in variants:
+        if variant in screens and screen is None and not pseudo:
+            screen = variant
+        elif variant in PSEUDO_VARIANTS:
+            pseudo.append(variant)
+        else:
+            return None
+    return screen, tuple(pseudo), utility
+
+
+def match_utility(utility):
+    """
+    Find the CSS for a utility without variants
+
+    Args:
+        utility (str): e.g. 'px-6'
+
+    Returns:
+        tuple: (matcher position, rank, declarations), or None if unknown
+    """
+    for position, matcher in enumerate(MATCHERS):
+        result = matcher(utility)
+        if result:
+            declarations, rank = result
+            return position, rank, declarations
+    return None
+
+
+def generate_utilities(classes):
+    """
+    Generate the utility rules for a set of class names
+
+    Args:
+        classes (iterable): Candidate class names; anything that is not a
+            supported utility is skipped
+
+    Returns:
+        tuple: (list of (media query or None, selector, declarations) in
+        cascade order, set of the classes that produced rules)
+    """
+    screen_order = [None] + [screen for screen, _ in SCREENS]
+    pseudo_order = list(PSEUDO_VARIANTS)
+    entries = []
+    matched = set()
+    for name in classes:
+        parsed = parse_class(name)
+        if parsed is None:
+            continue
+        screen, pseudo, utility = parsed
+        found = match_utility(utility)
+        if found is None:
+            continue
+        position, rank, declarations = found
+        matched.add(name)
+
+        selector = f".{escape_class(name)}"
+        for variant in pseudo:
+            selector = PSEUDO_VARIANTS[variant](selector)
+        if utility.lstrip('-').startswith('space-'):
+            selector += SPACE_SELECTOR
+
+        variant_rank = tuple(sorted(pseudo_order.index(variant) + 1 for variant in pseudo))
+        sort_key = (screen_order.index(screen), variant_rank, position, rank, name)
+        media = f"(min-width: {dict(SCREENS)[screen]})" if screen else None
+        entries.append((sort_key, media, selector, declarations))
+
+    entries.sort(key=lambda entry: entry[0])
+    return [(media, selector, declarations) for _, media, selector, declarations in entries], matched
+
+
+def unsupported_utilities(classes):
+    """
+    Find the Tailwind classes this module cannot generate
+
+    Args:
+        classes (iterable): Class names from class attributes
+
+    Returns:
+        list: Sorted names that look like Tailwind utilities (or use a
+        variant such as 'dark:') but produce no rule
+    """
+    unsupported = set()
+    for name in classes:
+        parsed = parse_class(name)
+        if parsed is None:
+            if ':' in name:
+                unsupported.add(name)
+            continue
+        utility = parsed[2].lstrip('!-')
+        if UTILITY_RE.match(utility) and match_utility(parsed[2]) is None:
+            unsupported.add(name)
+    return sorted(unsupported)
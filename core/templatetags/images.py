@@ -0,0 +1,99 @@
+"""
+Template tags for responsive images
+
+Usage::
+
+    {% load images %}
+    {% responsive_image project.image_url project.name sizes="(min-width: 1024px) 33vw, 100vw" class="w-full h-64 object-cover" %}
+
+The markup changes once the source has been processed, so a fragment that
+caches it is keyed on ``image_state``. Project cards already carry it in
+``project.card.version`` (core/cards.py); elsewhere::
+
+    {% image_state photo_url as image %}
+    {% cache 3600 photo photo_url image %}
+"""
+
+from django import template
+from django.urls import reverse
+from django.utils.html import format_html, format_html_join
+
+from core import images
+
+register = template.Library()
+
+
+def _attributes(attrs):
+    return format_html_join('', ' {}="{}"', ((name, value) for name, value in attrs.items() if value is not None))
+
+
+@register.simple_tag
+def image_state(src):
+    """
+    Describe what ``responsive_image`` would render for ``src``, for cache keys
+
+    Args:
+        src (str): Remote image URL
+
+    Returns:
+        str: See ``core.images.image_state()``
+    """
+    return images.image_state(src)
+
+
+@register.simple_tag
+def responsive_image(src, alt='', sizes='100vw', loading='lazy', **attrs):
+    """
+    Render an ``<img>`` with local AVIF/WebP derivatives of a remote image
+
+    Until the source has been processed, every width bucket is offered and
+    there is no placeholder; once it has, buckets wider than the source are
+    dropped and ``width``/``height`` and a blurred placeholder are added.
+    Sources on hosts that are not allowed, or without Pillow, are rendered
+    as a plain lazy ``<img>``.
+
+    Args:
+        src (str): Remote image URL
+        alt (str): Alternative text
+        sizes (str): ``sizes`` attribute, the rendered width per breakpoint
+        loading (str): ``lazy``, or ``eager`` for images above the fold
+        **attrs: Other attributes for the ``<img>`` (``class``, ``onerror``, ...)
+
+    Returns:
+        str: ``<picture>`` markup, or a plain ``<img>``
+    """
+    options = images.get_image_settings()
+    formats = images.available_formats(options)
+    img_attrs = {'alt': alt, 'loading': loading, 'decoding': 'async'}
+    img_attrs.update(attrs)
+    if not formats or not images.is_allowed(src, options):
+        return format_html('<img src="{}"{}>', src or '', _attributes(img_attrs))
+
+    key = images.register(src, options)
+    meta = images.read_meta(key, options)
+    widths = images.widths_for(meta, options)
+
+    def url(width, fmt):
+        return reverse('core:image', args=[key, width, fmt])
+
+    sources = format_html_join(
+        '',
+        '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (f'image/{fmt}', ', '.join(f'{url(width, fmt)} {width}w' for width in widths), sizes)
+            for fmt in formats
+        ),
+    )
+    default_width = max([width for width in widths if width <= options['DEFAULT_WIDTH']] or widths[:1])
+    if meta:
+        img_attrs.setdefault('width', meta['width'])
+        img_attrs.setdefault('height', meta['height'])
+        if not meta['alpha']:
+            placeholder = f"background-image:url({meta['placeholder']});background-size:cover;background-position:center"
+            img_attrs['style'] = f"{placeholder};{img_attrs['style']}" if img_attrs.get('style') else placeholder
+    return format_html(
+        '<picture>{}<img src="{}"{}></picture>',
+        sources,
+        url(default_width, formats[-1]),  # The most widely supported format
+        _attributes(img_attrs),
+    )
@@ -0,0 +1,1289 @@
+"""
+Tests for the Srihari Developers core app
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO, StringIO
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.admin import site as admin_site
+from django.contrib.admin.models import CHANGE, LogEntry
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.management import CommandError, call_command
+from django.core.cache import cache, caches
+from django.db import connection
+from django.http import HttpResponse
+from django.template import engines
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+from unittest import mock, skipUnless
+import asyncio
+import csv
+import gzip
+import os
+import re
+import shutil
+import tempfile
+import threading
+
+from firebase_config import firebase_admin_setup, memory, spool
+from firebase_config.async_utils import async_project_service
+from firebase_config.cache import QueryCache, get_query_cache
+from firebase_config.circuit import CircuitBreaker, CircuitOpenError, get_circuit_breaker
+
+from . import assets, compression, images
+from .caching import versioned_condition
+from .cards import DEFAULT_PROJECT_IMAGE, describe_projects
+from .export import csv_lines
+from .mirror import sync_collection
+from .models import ContactInquiry, MirrorTombstone, Project, ProjectCategory, Testimonial
+from .pagination import DEFAULT_PAGE_SIZE, keyset_filter
+from .querybudget import assert_query_budget, get_view_budget, track_queries
+from .repository import FIRESTORE, ORM, forget_source, project_repository, track_fallbacks
+from .search import filter_queryset, fts_available, match_expression, search
+from .tailwind import unsupported_utilities
+from .views import PROJECT_CARD_FIELDS, project_detail
+
+# Budgeted views without URL arguments
+BUDGETED_PATHS = [
+    '/', '/about/', '/services/', '/projects/', '/contact/',
+    '/api/projects/', '/api/projects/search/?q=Tower', '/api/testimonials/',
+]
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Query plans are checked on SQLite')
+class QueryPlanTests(TestCase):
+    """The hot queries are served by the indexes added for them"""
+
+    def assertUsesIndex(self, queryset, index):
+        plan = queryset.explain()
+        self.assertIn(f"INDEX {index}", plan, f"{index} not used:\n{plan}")
+        self.assertNotIn('USE TEMP B-TREE', plan, f"Sorts in a temp B-tree:\n{plan}")
+
+    def test_featured_projects(self):
+        self.assertUsesIndex(Project.objects.filter(featured=True)[:6], 'project_featured_created_idx')
+
+    def test_projects_first_page(self):
+        self.assertUsesIndex(keyset_filter(Project.objects.all())[:DEFAULT_PAGE_SIZE + 1], 'project_created_idx')
+
+    def test_projects_keyset_page(self):
+        queryset = keyset_filter(Project.objects.all(), (timezone.now(), 1000))
+        self.assertUsesIndex(queryset[:DEFAULT_PAGE_SIZE + 1], 'project_created_idx')
+
+    def test_projects_page_as_read_by_repository(self):
+        # Projected to the card fields, with the category joined
+        queryset = keyset_filter(project_repository._queryset(PROJECT_CARD_FIELDS + ('created_at',)))
+        self.assertUsesIndex(queryset[:DEFAULT_PAGE_SIZE + 1], 'project_created_idx')
+
+    def test_featured_testimonials(self):
+        self.assertUsesIndex(Testimonial.objects.filter(is_featured=True)[:6], 'testimonial_featured_idx')
+
+    def test_unanswered_inquiries(self):
+        self.assertUsesIndex(ContactInquiry.objects.filter(responded=False)[:100], 'inquiry_unresponded_idx')
+
+    def test_inquiries_by_type(self):
+        self.assertUsesIndex(ContactInquiry.objects.filter(inquiry_type='general')[:100], 'inquiry_type_created_idx')
+
+    def test_inquiries_by_date(self):
+        now = timezone.now()
+        queryset = ContactInquiry.objects.filter(created_at__gte=now - timedelta(days=30), created_at__lt=now)
+        self.assertUsesIndex(queryset[:100], 'inquiry_created_idx')
+
+    def test_check_query_plans_command(self):
+        call_command('check_query_plans', stdout=StringIO())
+
+
+class QueryBudgetMixin:
+    """Request views the way check_query_budgets does and hold them to their budgets"""
+
+    def assertWithinBudget(self, path, status=200):
+        budget = get_view_budget(resolve(path.split('?')[0]).func)
+        self.assertIsNotNone(budget, f"{path} declares no query budget")
+        get_query_cache().clear()
+        with track_queries() as stats:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, status, path)
+        assert_query_budget(stats, budget)
+        return stats
+
+    def assertDetailWithinBudget(self, project_id):
+        # Only the reads: this tree has no project_detail.html to render them with
+        get_query_cache().clear()
+        with track_queries() as stats:
+            project, related = async_to_sync(project_repository.adetail)(project_id)
+        self.assertIsNotNone(project)
+        self.assertTrue(related)
+        assert_query_budget(stats, get_view_budget(project_detail))
+        return stats
+
+
+@override_settings(PAGE_CACHE={'ENABLED': False}, CONTENT_REPOSITORY={'SOURCE': 'orm'})
+class ORMQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Views reading the Django models stay within budget, with no N+1 over the rows"""
+
+    @classmethod
+    def setUpTestData(cls):
+        categories = [ProjectCategory.objects.create(name=name) for name in ('Residential', 'Commercial', 'Villas')]
+        cls.projects = [
+            Project.objects.create(
+                name=f"Tower {i}", location='Tirupati', status='ongoing', description='Flats',
+                featured=i % 2 == 0, category=categories[i % len(categories)],
+            )
+            for i in range(8)
+        ]
+        for i in range(5):
+            Testimonial.objects.create(client_name=f"Client {i}", testimonial_text='Great work', is_featured=True)
+
+    def test_views_without_arguments(self):
+        for path in BUDGETED_PATHS:
+            with self.subTest(path=path):
+                stats = self.assertWithinBudget(path)
+                self.assertEqual(stats.firestore_count, 0)
+
+    def test_project_detail(self):
+        self.assertDetailWithinBudget(self.projects[0].pk)
+
+    def test_missing_project_detail(self):
+        self.assertWithinBudget('/project/999999/', status=302)
+
+    def test_unknown_image(self):
+        self.assertWithinBudget('/images/0123456789abcdef01234567/320.webp', status=404)
+
+
+class MemoryFirestoreMixin:
+    """Run against a fresh in-memory Firestore (use with FIREBASE_BACKEND='memory')"""
+
+    def setUp(self):
+        super().setUp()
+        # No store or client left over from other tests
+        for target, name in ((memory, '_store'), (firebase_admin_setup, '_db')):
+            patcher = mock.patch.object(target, name, None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.dict(memory._clients, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        get_circuit_breaker().record_success()
+        get_query_cache().clear()
+        self.db = memory.get_memory_client()
+
+
+@override_settings(
+    PAGE_CACHE={'ENABLED': False},
+    CONTENT_REPOSITORY={'SOURCE': 'firestore'},
+    FIREBASE_BACKEND='memory',
+    FIREBASE_MEMORY={},
+)
+class FirestoreQueryBudgetTests(MemoryFirestoreMixin, QueryBudgetMixin, TestCase):
+    """Views reading Firestore stay within their RPC budgets"""
+
+    def setUp(self):
+        super().setUp()
+        forget_source('projects')
+        forget_source('testimonials')
+
+        db = self.db
+        created_at = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+        for i in range(8):
+            db.collection('projects').document(f"p{i}").set({
+                'name': f"Tower {i}", 'location': 'Tirupati', 'status': 'ongoing', 'description': 'Flats',
+                'featured': i % 2 == 0, 'created_at': created_at + timedelta(days=i),
+            })
+        for i in range(5):
+            db.collection('testimonials').document(f"t{i}").set({
+                'client_name': f"Client {i}", 'testimonial_text': 'Great work', 'is_featured': True,
+                'created_at': created_at + timedelta(days=i),
+            })
+
+    def test_views_without_arguments(self):
+        for path in BUDGETED_PATHS:
+            with self.subTest(path=path):
+                self.assertWithinBudget(path)
+
+    def test_project_detail(self):
+        stats = self.assertDetailWithinBudget('p0')
+        self.assertGreater(stats.firestore_count, 0)
+
+    def test_missing_project_detail(self):
+        self.assertWithinBudget('/project/missing/', status=302)
+
+    def test_home_reads_firestore(self):
+        stats = self.assertWithinBudget('/')
+        self.assertGreater(stats.firestore_count, 0)
+
+
+class CursorPaginationMixin:
+    """Walk /api/projects/ by next_cursor over 7 projects, 3 of them created at the same instant"""
+
+    names = [f"Tower {i}" for i in range(7)]
+
+    def walk(self, limit):
+        pages = []
+        cursor = ''
+        while True:
+            response = self.client.get('/api/projects/', {'limit': limit, 'cursor': cursor, 'fields': 'name'})
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            pages.append([project['name'] for project in data['projects']])
+            self.assertEqual(data['has_more'], data['next_cursor'] is not None)
+            if not data['has_more']:
+                return pages
+            cursor = data['next_cursor']
+
+    def test_every_project_once_across_ties(self):
+        for limit in (1, 2, 3):
+            with self.subTest(limit=limit):
+                pages = self.walk(limit)
+                self.assertEqual([name for page in pages for name in page], self.names[::-1])
+                self.assertTrue(all(len(page) == limit for page in pages[:-1]))
+
+    def test_no_empty_last_page(self):
+        self.assertEqual(self.walk(7), [self.names[::-1]])
+        self.assertEqual([len(page) for page in self.walk(6)], [6, 1])
+
+    def test_bad_cursor_and_limit(self):
+        response = self.client.get('/api/projects/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/projects/', {'limit': '0'})
+        self.assertEqual(len(response.json()['projects']), 1)
+        response = self.client.get('/api/projects/', {'limit': 'many'})
+        self.assertEqual(len(response.json()['projects']), len(self.names))
+
+
+@override_settings(PAGE_CACHE={'ENABLED': False}, CONTENT_REPOSITORY={'SOURCE': 'orm'})
+class ORMCursorPaginationTests(CursorPaginationMixin, TestCase):
+
+    def setUp(self):
+        get_query_cache().clear()
+        Project.objects.all().delete()
+        created_at = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+        for i, name in enumerate(self.names):
+            project = Project.objects.create(name=name, location='Tirupati', description='Flats')
+            Project.objects.filter(pk=project.pk).update(created_at=created_at + timedelta(days=max(i, 2)))
+
+
+@override_settings(
+    PAGE_CACHE={'ENABLED': False},
+    CONTENT_REPOSITORY={'SOURCE': 'firestore'},
+    FIREBASE_BACKEND='memory',
+    FIREBASE_MEMORY={},
+)
+class FirestoreCursorPaginationTests(CursorPaginationMixin, MemoryFirestoreMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        forget_source('projects')
+        created_at = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+        for i, name in enumerate(self.names):
+            self.db.collection('projects').document(f"p{i}").set({
+                'name': name, 'location': 'Tirupati', 'status': 'ongoing', 'description': 'Flats',
+                'created_at': created_at + timedelta(days=max(i, 2)),
+            })
+
+
+@override_settings(
+    PAGE_CACHE={'ENABLED': False},
+    CONTENT_REPOSITORY={'SOURCE': 'auto'},
+    FIREBASE_BACKEND='memory',
+    FIREBASE_MEMORY={},
+)
+class RepositoryFallbackTests(MemoryFirestoreMixin, TestCase):
+    """The authoritative source is learned from Firestore, and a failed read is never taken for an empty one"""
+
+    def setUp(self):
+        super().setUp()
+        forget_source('projects')
+        self.addCleanup(forget_source, 'projects')
+        Project.objects.create(name='Model Tower', location='Tirupati', description='Flats', featured=True)
+
+    def add_document(self):
+        self.db.collection('projects').document('p1').set({
+            'name': 'Firestore Tower', 'location': 'Tirupati', 'status': 'ongoing', 'description': 'Flats',
+            'featured': True, 'created_at': datetime(2024, 1, 1, tzinfo=dt_timezone.utc),
+        })
+
+    def featured_names(self):
+        return [record['name'] for record in project_repository.featured(fields=('name',))]
+
+    def test_empty_collection_makes_the_models_authoritative(self):
+        self.assertIn('Model Tower', self.featured_names())
+        self.assertEqual(project_repository.source(), ORM)
+        get_query_cache().clear()
+        with track_queries() as stats:
+            self.featured_names()
+        self.assertEqual(stats.firestore_count, 0)
+
+        # Until the collection changes in Firestore
+        self.add_document()
+        forget_source('projects')
+        self.assertEqual(self.featured_names(), ['Firestore Tower'])
+        self.assertEqual(project_repository.source(), FIRESTORE)
+
+    def test_failed_read_is_served_from_the_models(self):
+        self.add_document()
+        with track_fallbacks() as fallbacks:
+            with mock.patch.object(self.db, '_rpc', side_effect=TimeoutError('deadline exceeded')):
+                self.assertIn('Model Tower', self.featured_names())
+        self.assertEqual(fallbacks, {'projects'})
+        # The failure decided nothing
+        self.assertIsNone(project_repository.source())
+        get_circuit_breaker().record_success()
+        self.assertEqual(self.featured_names(), ['Firestore Tower'])
+
+    def test_fallback_page_is_not_stored(self):
+        self.add_document()
+        with mock.patch.object(self.db, '_rpc', side_effect=TimeoutError('deadline exceeded')):
+            response = self.client.get('/')
+        self.assertContains(response, 'Model Tower')
+        self.assertIn('no-store', response['Cache-Control'])
+
+
+CSRF_INPUT = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+@override_settings(PAGE_CACHE={**settings.PAGE_CACHE, 'ENABLED': True}, CONTENT_REPOSITORY={'SOURCE': 'orm'})
+class PageCacheTests(TestCase):
+    """Cached pages are shared, but each visitor gets their own CSRF token and flash messages"""
+
+    def setUp(self):
+        caches['pages'].clear()
+        get_query_cache().clear()
+
+    def test_hit_carries_the_visitors_csrf_token(self):
+        first = Client()
+        self.assertEqual(first.get('/contact/')['X-Page-Cache'], 'miss')
+
+        visitor = Client(enforce_csrf_checks=True)
+        response = visitor.get('/contact/')
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        tokens = set(CSRF_INPUT.findall(response.content.decode()))
+        self.assertEqual(len(tokens), 1)
+        self.assertIn('csrftoken', response.cookies)
+
+        with mock.patch('firebase_config.utils.get_firestore_client', return_value=None):
+            posted = visitor.post('/contact/', dict(CONTACT_FORM, csrfmiddlewaretoken=tokens.pop()))
+        self.assertEqual(posted.status_code, 302)
+
+    def test_hit_shows_only_the_visitors_messages(self):
+        self.assertEqual(Client().get('/projects/')['X-Page-Cache'], 'miss')
+
+        visitor = Client()
+        response = visitor.get('/project/999999/', follow=True)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertContains(response, 'Project not found.')
+        # Shown once, and never to anyone else
+        self.assertNotContains(visitor.get('/projects/'), 'Project not found.')
+        self.assertNotContains(Client().get('/projects/'), 'Project not found.')
+
+
+@override_settings(FIREBASE_BACKEND='memory', FIREBASE_MEMORY={})
+class AsyncServiceTests(MemoryFirestoreMixin, TestCase):
+    """Async services only keep AsyncClients on an ASGI server's long-lived loop"""
+
+    def setUp(self):
+        super().setUp()
+        for i in range(3):
+            self.db.collection('projects').document(f"p{i}").set({
+                'name': f"Tower {i}", 'featured': True, 'created_at': datetime(2024, 1, 1 + i, tzinfo=dt_timezone.utc),
+            })
+
+    @override_settings(FIREBASE_ASYNC_CLIENT=False)
+    def test_wsgi_reads_use_the_sync_client(self):
+        with mock.patch.object(memory, 'get_memory_client', wraps=memory.get_memory_client) as get_client:
+            projects = async_to_sync(async_project_service.get_featured_projects)()
+        self.assertEqual(len(projects), 3)
+        self.assertNotIn(mock.call(asynchronous=True), get_client.mock_calls)
+
+    @override_settings(FIREBASE_ASYNC_CLIENT=True)
+    def test_asgi_reads_use_an_async_client(self):
+        with mock.patch.object(memory, 'get_memory_client', wraps=memory.get_memory_client) as get_client:
+            projects = async_to_sync(async_project_service.get_featured_projects)()
+        self.assertEqual(len(projects), 3)
+        get_client.assert_called_with(asynchronous=True)
+
+    def test_stale_entry_refresh_completes(self):
+        query_cache = QueryCache(default_ttl=0, stale_ttl=60)
+
+        async def load(value):
+            await asyncio.sleep(0)
+            return value
+
+        async def scenario():
+            await query_cache.aget_or_load('projects', ('featured',), lambda: load('old'))
+            stale = await query_cache.aget_or_load('projects', ('featured',), lambda: load('new'))
+            # Only the cache holds the refresh task
+            await asyncio.gather(*query_cache._tasks)
+            return stale
+
+        self.assertEqual(asyncio.run(scenario()), 'old')
+        self.assertEqual(query_cache._entries[('projects', ('featured',))].value, 'new')
+
+
+class QueryCacheTests(TestCase):
+    """Query results are fresh for their TTL, served stale while refreshing, and dropped on change"""
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('firebase_config.cache.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Run background refreshes inline
+        thread = mock.patch('firebase_config.cache.threading.Thread')
+        self.thread = thread.start()
+        self.thread.side_effect = lambda target, **kwargs: mock.Mock(start=target)
+        self.addCleanup(thread.stop)
+        self.cache = QueryCache(max_entries=2, default_ttl=30, stale_ttl=300, query_ttls={'featured': 10})
+        self.loads = Counter()
+
+    def loader(self, value):
+        def load():
+            self.loads[value] += 1
+            return value
+        return load
+
+    def test_fresh_then_stale_then_expired(self):
+        ttl = self.cache.ttl_for('featured')
+        self.assertEqual(ttl, 10)
+        self.assertEqual(self.cache.get_or_load('projects', ('featured',), self.loader('v1'), ttl), 'v1')
+        self.now += 9
+        self.assertEqual(self.cache.get_or_load('projects', ('featured',), self.loader('v2'), ttl), 'v1')
+        self.assertEqual(self.loads['v2'], 0)
+
+        # Past the TTL the old value is served while a refresh stores the new one
+        self.now += 2
+        self.assertEqual(self.cache.get_or_load('projects', ('featured',), self.loader('v2'), ttl), 'v1')
+        self.assertEqual(self.loads['v2'], 1)
+        self.assertEqual(self.cache.get_or_load('projects', ('featured',), self.loader('v3'), ttl), 'v2')
+
+        # Past the stale window the caller waits for a load
+        self.now += ttl + 300
+        self.assertEqual(self.cache.get_or_load('projects', ('featured',), self.loader('v3'), ttl), 'v3')
+        self.assertEqual(self.cache.stats(), {'entries': 1, 'hits': 2, 'stale_hits': 1, 'misses': 2})
+
+    def test_expired_entry_served_when_load_fails(self):
+        self.cache.get_or_load('projects', ('all',), self.loader('v1'))
+        self.now += 1000
+
+        def fail():
+            raise RuntimeError('unavailable')
+
+        self.assertEqual(self.cache.get_or_load('projects', ('all',), fail), 'v1')
+        with self.assertRaises(RuntimeError):
+            self.cache.get_or_load('projects', ('other',), fail)
+
+    def test_invalidation_drops_the_collection_and_notifies(self):
+        invalidated = []
+        self.cache.add_invalidation_listener(invalidated.append)
+        self.cache.get_or_load('projects', ('all',), self.loader('p1'))
+        self.cache.get_or_load('testimonials', ('all',), self.loader('t1'))
+
+        self.cache.invalidate_collection('projects')
+        self.assertEqual(invalidated, ['projects'])
+        self.assertEqual(self.cache.get_or_load('projects', ('all',), self.loader('p2')), 'p2')
+        self.assertEqual(self.cache.get_or_load('testimonials', ('all',), self.loader('t2')), 't1')
+
+    def test_load_racing_an_invalidation_is_not_stored(self):
+        def load():
+            self.cache.invalidate_collection('projects')
+            return 'outdated'
+
+        self.assertEqual(self.cache.get_or_load('projects', ('all',), load), 'outdated')
+        self.assertEqual(self.cache.get_or_load('projects', ('all',), self.loader('current')), 'current')
+        self.assertEqual(self.loads['current'], 1)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        for name in ('a', 'b'):
+            self.cache.get_or_load('projects', (name,), self.loader(name))
+        self.cache.get_or_load('projects', ('a',), self.loader('a'))
+        self.cache.get_or_load('projects', ('c',), self.loader('c'))
+        self.assertEqual(self.cache.get_or_load('projects', ('a',), self.loader('a')), 'a')
+        self.cache.get_or_load('projects', ('b',), self.loader('b'))
+        self.assertEqual(self.loads, Counter({'a': 1, 'b': 2, 'c': 1}))
+
+
+class CircuitBreakerTests(TestCase):
+    """The Firebase breaker opens on failures, probes after a backoff and never sticks half-open"""
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('firebase_config.circuit.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=5, max_reset_timeout=20)
+
+    def fail(self):
+        def failing():
+            raise ConnectionError('unavailable')
+        with self.assertRaises(ConnectionError):
+            self.breaker.call(failing)
+
+    def test_opens_at_threshold(self):
+        self.fail()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.fail()
+        self.assertTrue(self.breaker.is_open())
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.call(lambda: 'ok')
+
+    def test_success_resets_failures(self):
+        self.fail()
+        self.assertEqual(self.breaker.call(lambda: 'ok'), 'ok')
+        self.fail()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_probe_closes_or_backs_off(self):
+        self.breaker.trip()
+        self.now += 5
+        self.assertFalse(self.breaker.is_open())
+        self.fail()  # The probe fails: twice the backoff
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.now += 9
+        self.assertTrue(self.breaker.is_open())
+        self.now += 1
+        self.assertEqual(self.breaker.call(lambda: 'ok'), 'ok')
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_one_probe_at_a_time(self):
+        self.breaker.trip()
+        self.now += 5
+        self.assertTrue(self.breaker.allow_request())
+        self.assertFalse(self.breaker.allow_request())
+        self.assertTrue(self.breaker.is_open())
+
+    def test_cancelled_probe_is_released(self):
+        self.breaker.trip()
+        self.now += 5
+
+        async def cancelled():
+            raise asyncio.CancelledError()
+
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(self.breaker.acall(cancelled))
+        self.assertFalse(self.breaker.is_open())
+        self.assertEqual(self.breaker.call(lambda: 'ok'), 'ok')
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_interrupted_probe_is_released(self):
+        self.breaker.trip()
+        self.now += 5
+
+        def interrupted():
+            raise KeyboardInterrupt()
+
+        with self.assertRaises(KeyboardInterrupt):
+            self.breaker.call(interrupted)
+        self.assertTrue(self.breaker.allow_request())
+
+
+class SpoolMixin:
+    """A fresh submission spool in a temporary file, flushed by hand"""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        patcher = override_settings(FIREBASE_SPOOL={
+            'PATH': os.path.join(directory, 'spool.sqlite3'), 'AUTOSTART': False, 'BASE_BACKOFF': 0, 'MAX_ATTEMPTS': 2,
+        })
+        patcher.enable()
+        self.addCleanup(patcher.disable)
+        for name in ('_spool', '_flusher'):
+            patcher = mock.patch.object(spool, name, None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.spool = spool.get_spool()
+
+    def flush(self):
+        get_circuit_breaker().record_success()
+        return spool.flush_spool(self.spool, self.db)
+
+
+CONTACT_FORM = {
+    'name': 'Ravi Kumar', 'email': 'ravi@example.com', 'phone': '+919876543210',
+    'inquiry_type': 'general', 'message': 'Please call me about a villa.',
+}
+
+SERVICE_FORM = {
+    'name': 'Ravi Kumar', 'email': 'ravi@example.com', 'phone': '+919876543210',
+    'service_type': 'construction', 'project_budget': '50-1cr', 'timeline': '6months', 'message': '',
+}
+
+
+@override_settings(PAGE_CACHE={'ENABLED': False}, FIREBASE_BACKEND='memory', FIREBASE_MEMORY={})
+class SubmissionSpoolTests(SpoolMixin, MemoryFirestoreMixin, TestCase):
+    """Form submissions are spooled, flushed to Firestore and dead-lettered when rejected"""
+
+    def test_contact_is_spooled_then_flushed(self):
+        response = self.client.post('/contact/', CONTACT_FORM)
+        self.assertEqual(response.status_code, 302)
+        inquiry = ContactInquiry.objects.get()
+        self.assertIsNotNone(inquiry.firestore_id)
+        self.assertEqual(self.spool.pending_count(), 1)
+        self.assertFalse(self.db.collection('contacts').document(inquiry.firestore_id).get().exists)
+
+        self.assertEqual(self.flush(), 1)
+        self.assertEqual(self.spool.pending_count(), 0)
+        document = self.db.collection('contacts').document(inquiry.firestore_id).get().to_dict()
+        self.assertEqual(document['email'], CONTACT_FORM['email'])
+        self.assertFalse(document['responded'])
+
+    def test_service_inquiry_and_newsletter_keep_rows(self):
+        self.assertTrue(self.client.post('/service-inquiry/', SERVICE_FORM).json()['success'])
+        self.assertTrue(self.client.post('/newsletter-subscribe/', {'email': 'news@example.com'}).json()['success'])
+        self.assertEqual(
+            sorted(ContactInquiry.objects.values_list('inquiry_type', flat=True)), ['newsletter', 'service'],
+        )
+        self.assertFalse(ContactInquiry.objects.filter(firestore_id__isnull=True).exists())
+        self.assertEqual(self.flush(), 2)
+
+    def test_flush_batches_fresh_entries(self):
+        for i in range(3):
+            self.spool.append('contacts', {'name': f"Client {i}"})
+        with track_queries() as stats:
+            self.assertEqual(self.flush(), 3)
+        self.assertEqual(stats.firestore['spool.commit'], 1)
+        self.assertEqual(len(self.db.collection('contacts').get()), 3)
+
+    def test_rejected_entry_is_dead_lettered(self):
+        self.spool.append('contacts', {'name': 'Rejected'})
+        with mock.patch.object(self.db, '_rpc', side_effect=ValueError('invalid document')):
+            self.assertEqual(self.flush(), 0)
+            self.assertEqual(self.spool.pending_count(), 1)
+            self.assertEqual(self.flush(), 0)
+        self.assertEqual(self.spool.pending_count(), 0)
+        self.assertEqual(self.spool.dead_count(), 1)
+
+        self.assertEqual(self.spool.requeue_dead(), 1)
+        self.assertEqual(self.flush(), 1)
+        self.assertEqual(self.spool.dead_count(), 0)
+
+    def test_transient_errors_are_not_dead_lettered(self):
+        self.spool.append('contacts', {'name': 'Delayed'})
+        with mock.patch.object(self.db, '_rpc', side_effect=TimeoutError('deadline exceeded')):
+            for _ in range(3):
+                self.flush()
+        self.assertEqual(self.spool.pending_count(), 1)
+        self.assertEqual(self.spool.dead_count(), 0)
+
+    def test_disabled_spool_writes_synchronously(self):
+        with override_settings(FIREBASE_SPOOL={**settings.FIREBASE_SPOOL, 'ENABLED': False}):
+            self.client.post('/contact/', CONTACT_FORM)
+        inquiry = ContactInquiry.objects.get()
+        self.assertTrue(self.db.collection('contacts').document(inquiry.firestore_id).get().exists)
+        self.assertEqual(self.spool.pending_count(), 0)
+
+
+@override_settings(PAGE_CACHE={'ENABLED': False})
+class SubmissionWithoutFirebaseTests(SpoolMixin, TestCase):
+    """Without a Firestore client, submissions go to the database only"""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch('firebase_config.utils.get_firestore_client', return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_contact_saves_row_only(self):
+        response = self.client.post('/contact/', CONTACT_FORM, follow=True)
+        inquiry = ContactInquiry.objects.get()
+        self.assertIsNone(inquiry.firestore_id)
+        self.assertEqual(self.spool.pending_count(), 0)
+        self.assertNotContains(response, '24 hours')
+
+    def test_service_inquiry_keeps_its_details(self):
+        self.assertTrue(self.client.post('/service-inquiry/', SERVICE_FORM).json()['success'])
+        inquiry = ContactInquiry.objects.get()
+        self.assertEqual(inquiry.inquiry_type, 'service')
+        self.assertIn('Service: construction', inquiry.message)
+        self.assertIn('Timeline: 6months', inquiry.message)
+
+
+@override_settings(FIREBASE_BACKEND='memory', FIREBASE_MEMORY={})
+class MirrorTests(SpoolMixin, MemoryFirestoreMixin, TestCase):
+    """sync_collection copies Firestore into the models without undoing local state"""
+
+    def setUp(self):
+        super().setUp()
+        self.now = timezone.now()
+
+    def write_project(self, document_id, **fields):
+        data = {'name': document_id, 'location': 'Tirupati', 'status': 'ongoing', 'description': 'Flats'}
+        data.update(fields)
+        data.setdefault('updated_at', self.now)
+        self.db.collection('projects').document(document_id).set(data)
+
+    def test_full_then_incremental_pass(self):
+        for i in range(5):
+            self.write_project(f"p{i}", created_at=self.now - timedelta(days=i))
+        result = sync_collection('projects', batch_size=2)
+        self.assertTrue(result['full'])
+        self.assertEqual(result['upserted'], 5)
+        self.assertEqual(Project.objects.filter(firestore_id__isnull=False).count(), 5)
+
+        # Only documents changed after the watermark are read again
+        self.write_project('p1', name='Renamed', updated_at=self.now + timedelta(minutes=5))
+        self.write_project('p9', updated_at=self.now + timedelta(minutes=5))
+        result = sync_collection('projects', batch_size=2)
+        self.assertFalse(result['full'])
+        self.assertEqual((result['upserted'], result['deleted']), (2, 0))
+        self.assertEqual(Project.objects.get(firestore_id='p1').name, 'Renamed')
+        self.assertEqual(sync_collection('projects')['upserted'], 0)
+
+    def test_deletions(self):
+        for i in range(3):
+            self.write_project(f"p{i}")
+        sync_collection('projects')
+        pk = Project.objects.get(firestore_id='p0').pk
+
+        self.write_project('p1', deleted=True, updated_at=self.now + timedelta(minutes=5))
+        self.assertEqual(sync_collection('projects')['deleted'], 1)
+        self.db.collection('projects').document('p2').delete()
+        self.assertEqual(sync_collection('projects', full=True)['deleted'], 1)
+
+        self.assertEqual(list(Project.objects.filter(firestore_id__isnull=False).values_list('pk', flat=True)), [pk])
+        self.assertEqual(
+            sorted(MirrorTombstone.objects.values_list('firestore_id', flat=True)), ['p1', 'p2'],
+        )
+
+    def test_local_only_rows_are_kept(self):
+        local = Project.objects.create(name='Local', location='Tirupati', status='ongoing', description='Flats')
+        self.write_project('p0')
+        self.assertEqual(sync_collection('projects', full=True)['deleted'], 0)
+        self.assertTrue(Project.objects.filter(pk=local.pk).exists())
+
+    def test_spooled_inquiry_survives_full_pass(self):
+        self.client.post('/contact/', CONTACT_FORM)
+        inquiry = ContactInquiry.objects.get()
+        self.assertEqual(sync_collection('contacts', full=True)['deleted'], 0)
+        self.assertTrue(ContactInquiry.objects.filter(pk=inquiry.pk).exists())
+
+        # Once written, the document updates the same row
+        self.flush()
+        sync_collection('contacts')
+        self.assertEqual(list(ContactInquiry.objects.values_list('pk', 'firestore_id')), [(inquiry.pk, inquiry.firestore_id)])
+
+    def test_dead_lettered_inquiry_survives_full_pass(self):
+        self.client.post('/contact/', CONTACT_FORM)
+        with mock.patch.object(self.db, '_rpc', side_effect=ValueError('invalid document')):
+            self.flush()
+            self.flush()
+        self.assertEqual(self.spool.dead_count(), 1)
+        self.assertEqual(sync_collection('contacts', full=True)['deleted'], 0)
+        self.assertEqual(ContactInquiry.objects.count(), 1)
+
+    def test_responded_is_kept(self):
+        self.db.collection('contacts').document('c1').set({
+            'name': 'Ravi', 'email': 'ravi@example.com', 'phone': '+919876543210', 'message': 'Hello',
+            'inquiry_type': 'general', 'responded': False, 'created_at': self.now, 'updated_at': self.now,
+        })
+        sync_collection('contacts')
+        ContactInquiry.objects.filter(firestore_id='c1').update(responded=True)
+
+        self.db.collection('contacts').document('c1').update({'message': 'Hello again', 'updated_at': self.now + timedelta(minutes=5)})
+        sync_collection('contacts')
+        self.assertEqual(sync_collection('contacts', full=True)['upserted'], 0)
+        inquiry = ContactInquiry.objects.get(firestore_id='c1')
+        self.assertEqual((inquiry.message, inquiry.responded), ('Hello again', True))
+
+
+class ImageOrigin:
+    """Local HTTP server standing in for a remote image host"""
+
+    def __init__(self):
+        self.routes = {}
+        self.redirects = {}
+        self.hits = Counter()
+        origin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                origin.hits[self.path] += 1
+                status, body = origin.routes.get(self.path, (404, b''))
+                if self.path in origin.redirects:
+                    status, body = 302, b''
+                self.send_response(status)
+                if self.path in origin.redirects:
+                    self.send_header('Location', origin.redirects[self.path])
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server.server_port}{path}"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _png(width, height):
+    buffer = BytesIO()
+    images.Image.new('RGB', (width, height), (180, 40, 40)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@skipUnless(images.Image is not None, 'Pillow is not installed')
+class ImagePipelineTests(TestCase):
+    """Remote images are fetched once and served as local AVIF/WebP derivatives"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.origin = ImageOrigin()
+        cls.addClassCleanup(cls.origin.close)
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=media_root,
+            IMAGES={'WIDTHS': [160, 320, 480, 640], 'DEFAULT_WIDTH': 320, 'ALLOWED_HOSTS': ['127.0.0.1']},
+            CACHES={
+                'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'images-tests'},
+                'images': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'image-sources-tests'},
+            },
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # Keys are per URL, so each test uses its own paths; forget what earlier ones registered
+        for name in ('_registered', '_meta'):
+            patcher = mock.patch.object(images, name, type(getattr(images, name))())
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.options = images.get_image_settings()
+        self.formats = images.available_formats(self.options)
+
+    def render_tag(self, url):
+        template = engines['django'].from_string("{% load images %}{% responsive_image url 'Tower' %}")
+        return template.render({'url': url})
+
+    def get_derivative(self, url, width, fmt):
+        key = images.image_key(url, self.options)
+        return self.client.get(reverse('core:image', args=[key, width, fmt]))
+
+    def test_source_fetched_once(self):
+        self.origin.routes['/once.png'] = (200, _png(500, 300))
+        url = self.origin.url('/once.png')
+        self.assertIn('<picture>', self.render_tag(url))
+
+        for width in (160, 320, 480):
+            for fmt in self.formats:
+                response = self.get_derivative(url, width, fmt)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(self.origin.hits['/once.png'], 1)
+
+    def test_derivatives_at_requested_widths(self):
+        self.assertIn('webp', self.formats)
+        self.origin.routes['/widths.png'] = (200, _png(500, 250))
+        url = self.origin.url('/widths.png')
+        self.assertEqual(images.prepare(url, self.options), 3 * len(self.formats))
+
+        key = images.image_key(url, self.options)
+        for width in (160, 320, 480):
+            for fmt in self.formats:
+                response = self.get_derivative(url, width, fmt)
+                self.assertEqual(response['Content-Type'], images.CONTENT_TYPES[fmt])
+                encoded = images.Image.open(BytesIO(b''.join(response.streaming_content)))
+                self.assertEqual(encoded.format, images.PIL_FORMATS[fmt])
+                self.assertEqual(encoded.size, (width, width // 2))
+        # Never scaled up past the source
+        path = images.derivative_path(key, 640, 'webp', self.options)
+        self.assertEqual(images.Image.open(path).width, 500)
+        # Once processed, the tag only offers buckets the source can fill
+        markup = self.render_tag(url)
+        self.assertIn('width="500"', markup)
+        self.assertNotIn('/640.', markup)
+
+    def test_avif_derivative(self):
+        if 'avif' not in self.formats:
+            self.skipTest('This Pillow build cannot encode AVIF')
+        self.origin.routes['/avif.png'] = (200, _png(400, 200))
+        url = self.origin.url('/avif.png')
+        self.render_tag(url)
+        response = self.get_derivative(url, 320, 'avif')
+        self.assertEqual(response['Content-Type'], 'image/avif')
+        self.assertEqual(images.Image.open(BytesIO(b''.join(response.streaming_content))).size, (320, 160))
+
+    def test_host_not_allowed(self):
+        url = 'http://localhost:1/blocked.png'
+        self.assertEqual(self.render_tag(url), f'<img src="{url}" alt="Tower" loading="lazy" decoding="async">')
+        with self.assertRaises(images.ImageUnavailable):
+            images.prepare(url, self.options)
+        # Never registered, so the view will not fetch it
+        self.assertEqual(self.get_derivative(url, 320, 'webp').status_code, 404)
+
+    def test_unknown_width_or_format(self):
+        self.origin.routes['/sizes.png'] = (200, _png(500, 300))
+        url = self.origin.url('/sizes.png')
+        self.render_tag(url)
+        self.assertEqual(self.get_derivative(url, 333, 'webp').status_code, 404)
+        self.assertEqual(self.get_derivative(url, 320, 'gif').status_code, 404)
+        self.assertEqual(self.origin.hits['/sizes.png'], 0)
+
+    def test_redirect_when_fetch_fails_then_retry(self):
+        url = self.origin.url('/flaky.png')
+        self.render_tag(url)
+
+        response = self.get_derivative(url, 320, 'webp')
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], url)
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+
+        # The failure is remembered: no fetch until RETRY_AFTER passes
+        self.origin.routes['/flaky.png'] = (200, _png(500, 300))
+        self.assertEqual(self.get_derivative(url, 320, 'webp').status_code, 302)
+        self.assertEqual(self.origin.hits['/flaky.png'], 1)
+
+        cache.delete(images.FAILED_KEY.format(key=images.image_key(url, self.options)))
+        self.assertEqual(self.get_derivative(url, 320, 'webp').status_code, 200)
+        self.assertEqual(self.origin.hits['/flaky.png'], 2)
+
+    def test_redirect_when_source_cannot_be_decoded(self):
+        self.origin.routes['/broken.png'] = (200, b'not an image')
+        url = self.origin.url('/broken.png')
+        self.render_tag(url)
+        response = self.get_derivative(url, 320, 'webp')
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], url)
+        self.assertTrue(cache.get(images.FAILED_KEY.format(key=images.image_key(url, self.options))))
+
+    def test_redirect_when_derivative_cannot_be_encoded(self):
+        self.origin.routes['/encode.png'] = (200, _png(500, 300))
+        url = self.origin.url('/encode.png')
+        self.render_tag(url)
+        # Before the source is processed the placeholder fails to encode, after it the derivative
+        for _ in range(2):
+            with mock.patch.object(images.Image.Image, 'save', side_effect=OSError('encoder error')):
+                response = self.get_derivative(url, 320, 'webp')
+            self.assertEqual(response.status_code, 302)
+            self.assertEqual(response['Location'], url)
+            images.load_source(images.image_key(url, self.options), self.options)
+        # The source is fine, so the next request encodes it
+        self.assertEqual(self.get_derivative(url, 320, 'webp').status_code, 200)
+        self.assertEqual(self.origin.hits['/encode.png'], 1)
+
+    def test_redirect_to_disallowed_host_is_not_followed(self):
+        port = self.origin.server.server_port
+        self.origin.routes['/elsewhere.png'] = (200, _png(500, 300))
+        # Same server, but 'localhost' is not an allowed host
+        self.origin.redirects['/hop.png'] = f"http://localhost:{port}/elsewhere.png"
+        with self.assertRaisesMessage(images.ImageUnavailable, 'not allowed'):
+            images.prepare(self.origin.url('/hop.png'), self.options)
+        self.assertEqual(self.origin.hits['/elsewhere.png'], 0)
+
+        self.origin.redirects['/moved.png'] = '/elsewhere.png'
+        self.assertEqual(images.prepare(self.origin.url('/moved.png'), self.options), 3 * len(self.formats))
+        self.assertEqual(self.origin.hits['/elsewhere.png'], 1)
+
+    def test_registration_outlives_the_default_cache(self):
+        self.origin.routes['/kept.png'] = (200, _png(500, 300))
+        url = self.origin.url('/kept.png')
+        self.render_tag(url)
+        cache.clear()
+        self.assertEqual(self.get_derivative(url, 320, 'webp').status_code, 200)
+
+    def test_lost_registration_is_written_again(self):
+        self.origin.routes['/lost.png'] = (200, _png(500, 300))
+        url = self.origin.url('/lost.png')
+        self.render_tag(url)
+        caches['images'].clear()
+        self.assertEqual(self.get_derivative(url, 320, 'webp').status_code, 404)
+        with mock.patch.object(images, 'REGISTER_REFRESH', -1):
+            self.render_tag(url)
+        self.assertEqual(self.get_derivative(url, 320, 'webp').status_code, 200)
+
+    def test_image_state_changes_once_processed(self):
+        self.origin.routes['/state.png'] = (200, _png(500, 300))
+        url = self.origin.url('/state.png')
+        template = engines['django'].from_string("{% load images %}{% image_state url %}")
+        self.assertTrue(template.render({'url': url}).endswith('-pending'))
+        images.prepare(url, self.options)
+        self.assertTrue(template.render({'url': url}).endswith('-ready'))
+        self.assertEqual(template.render({'url': 'http://localhost:1/x.png'}), 'plain')
+
+    def test_card_version_follows_image_state(self):
+        self.origin.routes['/card.png'] = (200, _png(500, 300))
+        record = {'id': 'card', 'name': 'Tower', 'status': 'ongoing', 'image_url': self.origin.url('/card.png')}
+        pending = describe_projects([dict(record)])[0]['card']
+        self.assertTrue(pending['version'].endswith('-pending'))
+        images.prepare(record['image_url'], self.options)
+        ready = describe_projects([dict(record)])[0]['card']
+        self.assertTrue(ready['version'].endswith('-ready'))
+        self.assertEqual(ready['image'], record['image_url'])
+        self.assertEqual(describe_projects([{'id': 'bare', 'name': 'Plot'}])[0]['card']['image'], DEFAULT_PROJECT_IMAGE)
+
+
+@override_settings(CONTENT_VERSIONS={'SHARED': True})
+class ConditionalGetTests(TestCase):
+    """Version-counter ETags answer repeat GETs, unless flash messages are waiting"""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+        def view(request):
+            return HttpResponse(''.join(str(message) for message in messages.get_messages(request)) or 'page')
+
+        async def async_view(request):
+            return view(request)
+
+        self.view = versioned_condition('projects')(view)
+        self.async_view = versioned_condition('projects')(async_view)
+
+    def get(self, view, etag=None, flash=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        request = self.factory.get('/project/1/', **headers)
+        request._messages = CookieStorage(request)
+        if flash:
+            messages.error(request, flash)
+        response = view(request)
+        return asyncio.run(response) if asyncio.iscoroutine(response) else response
+
+    def test_unchanged_content_is_not_modified(self):
+        for view in (self.view, self.async_view):
+            etag = self.get(view)['ETag']
+            self.assertEqual(self.get(view, etag).status_code, 304)
+
+    def test_pending_messages_are_rendered(self):
+        for view in (self.view, self.async_view):
+            etag = self.get(view)['ETag']
+            response = self.get(view, etag, flash='Project not found.')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, b'Project not found.')
+            self.assertFalse(response.has_header('ETag'))
+
+
+class FullTextSearchTests(TestCase):
+    """Search uses the FTS5 index: prefix terms, column weights, quoted operators and trigger upkeep"""
+
+    def setUp(self):
+        Project.objects.all().delete()
+        self.tower = Project.objects.create(name='Lakeview Tower', location='Tirupati', description='Flats')
+        self.villas = Project.objects.create(
+            name='Green Villas', location='Renigunta', description='Villas with a view of the lakeview park',
+        )
+        ContactInquiry.objects.create(
+            name='Ravi', email='ravi@example.com', phone='+919876543210', inquiry_type='general', message='Call me',
+        )
+
+    def names(self, text, limit=10, offset=0):
+        return [project.name for project in search(Project.objects.all(), text, limit, offset)]
+
+    def test_index_is_used(self):
+        self.assertTrue(fts_available(Project))
+        with track_queries() as stats:
+            self.names('lakeview')
+        self.assertIn('core_project_fts', ' '.join(stats.queries))
+
+    def test_prefix_terms_ranked_by_column_weight(self):
+        self.assertEqual(self.names('lake'), ['Lakeview Tower', 'Green Villas'])
+        self.assertEqual(self.names('lake', limit=1, offset=1), ['Green Villas'])
+        # Every term must match
+        self.assertEqual(self.names('lake tirupati'), ['Lakeview Tower'])
+
+    def test_operators_are_plain_text(self):
+        self.assertEqual(match_expression('tower OR "villa'), '"tower"* "OR"* """villa"*')
+        self.assertEqual(self.names('NEAR( tower'), [])
+        self.assertEqual(self.names('" "'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        Project.objects.filter(pk=self.tower.pk).update(name='Hillside Tower')
+        self.assertEqual(self.names('hillside'), ['Hillside Tower'])
+        self.assertEqual(self.names('lakeview'), ['Green Villas'])
+        self.villas.delete()
+        self.assertEqual(self.names('lakeview'), [])
+
+    def test_inquiries_filter_by_email(self):
+        queryset = filter_queryset(ContactInquiry.objects.all(), 'ravi@example')
+        self.assertEqual([inquiry.name for inquiry in queryset], ['Ravi'])
+
+    def test_icontains_fallback_without_the_index(self):
+        with mock.patch('core.search.fts_available', return_value=False):
+            self.assertEqual(self.names('tirupati'), ['Lakeview Tower'])
+            self.assertEqual(filter_queryset(Project.objects.all(), 'villas').get(), self.villas)
+
+    def test_search_api(self):
+        response = self.client.get('/api/projects/search/', {'q': 'lake', 'limit': 1})
+        data = response.json()
+        self.assertEqual([project['name'] for project in data['projects']], ['Lakeview Tower'])
+        self.assertTrue(data['has_more'])
+        data = self.client.get('/api/projects/search/', {'q': 'lake', 'limit': 1, 'page': 2}).json()
+        self.assertEqual([project['name'] for project in data['projects']], ['Green Villas'])
+        self.assertFalse(data['has_more'])
+        self.assertEqual(self.client.get('/api/projects/search/').status_code, 400)
+
+
+class ChangelistTests(TestCase):
+    """The inquiry changelist pages by keyset and saves list_editable edits in one UPDATE"""
+
+    def setUp(self):
+        user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+        created_at = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+        self.inquiries = []
+        for i in range(5):
+            inquiry = ContactInquiry.objects.create(
+                name=f"Client {i}", email=f"client{i}@example.com", phone='+919876543210',
+                inquiry_type='general', message='Call me',
+            )
+            # Three share a timestamp, so pages must break ties on id
+            ContactInquiry.objects.filter(pk=inquiry.pk).update(created_at=created_at + timedelta(days=max(i, 2)))
+            self.inquiries.append(inquiry)
+        model_admin = admin_site._registry[ContactInquiry]
+        patcher = mock.patch.object(model_admin, 'list_per_page', 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.url = reverse('admin:core_contactinquiry_changelist')
+
+    def test_keyset_pages_cover_every_row_once(self):
+        seen = []
+        query = ''
+        while True:
+            cl = self.client.get(self.url + query).context['cl']
+            self.assertTrue(cl.keyset_paginated)
+            seen.extend(inquiry.pk for inquiry in cl.result_list)
+            if cl.next_page_url is None:
+                break
+            query = cl.next_page_url
+        self.assertEqual(seen, [inquiry.pk for inquiry in reversed(self.inquiries)])
+
+    def test_invalid_cursor_shows_the_first_page(self):
+        cl = self.client.get(self.url, {'after': 'not-a-cursor'}).context['cl']
+        self.assertEqual([inquiry.pk for inquiry in cl.result_list], [self.inquiries[4].pk, self.inquiries[3].pk])
+
+    def test_count_is_bounded(self):
+        with override_settings(ADMIN_CHANGELIST={'COUNT_LIMIT': 3}):
+            cl = self.client.get(self.url).context['cl']
+        self.assertTrue(cl.result_count_estimated)
+        self.assertGreaterEqual(cl.result_count, 3)
+
+    def test_list_editable_saves_in_one_update(self):
+        page = [self.inquiries[4], self.inquiries[3]]
+        data = {
+            'form-TOTAL_FORMS': '2', 'form-INITIAL_FORMS': '2', 'form-MIN_NUM_FORMS': '0', 'form-MAX_NUM_FORMS': '1000',
+            '_save': 'Save',
+        }
+        for i, inquiry in enumerate(page):
+            data[f"form-{i}-id"] = str(inquiry.pk)
+            data[f"form-{i}-responded"] = 'on'
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, 302)
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "core_contactinquiry"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(set(ContactInquiry.objects.filter(responded=True).values_list('pk', flat=True)),
+                         {inquiry.pk for inquiry in page})
+        self.assertEqual(LogEntry.objects.filter(action_flag=CHANGE).count(), 2)
+
+
+@override_settings(PAGE_CACHE={'ENABLED': False})
+class CompressionTests(TestCase):
+    """Brotli or gzip is chosen from Accept-Encoding, and the body round-trips"""
+
+    def test_choose_encoding(self):
+        cases = {
+            'gzip, deflate, br': 'br',
+            'gzip': 'gzip',
+            'br;q=0, gzip': 'gzip',
+            'br;q=0.5, gzip;q=0.8': 'gzip',
+            '*': 'br',
+            '*;q=0, gzip': 'gzip',
+            'identity': None,
+            '': None,
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertEqual(compression.choose_encoding(header), expected)
+
+    def test_gzip_without_brotli(self):
+        with mock.patch.object(compression, 'brotli', None):
+            self.assertEqual(compression.choose_encoding('br, gzip'), 'gzip')
+            self.assertIsNone(compression.choose_encoding('br'))
+
+    @skipUnless(compression.brotli is not None, 'brotli is not installed')
+    def test_page_is_compressed_per_request(self):
+        plain = self.client.get('/about/')
+        self.assertNotIn('Content-Encoding', plain)
+        decoders = {'br': compression.brotli.decompress, 'gzip': gzip.decompress}
+        for encoding, decode in decoders.items():
+            with self.subTest(encoding=encoding):
+                response = self.client.get('/about/', HTTP_ACCEPT_ENCODING=encoding)
+                self.assertEqual(response['Content-Encoding'], encoding)
+                self.assertIn('Accept-Encoding', response['Vary'])
+                self.assertLess(len(response.content), len(plain.content))
+                self.assertEqual(decode(response.content), plain.content)
+
+    def test_small_bodies_are_sent_as_they_are(self):
+        with override_settings(COMPRESSION={'MIN_SIZE': 10 ** 6}):
+            response = self.client.get('/about/', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertNotIn('Content-Encoding', response)
+
+    @skipUnless(compression.brotli is not None, 'brotli is not installed')
+    def test_streams_compress_chunk_by_chunk(self):
+        chunks = [b'name,email\n', b'Ravi,ravi@example.com\n' * 50, b'']
+        options = compression.get_compression_settings()
+        body = b''.join(compression.compress_stream(iter(chunks), 'br', options))
+        self.assertEqual(compression.brotli.decompress(body), b''.join(chunks))
+        body = b''.join(compression.compress_stream(iter(chunks), 'gzip', options))
+        self.assertEqual(gzip.decompress(body), b''.join(chunks))
+
+
+class CSVExportTests(TestCase):
+    """Contact exports are safe to open in a spreadsheet"""
+
+    def test_formulas_are_neutralised(self):
+        payloads = ['=HYPERLINK("http://x")', '+1+2', '-2+3', '@SUM(A1)', '\t=1', '\r=1']
+        records = [{'message': payload} for payload in payloads]
+        lines = list(csv_lines(records, fields=('message',)))[1:]
+        for payload, line in zip(payloads, lines):
+            with self.subTest(payload=payload):
+                cell = next(csv.reader([line]))[0]
+                self.assertEqual(cell, "'" + payload)
+
+    def test_other_values_unchanged(self):
+        created_at = datetime(2024, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc)
+        record = {'name': 'Ravi', 'message': 'Call me = soon', 'responded': False, 'id': -1, 'created_at': created_at}
+        fields = ('name', 'message', 'responded', 'id', 'created_at', 'email')
+        line = list(csv_lines([record], fields=fields))[1]
+        self.assertEqual(
+            next(csv.reader([line])),
+            ['Ravi', 'Call me = soon', 'False', '-1', created_at.isoformat(), ''],
+        )
+
+
+class BuildAssetsCheckTests(TestCase):
+    """build_assets --check fails while the bundle still needs a CDN"""
+
+    def test_missing_text_fonts_fail_the_check(self):
+        source_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, source_dir, ignore_errors=True)
+        shutil.copy(os.path.join(settings.BASE_DIR, 'core', 'asset_sources', 'preflight.css'), source_dir)
+        os.makedirs(os.path.join(source_dir, 'fonts'))
+
+        with override_settings(ASSETS={**getattr(settings, 'ASSETS', {}), 'SOURCE_DIR': source_dir}):
+            with self.assertRaisesMessage(CommandError, 'poppins-400.woff2'):
+                call_command('build_assets', '--check', stdout=StringIO())
+
+    @skipUnless(assets.font_subset and assets.fontawesomefree, 'fontTools and fontawesomefree build the committed bundle')
+    def test_committed_bundle_is_up_to_date(self):
+        out = StringIO()
+        call_command('build_assets', '--check', stdout=out)
+        self.assertIn('Asset bundle is up to date', out.getvalue())
+
+    def test_unsupported_tailwind_classes_are_reported(self):
+        classes = ['pt-4', 'hover:text-white', 'pt-99', 'dark:bg-black', 'mobile-menu', 'filter-btn', 'alert-']
+        self.assertEqual(unsupported_utilities(classes), ['dark:bg-black', 'pt-99'])
@@ -24,5 +24,12 @@ urlpatterns = [
     
     # API endpoints for AJAX calls
     path('api/projects/', views.api_projects, name='api_projects'),
+    path('api/projects/search/', views.api_project_search, name='api_project_search'),
     path('api/testimonials/', views.api_testimonials, name='api_testimonials'),
+    
+    # Resized copies of remote images (core/images.py)
+    path('images/<slug:key>/<int:width>.<slug:fmt>', views.image, name='image'),
+    
+    # Monitoring
+    path('metrics', views.metrics, name='metrics'),
 ]
\ No newline at end of file
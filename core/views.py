@@ -5,149 +5,252 @@ This module contains all view functions that handle HTTP requests,
 integrate with Firebase for dynamic content, and render templates.
 """
 
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseRedirect, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from django.core.paginator import Paginator
+from django.views.decorators.cache import cache_control, never_cache
+from django.utils.cache import patch_cache_control
 from django.urls import reverse
 from django.conf import settings
+import asyncio
+import hmac
 import json
 import logging
 
 from .forms import ContactForm, ServiceInquiryForm, NewsletterSubscriptionForm
-from .models import Project, ContactInquiry, Testimonial, CompanyInfo
+from .models import ContactInquiry, Project, ProjectCategory
+from .caching import versioned_condition
+from .cards import describe_projects
+from .images import CONTENT_TYPES, ImageUnavailable, available_formats, derivative_path, get_image_settings, source_url
+from .querybudget import query_budget
+from .metrics import get_metrics_settings, get_registry, render as render_metrics
+from .pagination import InvalidCursor, decode_cursor, parse_limit, DEFAULT_PAGE_SIZE
+from .repository import Record, project_repository, testimonial_repository, track_fallbacks
+from .search import search
 
 # Firebase integration (disable for Vercel deployment)
 try:
-    from firebase_config.utils import project_service, contact_service, testimonial_service
+    from firebase_config.utils import contact_service
     FIREBASE_AVAILABLE = True
 except ImportError:
     FIREBASE_AVAILABLE = False
-    project_service = None
     contact_service = None
-    testimonial_service = None
 
 logger = logging.getLogger(__name__)
 
+# Fields rendered by project/testimonial cards and served by the list APIs.
+# List reads project to these; API clients can narrow them with ``fields=``.
+PROJECT_LIST_FIELDS = ('name', 'location', 'status', 'description', 'image_url', 'featured', 'completion_date')
+TESTIMONIAL_LIST_FIELDS = ('client_name', 'client_position', 'project_name', 'testimonial_text', 'rating', 'client_image')
 
-def home(request):
+# Project cards also need the category and the version their fragment cache is keyed on
+PROJECT_CARD_FIELDS = PROJECT_LIST_FIELDS + ('category', 'updated_at')
+
+# Longer search input is truncated
+SEARCH_MAX_QUERY_LENGTH = 200
+
+
+def _no_store(response):
+    """
+    Keep a degraded render out of the page cache and any shared cache
+    
+    Used when content could not be loaded, or was served from the Django
+    models because Firestore failed, so the next request tries again.
+    
+    Args:
+        response (HttpResponse): Rendered page
+    
+    Returns:
+        HttpResponse: The same response, marked ``no-store``
+    """
+    patch_cache_control(response, no_store=True)
+    return response
+
+
+def _save_submission(data, details=()):
+    """
+    Send a form submission to Firebase and keep a ContactInquiry row for it
+    
+    The row is the admin's record of the submission and the fallback when
+    Firebase is not configured. It shares the Firestore document's ID, so
+    the mirror (core/mirror.py) updates it rather than adding a copy. A row
+    with no Firestore document also gets ``details``, the submitted fields
+    the model has no columns for, appended to its message.
+    
+    Args:
+        data (dict): Submission, with the ContactInquiry fields it has
+        details (tuple): (label, key) pairs of other fields worth keeping
+    
+    Returns:
+        tuple: (Firestore document ID or None, whether the submission was
+        saved anywhere)
+    """
+    firestore_id = contact_service.enqueue_contact(dict(data)) if FIREBASE_AVAILABLE else None
+    
+    message = data.get('message', '')
+    if firestore_id is None:
+        extra = [f"{label}: {data[key]}" for label, key in details if data.get(key)]
+        message = '\n'.join(([message] if message else []) + extra)
+    try:
+        ContactInquiry.objects.create(
+            name=data['name'],
+            email=data['email'],
+            phone=data['phone'],
+            inquiry_type=data['inquiry_type'],
+            message=message,
+            firestore_id=firestore_id,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to save {data['inquiry_type']} inquiry to Django model: {str(e)}")
+        return firestore_id, firestore_id is not None
+    return firestore_id, True
+
+
+def _parse_fields(value, allowed):
+    """
+    Parse a comma-separated ``fields`` query parameter
+    
+    Args:
+        value (str or None): Raw parameter value
+        allowed (tuple): Fields the endpoint can serve
+        
+    Returns:
+        tuple: Requested fields in ``allowed`` order, or all of ``allowed``
+        
+    Raises:
+        ValueError: If an unknown field is requested
+    """
+    if not value:
+        return allowed
+    requested = {field.strip() for field in value.split(',') if field.strip()}
+    unknown = requested - set(allowed) - {'id'}
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(field for field in allowed if field in requested)
+
+
+def _serialize(record, fields):
+    """Build an API payload from a repository record"""
+    data = {'id': record.get('id')}
+    data.update((field, record.get(field)) for field in fields)
+    
+    for field in ('image_url', 'client_image'):
+        if field in data:
+            data[field] = data[field] or ''
+    if hasattr(data.get('completion_date'), 'isoformat'):
+        data['completion_date'] = data['completion_date'].isoformat()
+    return data
+
+
+@query_budget(queries=3, firestore=2)
+async def home(request):
     """
     Homepage view with featured projects and testimonials - works with empty database
+    
+    Projects and testimonials are read concurrently from their authoritative sources.
     """
     logger.info("Homepage view called")
     
-    # Start with safe defaults
+    # Start with safe defaults; company_info comes from the context processor
     context = {
         'featured_projects': [],
         'testimonials': [],
-        'company_info': {
-            'company_name': 'Srihari Developers',
-            'tagline': 'Building Dreams, Creating Realities',
-            'description': 'Leading construction company in Tirupati specializing in residential and commercial projects.',
-            'phone': '+91-9014376635',
-            'email': 'info@sriharidevelopers.com',
-            'address': 'VSM BUILDING, Renigunta Rd, Tirupati, Andhra Pradesh 517501'
-        }
     }
     
-    try:
-        # Try to get company info from database
-        company_info = CompanyInfo.objects.first()
-        if company_info:
-            context['company_info'] = company_info
-            logger.info("Company info loaded from database")
-        else:
-            logger.info("Using default company info")
-        
-        # Try to get projects
-        projects = Project.objects.filter(featured=True)[:6]
-        context['featured_projects'] = list(projects)
-        logger.info(f"Loaded {len(context['featured_projects'])} projects")
-        
-        # Try to get testimonials
-        testimonials = Testimonial.objects.filter(is_featured=True)[:6]
-        context['testimonials'] = list(testimonials)
-        logger.info(f"Loaded {len(context['testimonials'])} testimonials")
-            
-    except Exception as e:
-        logger.error(f"Error in homepage view: {str(e)}", exc_info=True)
-        # Context already has safe defaults
+    degraded = False
+    with track_fallbacks() as fallbacks:
+        try:
+            featured_projects, testimonials = await asyncio.gather(
+                project_repository.afeatured(limit=6, fields=PROJECT_CARD_FIELDS),
+                testimonial_repository.afeatured(limit=6),
+            )
+            describe_projects(featured_projects)
+        except Exception as e:
+            logger.error(f"Error in homepage view: {str(e)}", exc_info=True)
+            # Context already has safe defaults
+            featured_projects, testimonials = [], []
+            degraded = True
+        degraded = degraded or bool(fallbacks)
+    
+    context['featured_projects'] = featured_projects
+    context['testimonials'] = testimonials
+    logger.info(f"Loaded {len(featured_projects)} projects and {len(testimonials)} testimonials")
     
     logger.info("Rendering home.html template")
-    return render(request, 'home.html', context)
+    response = await sync_to_async(render)(request, 'home.html', context)
+    return _no_store(response) if degraded else response
 
 
+@query_budget(queries=1, firestore=0)
 def about(request):
     """About page view"""
-    context = {
-        'company_info': None,
-    }
-    
-    try:
-        context['company_info'] = CompanyInfo.objects.first()
-    except Exception as e:
-        logger.error(f"Error loading company info: {str(e)}")
-    
-    return render(request, 'about.html', context)
+    return render(request, 'about.html')
 
 
+@query_budget(queries=1, firestore=0)
 def services(request):
     """Services page view"""
     context = {
         'service_form': ServiceInquiryForm(),
-        'company_info': None,
     }
     
-    try:
-        context['company_info'] = CompanyInfo.objects.first()
-    except Exception as e:
-        logger.error(f"Error loading company info: {str(e)}")
-    
     return render(request, 'services.html', context)
 
 
+@query_budget(queries=3, firestore=2)
 def projects(request):
     """
-    Projects page view with pagination and filtering
+    Projects page view with cursor-based pagination
     """
     context = {
         'projects': [],
         'project_categories': [],
         'total_projects': 0,
+        'next_cursor': None,
+        'is_first_page': True,
     }
     
-    try:
-        # Get all projects from Firebase
-        all_projects = project_service.get_all_projects()
-        
-        if all_projects:
-            context['projects'] = all_projects
-            context['total_projects'] = len(all_projects)
-        else:
-            # Fallback to Django model
-            django_projects = Project.objects.all().order_by('-created_at')
-            context['projects'] = django_projects
-            context['total_projects'] = django_projects.count()
+    cursor = None
+    if request.GET.get('cursor'):
+        try:
+            cursor = decode_cursor(request.GET['cursor'])
+            context['is_first_page'] = False
+        except InvalidCursor:
+            logger.warning(f"Ignoring invalid projects cursor: {request.GET['cursor']}")
+    
+    degraded = False
+    with track_fallbacks() as fallbacks:
+        try:
+            context['projects'], context['next_cursor'], context['total_projects'] = project_repository.page(
+                cursor, DEFAULT_PAGE_SIZE, fields=PROJECT_CARD_FIELDS
+            )
+            describe_projects(context['projects'])
             
-        # Get project categories (from Django model)
-        from .models import ProjectCategory
-        context['project_categories'] = ProjectCategory.objects.all()
-        
-    except Exception as e:
-        logger.error(f"Error loading projects: {str(e)}")
-        # Fallback to Django model
-        django_projects = Project.objects.all().order_by('-created_at')
-        context['projects'] = django_projects
-        context['total_projects'] = django_projects.count()
+            # Get project categories (from Django model)
+            context['project_categories'] = ProjectCategory.objects.all()
+            
+        except InvalidCursor:
+            logger.warning(f"Projects cursor does not match the content source: {request.GET['cursor']}")
+            return redirect('core:projects')
+        except Exception as e:
+            logger.error(f"Error loading projects: {str(e)}")
+            degraded = True
+        degraded = degraded or bool(fallbacks)
     
-    return render(request, 'projects.html', context)
+    response = render(request, 'projects.html', context)
+    return _no_store(response) if degraded else response
 
 
-def project_detail(request, project_id):
+@query_budget(queries=3, firestore=2)
+@versioned_condition('projects')
+async def project_detail(request, project_id):
     """
     Individual project detail view
+    
+    The project and the related projects are fetched concurrently.
     """
     context = {
         'project': None,
@@ -155,41 +258,22 @@ def project_detail(request, project_id):
     }
     
     try:
-        # Get project from Firebase
-        project = project_service.get_project_by_id(project_id)
+        context['project'], context['related_projects'] = await project_repository.adetail(project_id)
         
-        if project:
-            context['project'] = project
-            # Get related projects
-            related_projects = project_service.get_featured_projects(limit=4)
-            # Remove current project from related projects
-            context['related_projects'] = [p for p in related_projects if p.get('id') != project_id]
-        else:
-            # Try Django model as fallback
-            try:
-                django_project = Project.objects.get(id=project_id)
-                context['project'] = {
-                    'id': django_project.id,
-                    'name': django_project.name,
-                    'location': django_project.location,
-                    'status': django_project.status,
-                    'description': django_project.description,
-                    'image_url': django_project.image_url,
-                    'completion_date': django_project.completion_date,
-                }
-                context['related_projects'] = Project.objects.filter(featured=True).exclude(id=project_id)[:4]
-            except Project.DoesNotExist:
-                messages.error(request, "Project not found.")
-                return redirect('core:projects')
+        if context['project'] is None:
+            messages.error(request, "Project not found.")
+            return redirect('core:projects')
                 
     except Exception as e:
         logger.error(f"Error loading project {project_id}: {str(e)}")
         messages.error(request, "Error loading project details.")
         return redirect('core:projects')
     
-    return render(request, 'project_detail.html', context)
+    return await sync_to_async(render)(request, 'project_detail.html', context)
 
 
+# A POST writes to Firestore synchronously when the submission spool is disabled
+@query_budget(queries=2, firestore=1)
 def contact(request):
     """
     Contact page view with form handling
@@ -207,22 +291,11 @@ def contact(request):
                     'message': form.cleaned_data['message'],
                 }
                 
-                # Save to Firebase
-                firebase_success = contact_service.submit_contact(contact_data)
+                firestore_id, saved = _save_submission(contact_data)
+                if not saved:
+                    raise RuntimeError("Neither Firebase nor the database accepted the inquiry")
                 
-                # Also save to Django model as backup
-                try:
-                    contact_inquiry = ContactInquiry.objects.create(
-                        name=contact_data['name'],
-                        email=contact_data['email'],
-                        phone=contact_data['phone'],
-                        inquiry_type=contact_data['inquiry_type'],
-                        message=contact_data['message'],
-                    )
-                except Exception as e:
-                    logger.warning(f"Failed to save contact to Django model: {str(e)}")
-                
-                if firebase_success:
+                if firestore_id:
                     messages.success(request, 
                         "Thank you for your inquiry! We'll get back to you within 24 hours.")
                 else:
@@ -242,14 +315,8 @@ def contact(request):
     
     context = {
         'form': form,
-        'company_info': None,
     }
     
-    try:
-        context['company_info'] = CompanyInfo.objects.first()
-    except Exception as e:
-        logger.error(f"Error loading company info: {str(e)}")
-    
     return render(request, 'contact.html', context)
 
 
@@ -274,10 +341,13 @@ def service_inquiry(request):
                     'inquiry_type': 'service',
                 }
                 
-                # Save to Firebase
-                firebase_success = contact_service.submit_contact(inquiry_data)
+                firestore_id, saved = _save_submission(inquiry_data, details=(
+                    ('Service', 'service_type'), ('Budget', 'project_budget'), ('Timeline', 'timeline'),
+                ))
+                if not saved:
+                    raise RuntimeError("Neither Firebase nor the database accepted the inquiry")
                 
-                if firebase_success:
+                if firestore_id:
                     return JsonResponse({
                         'success': True,
                         'message': 'Service inquiry submitted successfully! We\'ll contact you soon.'
@@ -322,13 +392,15 @@ def newsletter_subscribe(request):
                 
                 # In a real implementation, you would save this to a newsletter service
                 # For now, we'll save it as a contact inquiry
-                newsletter_inquiry = contact_service.submit_contact({
+                _, saved = _save_submission({
                     'name': subscription_data['name'] or 'Newsletter Subscriber',
                     'email': subscription_data['email'],
                     'phone': 'Not provided',
                     'inquiry_type': 'newsletter',
                     'message': f"Newsletter subscription - Interests: {', '.join(subscription_data['interests'])}",
                 })
+                if not saved:
+                    raise RuntimeError("Neither Firebase nor the database accepted the subscription")
                 
                 return JsonResponse({
                     'success': True,
@@ -351,67 +423,114 @@ def newsletter_subscribe(request):
     return JsonResponse({'success': False, 'message': 'Invalid request method.'})
 
 
+@query_budget(queries=1, firestore=1)
+@cache_control(no_cache=True)
+@versioned_condition('projects')
 def api_projects(request):
     """
     API endpoint to fetch projects data (for AJAX requests)
+    
+    Accepts an opaque ``cursor`` from a previous response's ``next_cursor``,
+    a ``limit`` page size and a comma-separated ``fields`` list.
     """
+    limit = parse_limit(request.GET.get('limit'))
+    
     try:
-        projects = project_service.get_all_projects()
-        
-        if not projects:
-            # Fallback to Django model
-            django_projects = Project.objects.all()
-            projects = []
-            for project in django_projects:
-                projects.append({
-                    'id': project.id,
-                    'name': project.name,
-                    'location': project.location,
-                    'status': project.status,
-                    'description': project.description,
-                    'image_url': project.image_url or '',
-                    'completion_date': project.completion_date.isoformat() if project.completion_date else None,
-                    'featured': project.featured,
-                })
+        fields = _parse_fields(request.GET.get('fields'), PROJECT_LIST_FIELDS)
+        cursor = decode_cursor(request.GET['cursor']) if request.GET.get('cursor') else None
+        projects, next_cursor, _ = project_repository.page(cursor, limit, fields, with_total=False)
         
         return JsonResponse({
             'success': True,
-            'projects': projects
+            'projects': [_serialize(project, fields) for project in projects],
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None,
         })
         
+    except ValueError as e:
+        # InvalidCursor is a ValueError too
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=400)
     except Exception as e:
         logger.error(f"Error fetching projects via API: {str(e)}")
         return JsonResponse({
             'success': False,
             'message': 'Error fetching projects data.'
+        }, status=503)
+
+
+@query_budget(queries=2, firestore=0)
+@cache_control(no_cache=True)
+@versioned_condition('projects')
+def api_project_search(request):
+    """
+    API endpoint for ranked full-text search over projects
+    
+    Accepts the search text as ``q``, a 1-based ``page`` and a ``limit``
+    page size. Results come from the Django models' search index, best
+    match first.
+    """
+    query = request.GET.get('q', '').strip()[:SEARCH_MAX_QUERY_LENGTH]
+    limit = parse_limit(request.GET.get('limit'))
+    try:
+        page = max(1, int(request.GET.get('page', 1)))
+    except ValueError:
+        page = 1
+    
+    if not query:
+        return JsonResponse({
+            'success': False,
+            'message': 'Provide search text as ?q='
+        }, status=400)
+    
+    try:
+        queryset = Project.objects.only('id', *PROJECT_LIST_FIELDS)
+        projects = search(queryset, query, limit + 1, offset=(page - 1) * limit)
+        
+        return JsonResponse({
+            'success': True,
+            'query': query,
+            'projects': [
+                _serialize(Record.from_instance(project, PROJECT_LIST_FIELDS), PROJECT_LIST_FIELDS)
+                for project in projects[:limit]
+            ],
+            'page': page,
+            'has_more': len(projects) > limit,
         })
+        
+    except Exception as e:
+        logger.error(f"Error searching projects for {query!r}: {str(e)}")
+        return JsonResponse({
+            'success': False,
+            'message': 'Error searching projects.'
+        }, status=503)
 
 
+@query_budget(queries=1, firestore=1)
+@cache_control(no_cache=True)
+@versioned_condition('testimonials')
 def api_testimonials(request):
     """
     API endpoint to fetch testimonials data (for AJAX requests)
+    
+    Accepts a comma-separated ``fields`` list to trim the payload.
     """
     try:
-        testimonials = testimonial_service.get_featured_testimonials()
-        
-        if not testimonials:
-            # Fallback to Django model
-            django_testimonials = Testimonial.objects.filter(is_featured=True)
-            testimonials = []
-            for testimonial in django_testimonials:
-                testimonials.append({
-                    'id': testimonial.id,
-                    'client_name': testimonial.client_name,
-                    'client_position': testimonial.client_position,
-                    'project_name': testimonial.project_name,
-                    'testimonial_text': testimonial.testimonial_text,
-                    'rating': testimonial.rating,
-                    'client_image': testimonial.client_image or '',
-                })
+        fields = _parse_fields(request.GET.get('fields'), TESTIMONIAL_LIST_FIELDS)
+    except ValueError as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=400)
+    
+    try:
+        testimonials = testimonial_repository.featured(fields=fields)
         
         return JsonResponse({
             'success': True,
-            'testimonials': testimonials
+            'testimonials': [_serialize(testimonial, fields) for testimonial in testimonials]
         })
         
     except Exception as e:
@@ -419,4 +538,52 @@ def api_testimonials(request):
         return JsonResponse({
             'success': False,
             'message': 'Error fetching testimonials data.'
-        })
\ No newline at end of file
+        }, status=503)
+
+
+@query_budget(queries=0, firestore=0)
+@require_http_methods(["GET", "HEAD"])
+def image(request, key, width, fmt):
+    """
+    Serve a resized, re-encoded copy of a remote image (see core/images.py)
+    
+    Derivatives are created on first request and never change, so they are
+    cached as immutable. If the source cannot be fetched, redirects to it.
+    """
+    options = get_image_settings()
+    if width not in options['WIDTHS'] or fmt not in available_formats(options):
+        raise Http404
+    
+    try:
+        path = derivative_path(key, width, fmt, options)
+    except ImageUnavailable:
+        url = source_url(key, options)
+        if url is None:
+            raise Http404
+        response = HttpResponseRedirect(url)
+        response['Cache-Control'] = 'no-cache'
+        return response
+    
+    response = FileResponse(open(path, 'rb'), content_type=CONTENT_TYPES[fmt])
+    response['Cache-Control'] = f"public, max-age={options['MAX_AGE']}, immutable"
+    return response
+
+
+@never_cache
+@require_http_methods(["GET"])
+def metrics(request):
+    """
+    Prometheus metrics for all workers
+    
+    Requires ``Authorization: Bearer <METRICS['TOKEN']>``; without a
+    configured token the endpoint does not exist.
+    """
+    token = get_metrics_settings()['TOKEN']
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+    if not token or not hmac.compare_digest(supplied.encode(), token.encode()):
+        raise Http404
+    
+    return HttpResponse(
+        render_metrics(get_registry().collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
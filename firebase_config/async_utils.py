@@ -0,0 +1,206 @@
+"""
+Async Firebase utilities for Srihari Developers website
+
+Async counterparts of the read operations in ``firebase_config.utils``,
+built on Firestore's AsyncClient so views running under ASGI can gather
+independent reads concurrently. Results share the same query cache and
+cache keys as the sync services. Under WSGI, where every async view gets
+an event loop of its own, they call the sync services in a worker thread
+instead (see ``async_client_enabled()``).
+"""
+
+from asgiref.sync import sync_to_async
+from django.utils.functional import SimpleLazyObject
+from .firebase_admin_setup import aget_async_firestore_client, async_client_enabled, get_firestore_client
+from .cache import get_query_cache, get_collection_watcher, get_cache_settings
+from .utils import FirebaseService, FirestoreReadError, project_service, testimonial_service
+from .circuit import get_circuit_breaker, get_call_timeout
+from .tracking import timed_rpc
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncFirebaseService:
+    """Service class for async Firebase operations"""
+
+    COLLECTION_NAME = None
+
+    # Sync service with the same reads, used where async clients are disabled
+    sync_service = None
+
+    def __init__(self):
+        self.cache = get_query_cache()
+
+    async def client(self):
+        """Async Firestore client for the running event loop, or None"""
+        return await aget_async_firestore_client()
+
+    def sync_read(self, name):
+        """The sync service's read ``name``, run in a worker thread"""
+        return sync_to_async(getattr(self.sync_service, name))
+
+    @property
+    def call_timeout(self):
+        """Deadline in seconds for each Firestore call"""
+        return get_call_timeout()
+
+    async def cached_query(self, query_name, params, loader):
+        """
+        Run an async read through the shared query cache
+
+        Args:
+            query_name (str): Name of the query within this collection
+            params (tuple): Hashable query parameters
+            loader (callable): Coroutine function performing the read on a miss
+
+        Returns:
+            Copy of the cached result
+        """
+        breaker = get_circuit_breaker()
+
+        async def tracked_loader():
+            with timed_rpc(f"{self.COLLECTION_NAME}.{query_name}"):
+                return await loader()
+
+        def load():
+            return breaker.acall(tracked_loader)
+
+        if not get_cache_settings()['ENABLED']:
+            return await load()
+
+        # Change listeners run on the sync client's background threads
+        get_collection_watcher().watch(get_firestore_client(), self.COLLECTION_NAME)
+        result = await self.cache.aget_or_load(
+            self.COLLECTION_NAME,
+            (query_name,) + tuple(params),
+            load,
+            ttl=self.cache.ttl_for(f"{self.COLLECTION_NAME}.{query_name}"),
+        )
+        if isinstance(result, list):
+            return [dict(item) for item in result]
+        if isinstance(result, dict):
+            return dict(result)
+        return result
+
+
+class AsyncProjectService(AsyncFirebaseService):
+    """Service for async project-related Firebase operations"""
+
+    COLLECTION_NAME = 'projects'
+    sync_service = project_service
+
+    async def get_featured_projects(self, limit=6):
+        """
+        Get featured projects for homepage
+
+        Args:
+            limit (int): Maximum number of projects to return
+
+        Returns:
+            list: List of featured project documents
+
+        Raises:
+            FirestoreReadError: If Firebase is unavailable or the read fails
+        """
+        if not async_client_enabled():
+            return await self.sync_read('get_featured_projects')(limit=limit)
+        db = await self.client()
+        if db is None or get_circuit_breaker().is_open():
+            raise FirestoreReadError('Firebase is not available')
+
+        async def load():
+            docs = await (db.collection(self.COLLECTION_NAME)
+                         .where('featured', '==', True)
+                         .order_by('created_at', direction='DESCENDING')
+                         .limit(limit)
+                         .get(timeout=self.call_timeout))
+            return FirebaseService._documents_to_list(docs)
+
+        try:
+            return await self.cached_query('featured', (limit,), load)
+        except Exception as e:
+            logger.error(f"Error fetching featured projects: {str(e)}")
+            raise FirestoreReadError(str(e)) from e
+
+    async def get_project_by_id(self, project_id):
+        """
+        Get a specific project by ID
+
+        Args:
+            project_id (str): Project document ID
+
+        Returns:
+            dict or None: Project data if found
+
+        Raises:
+            FirestoreReadError: If Firebase is unavailable or the read fails
+        """
+        if not async_client_enabled():
+            return await self.sync_read('get_project_by_id')(project_id)
+        db = await self.client()
+        if db is None or get_circuit_breaker().is_open():
+            raise FirestoreReadError('Firebase is not available')
+
+        async def load():
+            doc = await db.collection(self.COLLECTION_NAME).document(project_id).get(timeout=self.call_timeout)
+            if doc.exists:
+                project_data = doc.to_dict()
+                project_data['id'] = doc.id
+                return project_data
+            return None
+
+        try:
+            return await self.cached_query('detail', (project_id,), load)
+        except Exception as e:
+            logger.error(f"Error fetching project {project_id}: {str(e)}")
+            raise FirestoreReadError(str(e)) from e
+
+
+class AsyncTestimonialService(AsyncFirebaseService):
+    """Service for async testimonial-related Firebase operations"""
+
+    COLLECTION_NAME = 'testimonials'
+    sync_service = testimonial_service
+
+    async def get_featured_testimonials(self, limit=6, fields=None):
+        """
+        Get featured testimonials for display
+
+        Args:
+            limit (int): Maximum number of testimonials to return
+            fields (tuple): Only read these document fields, or None for all
+
+        Returns:
+            list: List of testimonial documents
+
+        Raises:
+            FirestoreReadError: If Firebase is unavailable or the read fails
+        """
+        if not async_client_enabled():
+            return await self.sync_read('get_featured_testimonials')(limit=limit, fields=fields)
+        db = await self.client()
+        if db is None or get_circuit_breaker().is_open():
+            raise FirestoreReadError('Firebase is not available')
+
+        async def load():
+            query = db.collection(self.COLLECTION_NAME)
+            if fields:
+                query = query.select(list(fields))
+            docs = await (query
+                         .where('is_featured', '==', True)
+                         .order_by('created_at', direction='DESCENDING')
+                         .limit(limit)
+                         .get(timeout=self.call_timeout))
+            return FirebaseService._documents_to_list(docs)
+
+        try:
+            return await self.cached_query('featured', (limit, fields), load)
+        except Exception as e:
+            logger.error(f"Error fetching testimonials: {str(e)}")
+            raise FirestoreReadError(str(e)) from e
+
+
+# Service instances, constructed on first use
+async_project_service = SimpleLazyObject(AsyncProjectService)
+async_testimonial_service = SimpleLazyObject(AsyncTestimonialService)
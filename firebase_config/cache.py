@@ -0,0 +1,407 @@
+"""
+Read-through query cache for Srihari Developers Firebase services
+
+Service-layer query results are kept in a bounded, in-process LRU cache.
+Every entry has a freshness TTL and a longer stale window: a stale entry is
+served immediately while a background thread refreshes it. Entries are
+dropped per collection when a Firestore snapshot listener reports a change,
+or when the polling fallback (used for emulators and fakes that cannot
+listen) notices the collection fingerprint moved.
+"""
+
+from collections import OrderedDict
+from django.conf import settings
+import threading
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CACHE_SETTINGS = {
+    'ENABLED': True,
+    'MAX_ENTRIES': 256,
+    'DEFAULT_TTL': 30,
+    'STALE_TTL': 300,
+    'QUERY_TTLS': {},
+    'LISTENERS': True,
+    'POLL_INTERVAL': 5,
+}
+
+
+def get_cache_settings():
+    """
+    Merge the project's FIREBASE_CACHE setting over the defaults
+
+    Returns:
+        dict: Effective cache settings
+    """
+    options = dict(DEFAULT_CACHE_SETTINGS)
+    options.update(getattr(settings, 'FIREBASE_CACHE', {}))
+    return options
+
+
+class CacheEntry:
+    """A cached query result with its freshness window"""
+
+    __slots__ = ('value', 'stored_at', 'ttl', 'stale_ttl')
+
+    def __init__(self, value, ttl, stale_ttl):
+        self.value = value
+        self.stored_at = time.monotonic()
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+    def age(self):
+        return time.monotonic() - self.stored_at
+
+
+class QueryCache:
+    """
+    Bounded LRU cache of query results grouped by Firestore collection
+
+    Each collection carries a generation counter that is bumped on
+    invalidation, so a load that started before a change never stores
+    its (possibly outdated) result.
+    """
+
+    def __init__(self, max_entries=256, default_ttl=30, stale_ttl=300, query_ttls=None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.query_ttls = query_ttls or {}
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._refreshing = set()
+        # The event loop only keeps weak references to its tasks
+        self._tasks = set()
+        self._listeners = []
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def ttl_for(self, query_name):
+        """Return the freshness TTL configured for a named query"""
+        return self.query_ttls.get(query_name, self.default_ttl)
+
+    def add_invalidation_listener(self, callback):
+        """
+        Call ``callback(collection)`` whenever a collection is invalidated
+
+        Lets higher layers (page caches, HTTP validators) follow Firestore changes.
+        """
+        self._listeners.append(callback)
+
+    def generation(self, collection):
+        """Return the invalidation counter for a collection"""
+        with self._lock:
+            return self._generations.get(collection, 0)
+
+    def get_or_load(self, collection, key, loader, ttl=None):
+        """
+        Return a cached value, loading it through ``loader`` on a miss
+
+        Args:
+            collection (str): Firestore collection the query reads
+            key (tuple): Hashable query identity within the collection
+            loader (callable): Zero-argument function producing the value
+            ttl (float): Freshness TTL in seconds for this entry
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        state, entry, generation = self._lookup(collection, key)
+        if state == 'stale':
+            self._schedule_refresh(collection, key, loader, ttl)
+        if state != 'miss':
+            return entry.value
+
+        try:
+            value = loader()
+        except Exception:
+            if entry is not None:
+                logger.warning(f"Serving expired cache entry for {collection} {key} after load failure")
+                return entry.value
+            raise
+
+        self._store(collection, key, value, ttl, generation)
+        return value
+
+    async def aget_or_load(self, collection, key, loader, ttl=None):
+        """
+        Async variant of ``get_or_load`` for coroutine loaders
+
+        Stale entries are refreshed in a task on the running event loop.
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        state, entry, generation = self._lookup(collection, key)
+        if state == 'stale':
+            self._schedule_async_refresh(collection, key, loader, ttl)
+        if state != 'miss':
+            return entry.value
+
+        try:
+            value = await loader()
+        except Exception:
+            if entry is not None:
+                logger.warning(f"Serving expired cache entry for {collection} {key} after load failure")
+                return entry.value
+            raise
+
+        self._store(collection, key, value, ttl, generation)
+        return value
+
+    def _lookup(self, collection, key):
+        """
+        Classify a cache key as 'fresh', 'stale' or 'miss'
+
+        Returns:
+            tuple: (state, entry or None, collection generation)
+        """
+        cache_key = (collection, key)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            generation = self._generations.get(collection, 0)
+            if entry is not None:
+                age = entry.age()
+                if age < entry.ttl + entry.stale_ttl:
+                    self._entries.move_to_end(cache_key)
+                    if age < entry.ttl:
+                        self.hits += 1
+                        return 'fresh', entry, generation
+                    self.stale_hits += 1
+                    return 'stale', entry, generation
+            self.misses += 1
+            return 'miss', entry, generation
+
+    def invalidate_collection(self, collection):
+        """Drop every cached query for a collection"""
+        with self._lock:
+            self._generations[collection] = self._generations.get(collection, 0) + 1
+            stale_keys = [cache_key for cache_key in self._entries if cache_key[0] == collection]
+            for cache_key in stale_keys:
+                del self._entries[cache_key]
+        if stale_keys:
+            logger.debug(f"Invalidated {len(stale_keys)} cached queries for {collection}")
+        for callback in list(self._listeners):
+            try:
+                callback(collection)
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener failed for {collection}: {str(e)}")
+
+    def clear(self):
+        """Drop every cached query"""
+        with self._lock:
+            for collection in {cache_key[0] for cache_key in self._entries}:
+                self._generations[collection] = self._generations.get(collection, 0) + 1
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters and the current size"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+            }
+
+    def _store(self, collection, key, value, ttl, generation):
+        with self._lock:
+            if self._generations.get(collection, 0) != generation:
+                # The collection changed while we were loading
+                return
+            cache_key = (collection, key)
+            self._entries[cache_key] = CacheEntry(value, ttl, self.stale_ttl)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _schedule_refresh(self, collection, key, loader, ttl):
+        cache_key = (collection, key)
+        with self._lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+            generation = self._generations.get(collection, 0)
+
+        def refresh():
+            try:
+                self._store(collection, key, loader(), ttl, generation)
+            except Exception as e:
+                logger.warning(f"Background refresh failed for {collection} {key}: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(cache_key)
+
+        threading.Thread(target=refresh, name=f"firestore-cache-refresh-{collection}", daemon=True).start()
+
+    def _schedule_async_refresh(self, collection, key, loader, ttl):
+        cache_key = (collection, key)
+        with self._lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+            generation = self._generations.get(collection, 0)
+
+        async def refresh():
+            try:
+                self._store(collection, key, await loader(), ttl, generation)
+            except Exception as e:
+                logger.warning(f"Background refresh failed for {collection} {key}: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(cache_key)
+
+        task = asyncio.get_running_loop().create_task(refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+class CollectionWatcher:
+    """
+    Invalidates cached queries when a Firestore collection changes
+
+    Uses ``on_snapshot`` listeners where the client supports them and falls
+    back to polling a key-only fingerprint of the collection otherwise.
+    """
+
+    def __init__(self, cache, use_listeners=True, poll_interval=5):
+        self.cache = cache
+        self.use_listeners = use_listeners
+        self.poll_interval = poll_interval
+        self._watches = {}
+        self._polled = {}
+        self._poll_thread = None
+        self._lock = threading.Lock()
+
+    def watch(self, db, collection):
+        """
+        Start watching a collection, once per process
+
+        Args:
+            db: Firestore client
+            collection (str): Collection name
+        """
+        if db is None or collection in self._watches or collection in self._polled:
+            return
+
+        with self._lock:
+            if collection in self._watches or collection in self._polled:
+                return
+
+            if self.use_listeners:
+                try:
+                    self._watches[collection] = db.collection(collection).on_snapshot(
+                        self._snapshot_callback(collection)
+                    )
+                    logger.info(f"Listening for changes on Firestore collection '{collection}'")
+                    return
+                except Exception as e:
+                    logger.warning(f"Snapshot listener unavailable for '{collection}', polling instead: {str(e)}")
+
+            self._polled[collection] = (db, None)
+            self._ensure_polling()
+
+    def stop(self):
+        """Unsubscribe every listener and stop polling"""
+        with self._lock:
+            for watch in self._watches.values():
+                try:
+                    watch.unsubscribe()
+                except Exception:
+                    pass
+            self._watches.clear()
+            self._polled.clear()
+
+    def _snapshot_callback(self, collection):
+        initial = {'seen': False}
+
+        def on_snapshot(col_snapshot, changes, read_time):
+            # The first callback delivers the current state, not a change
+            if not initial['seen']:
+                initial['seen'] = True
+                return
+            if changes:
+                self.cache.invalidate_collection(collection)
+
+        return on_snapshot
+
+    def _ensure_polling(self):
+        if self._poll_thread is not None and self._poll_thread.is_alive():
+            return
+        self._poll_thread = threading.Thread(target=self._poll_loop, name='firestore-cache-poller', daemon=True)
+        self._poll_thread.start()
+
+    def _poll_loop(self):
+        while True:
+            with self._lock:
+                polled = list(self._polled.items())
+            if not polled:
+                return
+            for collection, (db, previous) in polled:
+                try:
+                    fingerprint = self._fingerprint(db, collection)
+                except Exception as e:
+                    logger.debug(f"Polling '{collection}' failed: {str(e)}")
+                    continue
+                if previous is not None and fingerprint != previous:
+                    self.cache.invalidate_collection(collection)
+                with self._lock:
+                    if collection in self._polled:
+                        self._polled[collection] = (db, fingerprint)
+            time.sleep(self.poll_interval)
+
+    @staticmethod
+    def _fingerprint(db, collection):
+        docs = db.collection(collection).select([]).get()
+        return frozenset((doc.id, str(getattr(doc, 'update_time', None))) for doc in docs)
+
+
+_query_cache = None
+_watcher = None
+_init_lock = threading.RLock()
+
+
+def get_query_cache():
+    """
+    Get the process-wide query cache, creating it on first use
+
+    Returns:
+        QueryCache: Shared cache instance
+    """
+    global _query_cache
+    if _query_cache is None:
+        with _init_lock:
+            if _query_cache is None:
+                options = get_cache_settings()
+                _query_cache = QueryCache(
+                    max_entries=options['MAX_ENTRIES'],
+                    default_ttl=options['DEFAULT_TTL'],
+                    stale_ttl=options['STALE_TTL'],
+                    query_ttls=options['QUERY_TTLS'],
+                )
+    return _query_cache
+
+
+def get_collection_watcher():
+    """
+    Get the process-wide collection watcher, creating it on first use
+
+    Returns:
+        CollectionWatcher: Shared watcher instance
+    """
+    global _watcher
+    if _watcher is None:
+        with _init_lock:
+            if _watcher is None:
+                options = get_cache_settings()
+                _watcher = CollectionWatcher(
+                    get_query_cache(),
+                    use_listeners=options['LISTENERS'],
+                    poll_interval=options['POLL_INTERVAL'],
+                )
+    return _watcher
@@ -0,0 +1,199 @@
+"""
+Circuit breaker for Srihari Developers Firebase access
+
+When Firebase initialization fails, or Firestore calls keep failing, the
+circuit opens and callers skip Firebase entirely (going straight to the
+Django models or cached data) instead of paying for another failed attempt
+on every request. After a backoff period one probe request is let through
+(half-open); success closes the circuit, failure reopens it with the
+backoff doubled up to a maximum. A probe that is cancelled instead gives
+its turn back, so the next call probes again.
+"""
+
+from django.conf import settings
+import threading
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CIRCUIT_SETTINGS = {
+    'FAILURE_THRESHOLD': 3,
+    'RESET_TIMEOUT': 5,
+    'MAX_RESET_TIMEOUT': 300,
+    'CALL_TIMEOUT': 2.0,
+}
+
+
+def get_circuit_settings():
+    """
+    Merge the project's FIREBASE_CIRCUIT setting over the defaults
+
+    Returns:
+        dict: Effective circuit breaker settings
+    """
+    options = dict(DEFAULT_CIRCUIT_SETTINGS)
+    options.update(getattr(settings, 'FIREBASE_CIRCUIT', {}))
+    return options
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the circuit is open"""
+
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit breaker with exponential reset backoff"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=5, max_reset_timeout=300):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.open_until = 0.0
+        self._backoff = reset_timeout
+        self._lock = threading.Lock()
+
+    def is_open(self):
+        """
+        Check whether calls would currently be refused
+
+        Unlike ``allow_request`` this never claims the half-open probe.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return False
+            if self.state == self.OPEN:
+                return time.monotonic() < self.open_until
+            return True
+
+    def allow_request(self):
+        """
+        Check whether a call may proceed, claiming the probe if one is due
+
+        Returns:
+            bool: True if the caller should attempt the call
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() >= self.open_until:
+                self.state = self.HALF_OPEN
+                logger.info(f"Circuit '{self.name}' half-open, probing")
+                return True
+            return False
+
+    def record_success(self):
+        """Close the circuit after a successful call"""
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit '{self.name}' closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._backoff = self.reset_timeout
+
+    def record_failure(self):
+        """Count a failed call, opening the circuit at the threshold"""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self._open()
+
+    def release_probe(self):
+        """
+        Give back a claimed probe without a verdict
+
+        Used when the probe call was cancelled or interrupted rather than
+        failed, so the next call can probe instead of the circuit staying
+        half-open for good.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self.open_until = time.monotonic()
+
+    def trip(self):
+        """Open the circuit immediately"""
+        with self._lock:
+            self._open()
+
+    def _open(self):
+        if self.state == self.HALF_OPEN:
+            self._backoff = min(self._backoff * 2, self.max_reset_timeout)
+        elif self.state == self.CLOSED:
+            self._backoff = self.reset_timeout
+        self.state = self.OPEN
+        self.open_until = time.monotonic() + self._backoff
+        logger.warning(f"Circuit '{self.name}' open for {self._backoff:g}s")
+
+    def call(self, func, *args, **kwargs):
+        """
+        Run ``func`` through the breaker
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuit '{self.name}' is open")
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        except BaseException:
+            self.release_probe()
+            raise
+        self.record_success()
+        return result
+
+    async def acall(self, func, *args, **kwargs):
+        """Async variant of ``call`` for coroutine functions"""
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuit '{self.name}' is open")
+        try:
+            result = await func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        except BaseException:
+            # Cancelled (asyncio.CancelledError is not an Exception)
+            self.release_probe()
+            raise
+        self.record_success()
+        return result
+
+
+_breaker = None
+_init_lock = threading.Lock()
+
+
+def get_circuit_breaker():
+    """
+    Get the process-wide Firebase circuit breaker
+
+    Returns:
+        CircuitBreaker: Shared breaker instance
+    """
+    global _breaker
+    if _breaker is None:
+        with _init_lock:
+            if _breaker is None:
+                options = get_circuit_settings()
+                _breaker = CircuitBreaker(
+                    'firebase',
+                    failure_threshold=options['FAILURE_THRESHOLD'],
+                    reset_timeout=options['RESET_TIMEOUT'],
+                    max_reset_timeout=options['MAX_RESET_TIMEOUT'],
+                )
+    return _breaker
+
+
+def get_call_timeout():
+    """Deadline in seconds applied to each Firestore call"""
+    return get_circuit_settings()['CALL_TIMEOUT']
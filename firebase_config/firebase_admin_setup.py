@@ -3,13 +3,21 @@ Firebase Admin Setup for Srihari Developers
 
 This module initializes Firebase Admin SDK for server-side operations
 with Firestore database for storing projects, contacts, and other data.
+
+Nothing is initialized at import time. ``firebase_admin`` and the gRPC
+stack are imported, and credentials loaded, on the first request that
+needs Firestore, or at startup when FIREBASE_WARMUP is enabled.
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
+from asgiref.sync import sync_to_async
 from django.conf import settings
+import threading
 import os
+import asyncio
 import logging
+import weakref
+
+from .circuit import get_circuit_breaker
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -17,19 +25,58 @@ logger = logging.getLogger(__name__)
 # Global variables to store Firebase instances
 _db = None
 _app = None
+_init_lock = threading.Lock()
+
+# Async clients are bound to the event loop that created them
+_async_clients = weakref.WeakKeyDictionary()
 
 
 def initialize_firebase():
     """
     Initialize Firebase Admin SDK
     
+    Attempts are gated by the Firebase circuit breaker: after a failure the
+    circuit opens and initialization is only retried on the breaker's
+    backoff schedule, not on every call.
+    
     Returns:
         firestore.Client: Firestore database client
     """
+    global _db
+    
+    if _db is not None:
+        return _db
+    
+    if _uses_memory_backend():
+        from .memory import get_memory_client
+        _db = get_memory_client()
+        logger.info("Using the in-memory Firestore backend")
+        return _db
+    
+    # Requests arriving while another thread initializes use the fallback
+    if not _init_lock.acquire(blocking=False):
+        return None
+    try:
+        return _initialize_locked()
+    finally:
+        _init_lock.release()
+
+
+def _initialize_locked():
     global _db, _app
     
-    if _app is None:
-        try:
+    if _db is not None:
+        return _db
+    
+    breaker = get_circuit_breaker()
+    if not breaker.allow_request():
+        return None
+    
+    try:
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+        
+        if _app is None:
             # Check if service account key file exists
             if hasattr(settings, 'FIREBASE_SERVICE_ACCOUNT_KEY') and os.path.exists(settings.FIREBASE_SERVICE_ACCOUNT_KEY):
                 # Initialize with service account key file
@@ -40,18 +87,25 @@ def initialize_firebase():
                 # Initialize with default credentials (for deployment)
                 _app = firebase_admin.initialize_app()
                 logger.info("Firebase initialized with default credentials")
-                
-            _db = firestore.client()
-            logger.info("Firestore client initialized successfully")
-            
-        except Exception as e:
-            logger.error(f"Firebase initialization failed: {str(e)}")
-            # For development without Firebase setup
-            _db = None
             
+        _db = firestore.client()
+        logger.info("Firestore client initialized successfully")
+        breaker.record_success()
+        
+    except Exception as e:
+        logger.error(f"Firebase initialization failed: {str(e)}")
+        # For development without Firebase setup
+        _db = None
+        breaker.trip()
+        
     return _db
 
 
+def _uses_memory_backend():
+    """True when FIREBASE_BACKEND selects the in-memory stand-in"""
+    return getattr(settings, 'FIREBASE_BACKEND', 'firestore') == 'memory'
+
+
 def get_firestore_client():
     """
     Get Firestore database client
@@ -64,23 +118,86 @@ def get_firestore_client():
     return _db
 
 
+def async_client_enabled():
+    """
+    Check whether async views should read Firestore with an AsyncClient
+    
+    Only an ASGI server keeps one event loop for the life of the worker.
+    Under WSGI each async view runs on a new loop, so a client per loop
+    would open (and never close) a gRPC channel per request; the async
+    services read through the sync client in a worker thread instead.
+    
+    Returns:
+        bool: The FIREBASE_ASYNC_CLIENT setting, set by sriharidevelopers/asgi.py
+    """
+    return getattr(settings, 'FIREBASE_ASYNC_CLIENT', False)
+
+
+async def aget_async_firestore_client():
+    """
+    Get an async Firestore client for the running event loop
+    
+    Firebase is initialized in a worker thread, so a first request doesn't
+    block the event loop on loading credentials.
+    
+    Returns:
+        firestore.AsyncClient or None: Async client if Firebase is available
+        and ``async_client_enabled()``
+    """
+    if not async_client_enabled():
+        return None
+    if _db is None and await sync_to_async(initialize_firebase)() is None:
+        return None
+    
+    if _uses_memory_backend():
+        from .memory import get_memory_client
+        return get_memory_client(asynchronous=True)
+    
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        try:
+            from firebase_admin import firestore_async
+            client = firestore_async.client()
+        except Exception as e:
+            logger.error(f"Async Firestore client initialization failed: {str(e)}")
+            return None
+        _async_clients[loop] = client
+    return client
+
+
 def is_firebase_available():
     """
     Check if Firebase is properly configured and available
     
+    Returns False while the circuit breaker is open, so callers fall back
+    to Django models without attempting a Firestore call.
+    
     Returns:
         bool: True if Firebase is available, False otherwise
     """
     try:
         db = get_firestore_client()
-        return db is not None
+        return db is not None and not get_circuit_breaker().is_open()
     except Exception:
         return False
 
 
-# Initialize Firebase when the module is imported
-try:
-    initialize_firebase()
-except Exception as e:
-    logger.warning(f"Firebase initialization failed during import: {str(e)}")
-    logger.warning("The website will work in local mode without Firebase features")
\ No newline at end of file
+def warmup_firebase(background=True):
+    """
+    Initialize Firebase ahead of the first request
+    
+    Args:
+        background (bool): Initialize in a daemon thread instead of blocking
+        
+    Returns:
+        threading.Thread or None: The warmup thread when ``background``
+    """
+    logger.info("Warming up Firebase")
+    if not background:
+        initialize_firebase()
+        return None
+    
+    thread = threading.Thread(target=initialize_firebase, name='firebase-warmup', daemon=True)
+    thread.start()
+    return thread
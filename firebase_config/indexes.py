@@ -0,0 +1,89 @@
+"""
+Firestore composite index planning for Srihari Developers website
+
+Firestore answers single-field queries from its automatic indexes, but a
+query that combines an equality or array filter with an ordering, orders on
+several fields, or orders on a field other than its inequality filter needs
+a composite index declared in ``firestore.indexes.json``. This module turns
+query shapes (see ``memory.Query.shape``) into those declarations.
+"""
+
+EQUALITY_OPERATORS = ('==', 'in')
+ARRAY_OPERATORS = ('array-contains', 'array-contains-any')
+
+
+def required_index(collection, filters, orders):
+    """
+    Work out the composite index a query needs
+
+    Args:
+        collection (str): Collection the query reads
+        filters (tuple): (field, operator) pairs
+        orders (tuple): (field, 'ASCENDING' or 'DESCENDING') pairs
+
+    Returns:
+        dict or None: ``firestore.indexes.json`` index entry, or None when
+        automatic single-field indexes serve the query
+    """
+    equality = []
+    array_field = None
+    inequality = []
+    for field_path, op_string in filters:
+        if op_string in EQUALITY_OPERATORS:
+            if field_path not in equality:
+                equality.append(field_path)
+        elif op_string in ARRAY_OPERATORS:
+            array_field = field_path
+        elif field_path not in inequality:
+            inequality.append(field_path)
+
+    # Inequality fields are implicitly ordered first when not ordered explicitly
+    orders = list(orders)
+    ordered = [field_path for field_path, _ in orders]
+    for field_path in reversed(inequality):
+        if field_path not in ordered:
+            orders.insert(0, (field_path, 'ASCENDING'))
+
+    # A trailing __name__ order in the same direction is implicit in every index
+    if len(orders) > 1 and orders[-1][0] == '__name__' and orders[-1][1] == orders[-2][1]:
+        orders.pop()
+    if orders and orders[0][0] == '__name__' and len(orders) == 1:
+        orders.pop()
+
+    if not orders and array_field is None:
+        # Equality filters alone are served by merging single-field indexes
+        return None
+
+    fields = [
+        {'fieldPath': field_path, 'order': 'ASCENDING'}
+        for field_path in equality if field_path not in [f for f, _ in orders]
+    ]
+    if array_field is not None:
+        fields.append({'fieldPath': array_field, 'arrayConfig': 'CONTAINS'})
+    fields.extend({'fieldPath': field_path, 'order': direction} for field_path, direction in orders)
+
+    if len(fields) < 2:
+        return None
+    return {'collectionGroup': collection, 'queryScope': 'COLLECTION', 'fields': fields}
+
+
+def build_index_config(shapes):
+    """
+    Build the contents of ``firestore.indexes.json``
+
+    Args:
+        shapes (iterable): (collection, filters, orders) query shapes
+
+    Returns:
+        dict: Deduplicated, sorted index configuration
+    """
+    indexes = {}
+    for collection, filters, orders in shapes:
+        index = required_index(collection, filters, orders)
+        if index is not None:
+            key = (index['collectionGroup'], tuple(tuple(sorted(field.items())) for field in index['fields']))
+            indexes[key] = index
+    return {
+        'indexes': [indexes[key] for key in sorted(indexes)],
+        'fieldOverrides': [],
+    }
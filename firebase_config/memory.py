@@ -0,0 +1,593 @@
+"""
+In-memory Firestore stand-in for Srihari Developers website
+
+Implements the part of the Firestore client API the services use:
+``collection().where().order_by().select().start_after().limit().get()``,
+``stream()``, ``count()``, ``document().get()/set()/update()/delete()``,
+``add()``, write batches and ``on_snapshot``. Every round trip can be given
+latency, jitter and a failure rate, so caching, deadlines, the circuit
+breaker and fan-out can be measured deterministically without Firestore.
+
+Selected with ``FIREBASE_BACKEND = 'memory'``; see FIREBASE_MEMORY in
+settings. The sync and async clients share one store.
+"""
+
+from datetime import datetime, timezone
+from django.conf import settings
+import threading
+import logging
+import asyncio
+import copy
+import random
+import string
+import json
+import time
+
+logger = logging.getLogger(__name__)
+
+try:
+    from google.api_core.exceptions import DeadlineExceeded, ServiceUnavailable
+except ImportError:
+    class DeadlineExceeded(Exception):
+        """Stand-in for google.api_core.exceptions.DeadlineExceeded"""
+
+    class ServiceUnavailable(Exception):
+        """Stand-in for google.api_core.exceptions.ServiceUnavailable"""
+
+
+DEFAULT_MEMORY_SETTINGS = {
+    'LATENCY': 0.0,
+    'JITTER': 0.0,
+    'FAILURE_RATE': 0.0,
+    'SEED': None,
+    'FIXTURE': None,
+}
+
+# Parsed back into datetimes when loading a JSON fixture
+TIMESTAMP_FIELDS = ('created_at', 'updated_at')
+
+# Firestore orders values of different types by type first
+_TYPE_ORDER = ((type(None), 0), (bool, 1), (int, 2), (float, 2), (datetime, 3), (str, 4), (bytes, 5))
+
+
+def get_memory_settings():
+    """
+    Merge the project's FIREBASE_MEMORY setting over the defaults
+
+    Returns:
+        dict: Effective in-memory backend settings
+    """
+    options = dict(DEFAULT_MEMORY_SETTINGS)
+    options.update(getattr(settings, 'FIREBASE_MEMORY', {}))
+    return options
+
+
+def _sort_value(value):
+    for kind, rank in _TYPE_ORDER:
+        if isinstance(value, kind):
+            return (rank, value)
+    return (6, str(value))
+
+
+def _normalize(value):
+    """Store datetimes as aware UTC, as Firestore returns them"""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.astimezone()
+        return value.astimezone(timezone.utc)
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def _new_id():
+    return ''.join(random.choices(string.ascii_letters + string.digits, k=20))
+
+
+_MISSING = object()
+
+
+def _get_field(data, path):
+    for part in path.split('.'):
+        if not isinstance(data, dict) or part not in data:
+            return _MISSING
+        data = data[part]
+    return data
+
+
+def _matches(value, op, operand):
+    if value is _MISSING:
+        return False
+    if op == '==':
+        return value == operand
+    if op == '!=':
+        return value != operand
+    if op == 'in':
+        return value in operand
+    if op == 'not-in':
+        return value not in operand
+    if op == 'array-contains':
+        return isinstance(value, list) and operand in value
+    if op == 'array-contains-any':
+        return isinstance(value, list) and any(item in value for item in operand)
+    left, right = _sort_value(value), _sort_value(operand)
+    if left[0] != right[0]:
+        return False
+    return {'<': left < right, '<=': left <= right, '>': left > right, '>=': left >= right}[op]
+
+
+class _Document:
+    __slots__ = ('data', 'create_time', 'update_time')
+
+    def __init__(self, data, create_time, update_time):
+        self.data = data
+        self.create_time = create_time
+        self.update_time = update_time
+
+
+class DocumentSnapshot:
+    """Result of reading one document"""
+
+    def __init__(self, reference, document, field_paths=None):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = document is not None
+        self.create_time = document.create_time if document else None
+        self.update_time = document.update_time if document else None
+        self._data = None
+        if document is not None:
+            data = document.data
+            if field_paths is not None:
+                data = {path: data[path] for path in field_paths if path in data}
+            self._data = copy.deepcopy(data)
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self.exists else None
+
+    def get(self, field_path):
+        value = _get_field(self._data or {}, field_path)
+        if value is _MISSING:
+            raise KeyError(field_path)
+        return value
+
+
+class AggregationResult:
+    def __init__(self, alias, value):
+        self.alias = alias
+        self.value = value
+
+
+class AggregationQuery:
+    """``query.count()``"""
+
+    def __init__(self, query, alias='count'):
+        self._query = query
+        self._alias = alias
+
+    def get(self, transaction=None, retry=None, timeout=None):
+        return self._query._client._rpc(
+            lambda: [[AggregationResult(self._alias, len(self._query._run()))]], timeout
+        )
+
+
+class Query:
+    """Immutable query over one collection"""
+
+    def __init__(self, client, collection_name, filters=(), orders=(), projection=None,
+                 cursor=None, limit=None, offset=0):
+        self._client = client
+        self._collection_name = collection_name
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._projection = projection
+        self._cursor = cursor
+        self._limit = limit
+        self._offset = offset
+
+    def _copy(self, **changes):
+        state = {
+            'filters': self._filters, 'orders': self._orders, 'projection': self._projection,
+            'cursor': self._cursor, 'limit': self._limit, 'offset': self._offset,
+        }
+        state.update(changes)
+        return Query(self._client, self._collection_name, **state)
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self._filters + ((field_path, op_string, _normalize(value)),))
+
+    def order_by(self, field_path, direction='ASCENDING'):
+        return self._copy(orders=self._orders + ((field_path, str(direction).upper()),))
+
+    def select(self, field_paths):
+        return self._copy(projection=tuple(field_paths))
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def offset(self, num_to_skip):
+        return self._copy(offset=num_to_skip)
+
+    def start_after(self, document_fields_or_snapshot):
+        return self._copy(cursor=(document_fields_or_snapshot, False))
+
+    def start_at(self, document_fields_or_snapshot):
+        return self._copy(cursor=(document_fields_or_snapshot, True))
+
+    def count(self, alias=None):
+        return AggregationQuery(self, alias or 'count')
+
+    def shape(self):
+        """
+        Describe what an index must cover for this query
+
+        Returns:
+            tuple: (collection name, ((field, operator), ...), ((field, direction), ...))
+        """
+        filters = tuple((field_path, op_string) for field_path, op_string, _ in self._filters)
+        return self._collection_name, filters, self._orders
+
+    def get(self, transaction=None, retry=None, timeout=None):
+        return self._client._rpc(self._snapshots, timeout)
+
+    def stream(self, transaction=None, retry=None, timeout=None):
+        if self._client.is_async:
+            return self._astream(timeout)
+        return iter(self.get(timeout=timeout))
+
+    async def _astream(self, timeout):
+        for snapshot in await self.get(timeout=timeout):
+            yield snapshot
+
+    def on_snapshot(self, callback):
+        return self._client._store.watch(self._collection_name, callback, self)
+
+    def _sort_key(self, doc_id, document):
+        key = []
+        for field_path, direction in self._orders:
+            value = doc_id if field_path == '__name__' else _get_field(document.data, field_path)
+            key.append((_sort_value(value), direction))
+        return key
+
+    def _compare_to_cursor(self, doc_id, document, cursor_values):
+        for (field_path, direction), cursor_value in zip(self._orders, cursor_values):
+            value = doc_id if field_path == '__name__' else _get_field(document.data, field_path)
+            left, right = _sort_value(value), _sort_value(cursor_value)
+            if left != right:
+                result = -1 if left < right else 1
+                return -result if direction == 'DESCENDING' else result
+        return 0
+
+    def _run(self):
+        """Matching (id, document) pairs in query order, without latency"""
+        if self._client.queries is not None:
+            self._client.queries.append(self)
+        documents = self._client._store.documents(self._collection_name)
+        results = [
+            (doc_id, document) for doc_id, document in documents
+            if all(_matches(_get_field(document.data, f), op, v) for f, op, v in self._filters)
+            and all(f == '__name__' or _get_field(document.data, f) is not _MISSING for f, _ in self._orders)
+        ]
+
+        # Stable sorts from the last order key to the first
+        results.sort(key=lambda item: item[0])
+        for index in reversed(range(len(self._orders))):
+            field_path, direction = self._orders[index]
+            results.sort(
+                key=lambda item: self._sort_key(*item)[index][0],
+                reverse=direction == 'DESCENDING',
+            )
+
+        if self._cursor is not None:
+            position, inclusive = self._cursor
+            if isinstance(position, DocumentSnapshot):
+                position = dict(position.to_dict() or {}, __name__=position.id)
+            values = [position.get(field_path) for field_path, _ in self._orders]
+            values = [_normalize(value) for value in values]
+            results = [
+                item for item in results
+                if self._compare_to_cursor(*item, values) > (-1 if inclusive else 0)
+            ]
+
+        results = results[self._offset:]
+        if self._limit is not None:
+            results = results[:self._limit]
+        return results
+
+    def _snapshots(self):
+        collection = self._client.collection(self._collection_name)
+        return [
+            DocumentSnapshot(collection.document(doc_id), document, self._projection)
+            for doc_id, document in self._run()
+        ]
+
+
+class CollectionReference(Query):
+    """A collection; also the base query over all its documents"""
+
+    def __init__(self, client, name):
+        super().__init__(client, name)
+        self.id = name
+
+    def document(self, document_id=None):
+        return DocumentReference(self._client, self._collection_name, document_id or _new_id())
+
+    def add(self, document_data, document_id=None, retry=None, timeout=None):
+        reference = self.document(document_id)
+
+        def write():
+            update_time = self._client._store.write(self._collection_name, reference.id, document_data)
+            return update_time, reference
+
+        return self._client._rpc(write, timeout)
+
+
+class DocumentReference:
+    """A single document"""
+
+    def __init__(self, client, collection_name, document_id):
+        self._client = client
+        self._collection_name = collection_name
+        self.id = document_id
+        self.path = f"{collection_name}/{document_id}"
+
+    def get(self, field_paths=None, transaction=None, retry=None, timeout=None):
+        return self._client._rpc(
+            lambda: DocumentSnapshot(self, self._client._store.read(self._collection_name, self.id), field_paths),
+            timeout,
+        )
+
+    def set(self, document_data, merge=False, retry=None, timeout=None):
+        return self._client._rpc(
+            lambda: self._client._store.write(self._collection_name, self.id, document_data, merge), timeout
+        )
+
+    def update(self, field_updates, retry=None, timeout=None):
+        return self._client._rpc(
+            lambda: self._client._store.write(self._collection_name, self.id, field_updates, True, must_exist=True),
+            timeout,
+        )
+
+    def delete(self, retry=None, timeout=None):
+        return self._client._rpc(lambda: self._client._store.delete(self._collection_name, self.id), timeout)
+
+
+class WriteBatch:
+    """Writes applied together on ``commit``"""
+
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def set(self, reference, document_data, merge=False):
+        self._writes.append(('set', reference, document_data, merge))
+
+    def update(self, reference, field_updates):
+        self._writes.append(('update', reference, field_updates, True))
+
+    def delete(self, reference):
+        self._writes.append(('delete', reference, None, False))
+
+    def commit(self, retry=None, timeout=None):
+        return self._client._rpc(lambda: self._client._store.apply(self._writes), timeout)
+
+
+class _Watch:
+    def __init__(self, store, collection_name, callback):
+        self._store = store
+        self._collection_name = collection_name
+        self._callback = callback
+
+    def unsubscribe(self):
+        self._store.unwatch(self._collection_name, self)
+
+
+class MemoryStore:
+    """Collections of documents shared by the sync and async clients"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._collections = {}
+        self._watches = {}
+
+    def documents(self, collection_name):
+        with self._lock:
+            return list(self._collections.get(collection_name, {}).items())
+
+    def read(self, collection_name, document_id):
+        with self._lock:
+            return self._collections.get(collection_name, {}).get(document_id)
+
+    def write(self, collection_name, document_id, data, merge=False, must_exist=False):
+        return self.apply([('update' if must_exist else 'set', _Ref(collection_name, document_id), data, merge)])
+
+    def delete(self, collection_name, document_id):
+        return self.apply([('delete', _Ref(collection_name, document_id), None, False)])
+
+    def apply(self, writes):
+        """Apply writes atomically and notify listeners of changed collections"""
+        now = datetime.now(timezone.utc)
+        changed = set()
+        with self._lock:
+            for kind, reference, data, merge in writes:
+                if kind == 'update' and self.read(reference._collection_name, reference.id) is None:
+                    raise KeyError(f"No document to update: {reference._collection_name}/{reference.id}")
+
+            for kind, reference, data, merge in writes:
+                documents = self._collections.setdefault(reference._collection_name, {})
+                existing = documents.get(reference.id)
+                if kind == 'delete':
+                    documents.pop(reference.id, None)
+                else:
+                    data = _normalize(dict(data))
+                    if merge and existing is not None:
+                        data = dict(existing.data, **data)
+                    create_time = existing.create_time if existing else now
+                    documents[reference.id] = _Document(data, create_time, now)
+                changed.add(reference._collection_name)
+            watches = [(name, list(self._watches.get(name, []))) for name in changed]
+
+        for name, collection_watches in watches:
+            for watch in collection_watches:
+                self._notify(watch, changes=True)
+        return now
+
+    def load(self, data):
+        """
+        Load fixture data
+
+        Args:
+            data (dict): Collection name -> list of documents with an 'id' key
+        """
+        writes = []
+        for collection_name, documents in data.items():
+            for document in documents:
+                document = dict(document)
+                document_id = str(document.pop('id', None) or _new_id())
+                for field in TIMESTAMP_FIELDS:
+                    if isinstance(document.get(field), str):
+                        document[field] = datetime.fromisoformat(document[field])
+                writes.append(('set', _Ref(collection_name, document_id), document, False))
+        if writes:
+            self.apply(writes)
+
+    def watch(self, collection_name, callback, query):
+        watch = _Watch(self, collection_name, callback)
+        watch.query = query
+        with self._lock:
+            self._watches.setdefault(collection_name, []).append(watch)
+        self._notify(watch, changes=False)
+        return watch
+
+    def unwatch(self, collection_name, watch):
+        with self._lock:
+            if watch in self._watches.get(collection_name, []):
+                self._watches[collection_name].remove(watch)
+
+    @staticmethod
+    def _notify(watch, changes):
+        try:
+            snapshots = watch.query._snapshots()
+            watch._callback(snapshots, [True] if changes else [], datetime.now(timezone.utc))
+        except Exception as e:
+            logger.warning(f"In-memory snapshot listener failed: {str(e)}")
+
+
+class _Ref:
+    __slots__ = ('_collection_name', 'id')
+
+    def __init__(self, collection_name, document_id):
+        self._collection_name = collection_name
+        self.id = document_id
+
+
+class MemoryClient:
+    """
+    Firestore client backed by a MemoryStore
+
+    Each round trip waits ``latency`` plus up to ``jitter`` seconds and fails
+    with ServiceUnavailable at ``failure_rate``. When the wait exceeds the
+    call's ``timeout`` it raises DeadlineExceeded after ``timeout`` seconds.
+
+    With ``record_queries`` every executed query is appended to ``queries``,
+    which is how the Firestore index generator learns what the services ask.
+    """
+
+    is_async = False
+
+    def __init__(self, store=None, latency=0.0, jitter=0.0, failure_rate=0.0, seed=None,
+                 record_queries=False):
+        self._store = store if store is not None else MemoryStore()
+        self.queries = [] if record_queries else None
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+
+    def collection(self, collection_path):
+        return CollectionReference(self, collection_path)
+
+    def document(self, document_path):
+        collection_name, document_id = document_path.split('/', 1)
+        return self.collection(collection_name).document(document_id)
+
+    def batch(self):
+        return WriteBatch(self)
+
+    def collections(self):
+        with self._store._lock:
+            return [self.collection(name) for name in self._store._collections]
+
+    def _plan(self, timeout):
+        """Decide how long this RPC takes and whether it fails"""
+        with self._random_lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            fails = self.failure_rate and self._random.random() < self.failure_rate
+        if timeout is not None and delay > timeout:
+            return timeout, DeadlineExceeded(f"In-memory Firestore call exceeded {timeout}s deadline")
+        if fails:
+            return delay, ServiceUnavailable("Injected in-memory Firestore failure")
+        return delay, None
+
+    def _rpc(self, operation, timeout=None):
+        delay, error = self._plan(timeout)
+        if delay:
+            time.sleep(delay)
+        if error is not None:
+            raise error
+        return operation()
+
+
+class AsyncMemoryClient(MemoryClient):
+    """Async flavour of MemoryClient; round trips return coroutines"""
+
+    is_async = True
+
+    async def _rpc(self, operation, timeout=None):
+        delay, error = self._plan(timeout)
+        if delay:
+            await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return operation()
+
+
+_store = None
+_clients = {}
+_init_lock = threading.Lock()
+
+
+def get_memory_client(asynchronous=False):
+    """
+    Get the process-wide in-memory client, loading FIREBASE_MEMORY['FIXTURE']
+
+    Args:
+        asynchronous (bool): Return the async flavour
+
+    Returns:
+        MemoryClient or AsyncMemoryClient: Client over the shared store
+    """
+    global _store
+    if asynchronous not in _clients:
+        with _init_lock:
+            if asynchronous not in _clients:
+                options = get_memory_settings()
+                if _store is None:
+                    _store = MemoryStore()
+                    if options['FIXTURE']:
+                        with open(options['FIXTURE']) as f:
+                            _store.load(json.load(f))
+                        logger.info(f"Loaded in-memory Firestore fixture {options['FIXTURE']}")
+                client_class = AsyncMemoryClient if asynchronous else MemoryClient
+                _clients[asynchronous] = client_class(
+                    _store,
+                    latency=options['LATENCY'],
+                    jitter=options['JITTER'],
+                    failure_rate=options['FAILURE_RATE'],
+                    seed=options['SEED'],
+                )
+    return _clients[asynchronous]
@@ -0,0 +1,444 @@
+"""
+Write-behind spool for Srihari Developers form submissions
+
+Contact, service inquiry and newsletter submissions are appended to a local
+SQLite spool and acknowledged immediately. A background flusher claims
+pending entries, writes them to Firestore in WriteBatch groups and retries
+failed groups with exponential backoff, so form POST latency no longer
+depends on the Firestore round trip.
+
+Every entry gets its Firestore document ID when it is appended, so a retry
+after a commit that timed out but succeeded rewrites the same document
+instead of adding a duplicate. Entries that failed before are retried one
+per batch, so a document Firestore rejects cannot hold back the others.
+Outages, timeouts and an open circuit are retried for as long as they
+last; an entry that still fails on its own after ``MAX_ATTEMPTS`` attempts
+is moved to the ``spool_dead`` table for inspection instead of being retried
+forever.
+
+The spool is safe to share between gunicorn workers: entries are claimed
+with a short lease inside an IMMEDIATE transaction. It needs a writable
+``PATH`` (the system temp directory by default) and a process that outlives
+the request, either the in-process flusher or ``flush_submissions --daemon``.
+Where neither holds, as on Vercel, set ``ENABLED`` to False and submissions
+are written to Firestore synchronously instead.
+"""
+
+from datetime import datetime
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+import threading
+import tempfile
+import sqlite3
+import logging
+import random
+import string
+import json
+import time
+import os
+
+from .firebase_admin_setup import get_firestore_client
+from .cache import get_query_cache
+from .circuit import CircuitOpenError, get_circuit_breaker, get_call_timeout
+from .tracking import timed_rpc
+
+# Failures that say nothing about the entries being written
+try:
+    from google.api_core.exceptions import Aborted, ServerError, TooManyRequests
+    TRANSIENT_ERRORS = (CircuitOpenError, TimeoutError, ConnectionError, Aborted, ServerError, TooManyRequests)
+except ImportError:
+    from .memory import DeadlineExceeded, ServiceUnavailable
+    TRANSIENT_ERRORS = (CircuitOpenError, TimeoutError, ConnectionError, DeadlineExceeded, ServiceUnavailable)
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_SPOOL_SETTINGS = {
+    'ENABLED': True,
+    'PATH': None,
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 2,
+    'LEASE_SECONDS': 60,
+    'BASE_BACKOFF': 2,
+    'MAX_BACKOFF': 300,
+    'MAX_ATTEMPTS': 8,  # Before an entry failing on its own is dead-lettered
+    'AUTOSTART': True,
+}
+
+# Firestore rejects WriteBatches with more than 500 operations
+MAX_BATCH_SIZE = 500
+
+# Payload key carrying a preassigned document ID; Firestore reserves __*__ field names
+DOCUMENT_ID_KEY = '__name__'
+
+_id_random = random.SystemRandom()
+
+
+def new_document_id():
+    """
+    Generate a Firestore-style document ID without a round trip
+
+    Returns:
+        str: 20 random letters and digits, like Firestore's auto IDs
+    """
+    return ''.join(_id_random.choices(string.ascii_letters + string.digits, k=20))
+
+
+def get_spool_settings():
+    """
+    Merge the project's FIREBASE_SPOOL setting over the defaults
+
+    Returns:
+        dict: Effective spool settings
+    """
+    options = dict(DEFAULT_SPOOL_SETTINGS)
+    options.update(getattr(settings, 'FIREBASE_SPOOL', {}))
+    if not options['PATH']:
+        options['PATH'] = os.path.join(tempfile.gettempdir(), 'sriharidevelopers-firebase-spool.sqlite3')
+    options['BATCH_SIZE'] = min(options['BATCH_SIZE'], MAX_BATCH_SIZE)
+    return options
+
+
+class SubmissionSpool:
+    """Durable SQLite queue of documents waiting to be written to Firestore"""
+
+    def __init__(self, path, lease_seconds=60, base_backoff=2, max_backoff=300, max_attempts=8):
+        self.path = str(path)
+        self.lease_seconds = lease_seconds
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        self._create_table()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def _create_table(self):
+        self._connection().execute(
+            'CREATE TABLE IF NOT EXISTS spool ('
+            ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' collection TEXT NOT NULL,'
+            ' payload TEXT NOT NULL,'
+            ' submitted_at REAL NOT NULL,'
+            ' attempts INTEGER NOT NULL DEFAULT 0,'
+            ' next_attempt_at REAL NOT NULL,'
+            ' claimed_until REAL NOT NULL DEFAULT 0,'
+            ' last_error TEXT NOT NULL DEFAULT \'\''
+            ')'
+        )
+        self._connection().execute(
+            'CREATE INDEX IF NOT EXISTS spool_due ON spool (next_attempt_at, claimed_until)'
+        )
+        self._connection().execute(
+            'CREATE TABLE IF NOT EXISTS spool_dead ('
+            ' id INTEGER PRIMARY KEY,'
+            ' collection TEXT NOT NULL,'
+            ' payload TEXT NOT NULL,'
+            ' submitted_at REAL NOT NULL,'
+            ' attempts INTEGER NOT NULL,'
+            ' failed_at REAL NOT NULL,'
+            ' last_error TEXT NOT NULL'
+            ')'
+        )
+
+    def append(self, collection, data, document_id=None):
+        """
+        Append a document to the spool
+
+        Args:
+            collection (str): Target Firestore collection
+            data (dict): Document fields
+            document_id (str): ID to write the document under, or None to
+                assign one now so every retry writes the same document
+
+        Returns:
+            int: Spool entry ID
+        """
+        data = dict(data, **{DOCUMENT_ID_KEY: document_id or new_document_id()})
+        now = time.time()
+        cursor = self._connection().execute(
+            'INSERT INTO spool (collection, payload, submitted_at, next_attempt_at) VALUES (?, ?, ?, ?)',
+            (collection, json.dumps(data, cls=DjangoJSONEncoder), now, now),
+        )
+        return cursor.lastrowid
+
+    def claim(self, limit):
+        """
+        Lease up to ``limit`` due entries to this process
+
+        Returns:
+            list: (id, collection, data, submitted_at, attempts) tuples
+        """
+        now = time.time()
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            rows = connection.execute(
+                'SELECT id, collection, payload, submitted_at, attempts FROM spool'
+                ' WHERE next_attempt_at <= ? AND claimed_until <= ?'
+                ' ORDER BY id LIMIT ?',
+                (now, now, limit),
+            ).fetchall()
+            if rows:
+                connection.executemany(
+                    'UPDATE spool SET claimed_until = ? WHERE id = ?',
+                    [(now + self.lease_seconds, row[0]) for row in rows],
+                )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return [(row[0], row[1], json.loads(row[2]), row[3], row[4]) for row in rows]
+
+    def complete(self, entry_ids):
+        """Remove entries that were written to Firestore"""
+        self._connection().executemany('DELETE FROM spool WHERE id = ?', [(entry_id,) for entry_id in entry_ids])
+
+    def retry(self, entries, error):
+        """
+        Release entries for another attempt after an exponential backoff
+
+        Entries that have used up ``max_attempts`` are dead-lettered instead,
+        unless ``error`` is transient.
+
+        Args:
+            entries (list): (entry ID, attempts so far) tuples
+            error (Exception): Why the write failed
+
+        Returns:
+            int: Number of entries dead-lettered
+        """
+        now = time.time()
+        message = str(error)[:500]
+        transient = isinstance(error, TRANSIENT_ERRORS)
+        updates = []
+        dead = []
+        for entry_id, attempts in entries:
+            if not transient and attempts + 1 >= self.max_attempts:
+                dead.append(entry_id)
+                continue
+            delay = min(self.base_backoff * (2 ** attempts), self.max_backoff)
+            delay *= random.uniform(0.8, 1.2)
+            updates.append((now + delay, message, entry_id))
+        connection = self._connection()
+        connection.executemany(
+            'UPDATE spool SET attempts = attempts + 1, next_attempt_at = ?, claimed_until = 0, last_error = ?'
+            ' WHERE id = ?',
+            updates,
+        )
+        if dead:
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                connection.executemany(
+                    'INSERT OR REPLACE INTO spool_dead (id, collection, payload, submitted_at, attempts, failed_at, last_error)'
+                    ' SELECT id, collection, payload, submitted_at, attempts + 1, ?, ? FROM spool WHERE id = ?',
+                    [(now, message, entry_id) for entry_id in dead],
+                )
+                connection.executemany('DELETE FROM spool WHERE id = ?', [(entry_id,) for entry_id in dead])
+                connection.execute('COMMIT')
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+            logger.error(f"Moved {len(dead)} spooled submissions to spool_dead after {self.max_attempts} attempts: {message}")
+        return len(dead)
+
+    def requeue_dead(self):
+        """
+        Move every dead-lettered entry back into the spool with a fresh attempt count
+
+        Returns:
+            int: Number of entries requeued
+        """
+        now = time.time()
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            count = connection.execute(
+                'INSERT INTO spool (id, collection, payload, submitted_at, next_attempt_at, last_error)'
+                ' SELECT id, collection, payload, submitted_at, ?, last_error FROM spool_dead',
+                (now,),
+            ).rowcount
+            connection.execute('DELETE FROM spool_dead')
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return count
+
+    def document_ids(self, collection):
+        """
+        Firestore document IDs of the entries not written yet, dead-lettered included
+
+        Args:
+            collection (str): Target Firestore collection
+
+        Returns:
+            set: Document IDs
+        """
+        rows = self._connection().execute(
+            "SELECT json_extract(payload, '$.__name__') FROM spool WHERE collection = ?"
+            " UNION SELECT json_extract(payload, '$.__name__') FROM spool_dead WHERE collection = ?",
+            (collection, collection),
+        ).fetchall()
+        return {row[0] for row in rows if row[0]}
+
+    def pending_count(self):
+        """Return the number of entries still waiting to be written"""
+        return self._connection().execute('SELECT COUNT(*) FROM spool').fetchone()[0]
+
+    def dead_count(self):
+        """Return the number of dead-lettered entries"""
+        return self._connection().execute('SELECT COUNT(*) FROM spool_dead').fetchone()[0]
+
+
+def _write_batch(spool, db, entries):
+    """Commit ``entries`` in one WriteBatch; returns True on success"""
+    try:
+        batch = db.batch()
+        written_at = datetime.now()
+        for entry_id, collection, data, submitted_at, attempts in entries:
+            data['created_at'] = datetime.fromtimestamp(submitted_at)
+            # The write time, not the submission time: the mirror's watermark must not skip late writes
+            data['updated_at'] = written_at
+            # Entries spooled before IDs were assigned on append still get a new one here
+            document_id = data.pop(DOCUMENT_ID_KEY, None)
+            batch.set(db.collection(collection).document(document_id), data)
+        with timed_rpc('spool.commit'):
+            get_circuit_breaker().call(batch.commit, timeout=get_call_timeout())
+    except Exception as e:
+        logger.warning(f"Firestore batch write of {len(entries)} spooled submissions failed: {str(e)}")
+        spool.retry([(entry[0], entry[4]) for entry in entries], e)
+        return False
+
+    spool.complete([entry[0] for entry in entries])
+    return True
+
+
+def flush_spool(spool, db=None, batch_size=100):
+    """
+    Write one claimed group of spooled entries to Firestore
+
+    New entries share a WriteBatch; entries that failed before are written
+    one per batch, so a document Firestore rejects only fails itself.
+
+    Args:
+        spool (SubmissionSpool): Spool to drain
+        db: Firestore client, defaults to the shared client
+        batch_size (int): Maximum entries per WriteBatch
+
+    Returns:
+        int: Number of entries written
+    """
+    db = db if db is not None else get_firestore_client()
+    if db is None or get_circuit_breaker().is_open():
+        return 0
+
+    entries = spool.claim(batch_size)
+    if not entries:
+        return 0
+
+    fresh = [entry for entry in entries if entry[4] == 0]
+    groups = ([fresh] if fresh else []) + [[entry] for entry in entries if entry[4] > 0]
+    written = []
+    for group in groups:
+        if _write_batch(spool, db, group):
+            written.extend(group)
+
+    for collection in {entry[1] for entry in written}:
+        get_query_cache().invalidate_collection(collection)
+    if written:
+        logger.info(f"Wrote {len(written)} spooled submissions to Firestore")
+    return len(written)
+
+
+class SpoolFlusher:
+    """Background thread that drains the spool into Firestore"""
+
+    def __init__(self, spool, batch_size=100, interval=2):
+        self.spool = spool
+        self.batch_size = batch_size
+        self.interval = interval
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the flusher thread once per process"""
+        with self._lock:
+            # Threads do not survive a fork, so restart in each worker
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='firestore-spool-flusher', daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        """Ask the flusher to run now instead of at the next interval"""
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                while flush_spool(self.spool, batch_size=self.batch_size) == self.batch_size:
+                    pass
+            except Exception as e:
+                logger.error(f"Spool flusher error: {str(e)}")
+
+
+_spool = None
+_flusher = None
+_init_lock = threading.RLock()
+
+
+def get_spool():
+    """
+    Get the process-wide submission spool, creating it on first use
+
+    Returns:
+        SubmissionSpool: Shared spool instance
+    """
+    global _spool
+    if _spool is None:
+        with _init_lock:
+            if _spool is None:
+                options = get_spool_settings()
+                _spool = SubmissionSpool(
+                    options['PATH'],
+                    lease_seconds=options['LEASE_SECONDS'],
+                    base_backoff=options['BASE_BACKOFF'],
+                    max_backoff=options['MAX_BACKOFF'],
+                    max_attempts=options['MAX_ATTEMPTS'],
+                )
+    return _spool
+
+
+def get_flusher():
+    """
+    Get the process-wide spool flusher, starting it if AUTOSTART is enabled
+
+    Returns:
+        SpoolFlusher: Shared flusher instance
+    """
+    global _flusher
+    if _flusher is None:
+        with _init_lock:
+            if _flusher is None:
+                options = get_spool_settings()
+                _flusher = SpoolFlusher(
+                    get_spool(),
+                    batch_size=options['BATCH_SIZE'],
+                    interval=options['FLUSH_INTERVAL'],
+                )
+    if get_spool_settings()['AUTOSTART']:
+        _flusher.start()
+    return _flusher
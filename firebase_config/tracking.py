@@ -0,0 +1,74 @@
+"""
+Firestore RPC tracking for Srihari Developers website
+
+Services wrap each Firestore round trip in ``timed_rpc``. Its duration and
+outcome go to the recorder of the current context, if a caller opened one
+with ``track_rpcs`` (e.g. the query budget middleware), and to every
+process-wide listener registered with ``add_rpc_listener`` (e.g. metrics).
+"""
+
+from contextlib import contextmanager
+import contextvars
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+_recorder = contextvars.ContextVar('firestore_rpc_recorder', default=None)
+_listeners = []
+
+
+def add_rpc_listener(callback):
+    """
+    Register a callback for every Firestore RPC made in this process
+
+    Args:
+        callback (callable): Called with (label, seconds, error or None)
+    """
+    if callback not in _listeners:
+        _listeners.append(callback)
+
+
+@contextmanager
+def timed_rpc(label):
+    """
+    Time one Firestore RPC and report it
+
+    Args:
+        label (str): What the RPC does, e.g. 'projects.page'
+    """
+    error = None
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        recorder = _recorder.get()
+        if recorder is not None:
+            recorder(label, seconds, error)
+        for callback in _listeners:
+            try:
+                callback(label, seconds, error)
+            except Exception as e:
+                logger.warning(f"Firestore RPC listener failed: {str(e)}")
+
+
+@contextmanager
+def track_rpcs(recorder):
+    """
+    Report Firestore RPCs made in this context to ``recorder``
+
+    The context is copied into ``sync_to_async`` threads and asyncio tasks,
+    so RPCs from those are reported too.
+
+    Args:
+        recorder (callable): Called with (label, seconds, error or None)
+    """
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
@@ -6,21 +6,168 @@ like CRUD operations for projects, contacts, and testimonials.
 """
 
 from .firebase_admin_setup import get_firestore_client, is_firebase_available
+from .cache import get_query_cache, get_collection_watcher, get_cache_settings
+from .spool import get_spool, get_flusher, get_spool_settings, new_document_id
+from .circuit import get_circuit_breaker, get_call_timeout
+from .tracking import timed_rpc
 from datetime import datetime
+from django.utils.functional import SimpleLazyObject
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+class FirestoreReadError(Exception):
+    """A Firestore read failed, so its result is unknown rather than empty"""
+
+
 class FirebaseService:
     """Service class for Firebase operations"""
     
+    COLLECTION_NAME = None
+    
     def __init__(self):
-        self.db = get_firestore_client()
+        self.cache = get_query_cache()
+        
+    @property
+    def db(self):
+        """Firestore client, or None until Firebase initializes"""
+        return get_firestore_client()
+    
+    @property
+    def call_timeout(self):
+        """Deadline in seconds for each Firestore call"""
+        return get_call_timeout()
         
     def is_available(self):
         """Check if Firebase is available"""
         return is_firebase_available() and self.db is not None
+    
+    def cached_query(self, query_name, params, loader):
+        """
+        Run a read through the shared query cache
+        
+        The loader runs through the Firebase circuit breaker, so repeated
+        failures open the circuit and later misses fail fast while cached
+        results keep being served.
+        
+        Args:
+            query_name (str): Name of the query within this collection
+            params (tuple): Hashable query parameters
+            loader (callable): Performs the Firestore read on a cache miss
+            
+        Returns:
+            Copy of the cached result
+        """
+        breaker = get_circuit_breaker()
+        
+        def tracked_loader():
+            with timed_rpc(f"{self.COLLECTION_NAME}.{query_name}"):
+                return loader()
+        
+        def load():
+            return breaker.call(tracked_loader)
+        
+        if not get_cache_settings()['ENABLED']:
+            return load()
+        
+        get_collection_watcher().watch(self.db, self.COLLECTION_NAME)
+        result = self.cache.get_or_load(
+            self.COLLECTION_NAME,
+            (query_name,) + tuple(params),
+            load,
+            ttl=self.cache.ttl_for(f"{self.COLLECTION_NAME}.{query_name}"),
+        )
+        # Callers may annotate the dicts they get back
+        if isinstance(result, list):
+            return [dict(item) for item in result]
+        if isinstance(result, dict):
+            return dict(result)
+        return result
+    
+    def invalidate_cache(self):
+        """Drop cached reads for this service's collection"""
+        self.cache.invalidate_collection(self.COLLECTION_NAME)
+    
+    def has_documents(self):
+        """
+        Check whether the collection holds any document
+        
+        Reads a single document name, so the answer costs one small RPC
+        and is cached like any other query.
+        
+        Returns:
+            bool or None: None if Firebase is unavailable or the read failed
+        """
+        if not self.is_available():
+            return None
+        
+        def load():
+            docs = (self.db.collection(self.COLLECTION_NAME)
+                   .select([])
+                   .limit(1)
+                   .get(timeout=self.call_timeout))
+            return len(docs) > 0
+        
+        try:
+            return self.cached_query('exists', (), load)
+        except Exception as e:
+            logger.error(f"Error checking {self.COLLECTION_NAME} for documents: {str(e)}")
+            return None
+    
+    def get_changed_documents(self, since=None, after=None, limit=500):
+        """
+        Get one batch of documents for the database mirror (see core/mirror.py)
+        
+        Without ``since``, pages through the whole collection in document
+        ID order. With it, returns documents whose ``updated_at`` is later,
+        oldest change first. Reads bypass the query cache, and errors are
+        raised rather than answered with an empty batch, which the mirror
+        would take for "nothing changed" or "everything deleted".
+        
+        Args:
+            since (datetime): Only documents updated after this, or None for all
+            after: Last document of the previous batch: its ID without
+                ``since``, else its (updated_at, ID)
+            limit (int): Maximum number of documents
+            
+        Returns:
+            list: Documents carrying their ID
+            
+        Raises:
+            Exception: If Firebase is unavailable or the read fails
+        """
+        if not self.is_available():
+            raise RuntimeError('Firebase is not available')
+        
+        query = self.db.collection(self.COLLECTION_NAME)
+        if since is None:
+            query = query.order_by('__name__')
+            if after is not None:
+                query = query.start_after({'__name__': after})
+        else:
+            query = (query.where('updated_at', '>', since)
+                    .order_by('updated_at')
+                    .order_by('__name__'))
+            if after is not None:
+                updated_at, document_id = after
+                query = query.start_after({'updated_at': updated_at, '__name__': document_id})
+        
+        def load():
+            with timed_rpc(f"{self.COLLECTION_NAME}.changes"):
+                return query.limit(limit).get(timeout=self.call_timeout)
+        
+        return self._documents_to_list(get_circuit_breaker().call(load))
+    
+    @staticmethod
+    def _documents_to_list(docs):
+        """Convert query snapshots to dicts carrying their document ID"""
+        results = []
+        for doc in docs:
+            data = doc.to_dict()
+            data['id'] = doc.id
+            results.append(data)
+        return results
 
 
 class ProjectService(FirebaseService):
@@ -28,29 +175,96 @@ class ProjectService(FirebaseService):
     
     COLLECTION_NAME = 'projects'
     
-    def get_all_projects(self):
+    def get_all_projects(self, fields=None):
         """
         Get all projects from Firestore
         
+        Args:
+            fields (tuple): Only read these document fields, or None for all
+            
         Returns:
             list: List of project documents
+            
+        Raises:
+            FirestoreReadError: If Firebase is unavailable or the read fails
         """
         if not self.is_available():
-            return []
+            raise FirestoreReadError('Firebase is not available')
             
-        try:
-            projects = []
-            docs = self.db.collection(self.COLLECTION_NAME).order_by('created_at', direction='DESCENDING').get()
+        def load():
+            query = self._project_query(fields).order_by('created_at', direction='DESCENDING')
+            return self._documents_to_list(query.get(timeout=self.call_timeout))
             
-            for doc in docs:
-                project_data = doc.to_dict()
-                project_data['id'] = doc.id
-                projects.append(project_data)
-                
-            return projects
+        try:
+            return self.cached_query('all', (fields,), load)
         except Exception as e:
             logger.error(f"Error fetching projects: {str(e)}")
-            return []
+            raise FirestoreReadError(str(e)) from e
+    
+    def get_projects_page(self, limit=12, after=None, fields=None):
+        """
+        Get one page of projects, newest first, using keyset pagination
+        
+        Args:
+            limit (int): Maximum number of projects to return
+            after (tuple): (created_at, document ID) of the previous page's
+                last project, or None for the first page
+            fields (tuple): Only read these document fields, or None for all
+        
+        Returns:
+            list: Up to ``limit + 1`` project documents; the extra one
+            signals that another page exists
+            
+        Raises:
+            FirestoreReadError: If Firebase is unavailable or the read fails
+        """
+        if not self.is_available():
+            raise FirestoreReadError('Firebase is not available')
+        
+        def load():
+            query = (self._project_query(fields)
+                    .order_by('created_at', direction='DESCENDING')
+                    .order_by('__name__', direction='DESCENDING'))
+            if after is not None:
+                created_at, document_id = after
+                query = query.start_after({'created_at': created_at, '__name__': str(document_id)})
+            return self._documents_to_list(query.limit(limit + 1).get(timeout=self.call_timeout))
+        
+        try:
+            return self.cached_query('page', (limit, after, fields), load)
+        except Exception as e:
+            logger.error(f"Error fetching projects page: {str(e)}")
+            raise FirestoreReadError(str(e)) from e
+    
+    def count_projects(self):
+        """
+        Count project documents with a server-side aggregation
+        
+        Returns:
+            int: Number of projects
+            
+        Raises:
+            FirestoreReadError: If Firebase is unavailable or the read fails
+        """
+        if not self.is_available():
+            raise FirestoreReadError('Firebase is not available')
+        
+        def load():
+            result = self.db.collection(self.COLLECTION_NAME).count().get(timeout=self.call_timeout)
+            return int(result[0][0].value)
+        
+        try:
+            return self.cached_query('count', (), load)
+        except Exception as e:
+            logger.error(f"Error counting projects: {str(e)}")
+            raise FirestoreReadError(str(e)) from e
+    
+    def _project_query(self, fields):
+        """Base collection query, projected to ``fields`` when given"""
+        collection = self.db.collection(self.COLLECTION_NAME)
+        if fields:
+            return collection.select(list(fields))
+        return collection
     
     def get_featured_projects(self, limit=6):
         """
@@ -61,27 +275,26 @@ class ProjectService(FirebaseService):
             
         Returns:
             list: List of featured project documents
+            
+        Raises:
+            FirestoreReadError: If Firebase is unavailable or the read fails
         """
         if not self.is_available():
-            return []
+            raise FirestoreReadError('Firebase is not available')
             
-        try:
-            projects = []
+        def load():
             docs = (self.db.collection(self.COLLECTION_NAME)
                    .where('featured', '==', True)
                    .order_by('created_at', direction='DESCENDING')
                    .limit(limit)
-                   .get())
+                   .get(timeout=self.call_timeout))
+            return self._documents_to_list(docs)
             
-            for doc in docs:
-                project_data = doc.to_dict()
-                project_data['id'] = doc.id
-                projects.append(project_data)
-                
-            return projects
+        try:
+            return self.cached_query('featured', (limit,), load)
         except Exception as e:
             logger.error(f"Error fetching featured projects: {str(e)}")
-            return []
+            raise FirestoreReadError(str(e)) from e
     
     def get_project_by_id(self, project_id):
         """
@@ -92,20 +305,26 @@ class ProjectService(FirebaseService):
             
         Returns:
             dict or None: Project data if found
+            
+        Raises:
+            FirestoreReadError: If Firebase is unavailable or the read fails
         """
         if not self.is_available():
-            return None
+            raise FirestoreReadError('Firebase is not available')
             
-        try:
-            doc = self.db.collection(self.COLLECTION_NAME).document(project_id).get()
+        def load():
+            doc = self.db.collection(self.COLLECTION_NAME).document(project_id).get(timeout=self.call_timeout)
             if doc.exists:
                 project_data = doc.to_dict()
                 project_data['id'] = doc.id
                 return project_data
             return None
+            
+        try:
+            return self.cached_query('detail', (project_id,), load)
         except Exception as e:
             logger.error(f"Error fetching project {project_id}: {str(e)}")
-            return None
+            raise FirestoreReadError(str(e)) from e
     
     def create_project(self, project_data):
         """
@@ -124,7 +343,9 @@ class ProjectService(FirebaseService):
             project_data['created_at'] = datetime.now()
             project_data['updated_at'] = datetime.now()
             
-            doc_ref = self.db.collection(self.COLLECTION_NAME).add(project_data)
+            with timed_rpc('projects.create'):
+                doc_ref = self.db.collection(self.COLLECTION_NAME).add(project_data)
+            self.invalidate_cache()
             logger.info(f"Project created with ID: {doc_ref[1].id}")
             return doc_ref[1].id
         except Exception as e:
@@ -137,12 +358,14 @@ class ContactService(FirebaseService):
     
     COLLECTION_NAME = 'contacts'
     
-    def submit_contact(self, contact_data):
+    def submit_contact(self, contact_data, document_id=None):
         """
         Submit a contact inquiry
         
         Args:
             contact_data (dict): Contact form data
+            document_id (str): ID for the Firestore document; assigned by
+                Firestore if None
             
         Returns:
             str or None: Document ID if successful
@@ -152,38 +375,115 @@ class ContactService(FirebaseService):
             
         try:
             contact_data['created_at'] = datetime.now()
+            contact_data['updated_at'] = contact_data['created_at']
             contact_data['responded'] = False
             
-            doc_ref = self.db.collection(self.COLLECTION_NAME).add(contact_data)
-            logger.info(f"Contact inquiry submitted with ID: {doc_ref[1].id}")
-            return doc_ref[1].id
+            doc_ref = self.db.collection(self.COLLECTION_NAME).document(document_id)
+            with timed_rpc('contacts.create'):
+                doc_ref.set(contact_data)
+            logger.info(f"Contact inquiry submitted with ID: {doc_ref.id}")
+            return doc_ref.id
         except Exception as e:
             logger.error(f"Error submitting contact: {str(e)}")
             return None
     
+    def enqueue_contact(self, contact_data, document_id=None):
+        """
+        Queue a contact inquiry for a background write to Firestore
+        
+        The inquiry is appended to the local submission spool and written
+        in a batch by the spool flusher, so callers don't wait on Firestore.
+        With the spool disabled (FIREBASE_SPOOL['ENABLED'], off on Vercel,
+        where nothing runs after the response) it is written synchronously
+        with ``submit_contact()`` instead. Without a Firestore client nothing
+        is queued, since there would be nothing to flush it to.
+        
+        Args:
+            contact_data (dict): Contact form data
+            document_id (str): ID for the Firestore document, e.g. from
+                ``new_document_id()``; assigned when queued if None
+            
+        Returns:
+            str or None: ID of the Firestore document the inquiry is queued
+            for or written to, or None if it wasn't
+        """
+        if self.db is None:
+            return None
+        if not get_spool_settings()['ENABLED']:
+            return self.submit_contact(contact_data, document_id=document_id)
+        
+        try:
+            document_id = document_id or new_document_id()
+            contact_data['responded'] = False
+            get_spool().append(self.COLLECTION_NAME, contact_data, document_id=document_id)
+            get_flusher().wake()
+            return document_id
+        except Exception as e:
+            logger.error(f"Error queueing contact: {str(e)}")
+            return None
+    
     def get_all_contacts(self):
         """
         Get all contact inquiries (admin use)
         
+        Loads every document into memory; use ``stream_contacts()`` for
+        exports and other reads over the whole collection.
+        
         Returns:
             list: List of contact documents
         """
-        if not self.is_available():
-            return []
-            
         try:
-            contacts = []
-            docs = self.db.collection(self.COLLECTION_NAME).order_by('created_at', direction='DESCENDING').get()
-            
-            for doc in docs:
-                contact_data = doc.to_dict()
-                contact_data['id'] = doc.id
-                contacts.append(contact_data)
-                
-            return contacts
+            return list(self.stream_contacts())
         except Exception as e:
             logger.error(f"Error fetching contacts: {str(e)}")
             return []
+    
+    def stream_contacts(self, batch_size=500):
+        """
+        Iterate over all contact inquiries, newest first, at constant memory
+        
+        Documents are read with one ``stream()`` call per batch, each
+        resuming after the previous batch's last document, so at most
+        ``batch_size`` documents are held at once and no single call runs
+        past the Firestore deadline. Reads bypass the query cache.
+        
+        Args:
+            batch_size (int): Documents per Firestore call
+            
+        Yields:
+            dict: Contact document carrying its ID
+            
+        Raises:
+            Exception: If a batch fails; the iteration stops there
+        """
+        if not self.is_available():
+            return
+        
+        breaker = get_circuit_breaker()
+        query = (self.db.collection(self.COLLECTION_NAME)
+                .order_by('created_at', direction='DESCENDING')
+                .order_by('__name__', direction='DESCENDING'))
+        
+        def read_batch(batch_query):
+            with timed_rpc('contacts.stream'):
+                return list(batch_query.limit(batch_size).stream(timeout=self.call_timeout))
+        
+        after = None
+        while True:
+            batch_query = query if after is None else query.start_after(after)
+            try:
+                docs = breaker.call(lambda: read_batch(batch_query))
+            except Exception as e:
+                logger.error(f"Error streaming contacts: {str(e)}")
+                raise
+            
+            for contact in self._documents_to_list(docs):
+                yield contact
+            
+            if len(docs) < batch_size:
+                return
+            last = docs[-1]
+            after = {'created_at': last.get('created_at'), '__name__': last.id}
 
 
 class TestimonialService(FirebaseService):
@@ -191,36 +491,39 @@ class TestimonialService(FirebaseService):
     
     COLLECTION_NAME = 'testimonials'
     
-    def get_featured_testimonials(self, limit=6):
+    def get_featured_testimonials(self, limit=6, fields=None):
         """
         Get featured testimonials for display
         
         Args:
             limit (int): Maximum number of testimonials to return
+            fields (tuple): Only read these document fields, or None for all
             
         Returns:
             list: List of testimonial documents
+            
+        Raises:
+            FirestoreReadError: If Firebase is unavailable or the read fails
         """
         if not self.is_available():
-            return []
+            raise FirestoreReadError('Firebase is not available')
             
-        try:
-            testimonials = []
-            docs = (self.db.collection(self.COLLECTION_NAME)
+        def load():
+            query = self.db.collection(self.COLLECTION_NAME)
+            if fields:
+                query = query.select(list(fields))
+            docs = (query
                    .where('is_featured', '==', True)
                    .order_by('created_at', direction='DESCENDING')
                    .limit(limit)
-                   .get())
-            
-            for doc in docs:
-                testimonial_data = doc.to_dict()
-                testimonial_data['id'] = doc.id
-                testimonials.append(testimonial_data)
-                
-            return testimonials
+                   .get(timeout=self.call_timeout))
+            return self._documents_to_list(docs)
+            
+        try:
+            return self.cached_query('featured', (limit, fields), load)
         except Exception as e:
             logger.error(f"Error fetching testimonials: {str(e)}")
-            return []
+            raise FirestoreReadError(str(e)) from e
     
     def create_testimonial(self, testimonial_data):
         """
@@ -237,8 +540,11 @@ class TestimonialService(FirebaseService):
             
         try:
             testimonial_data['created_at'] = datetime.now()
+            testimonial_data['updated_at'] = testimonial_data['created_at']
             
-            doc_ref = self.db.collection(self.COLLECTION_NAME).add(testimonial_data)
+            with timed_rpc('testimonials.create'):
+                doc_ref = self.db.collection(self.COLLECTION_NAME).add(testimonial_data)
+            self.invalidate_cache()
             logger.info(f"Testimonial created with ID: {doc_ref[1].id}")
             return doc_ref[1].id
         except Exception as e:
@@ -246,7 +552,7 @@ class TestimonialService(FirebaseService):
             return None
 
 
-# Service instances
-project_service = ProjectService()
-contact_service = ContactService()
-testimonial_service = TestimonialService()
\ No newline at end of file
+# Service instances, constructed on first use
+project_service = SimpleLazyObject(ProjectService)
+contact_service = SimpleLazyObject(ContactService)
+testimonial_service = SimpleLazyObject(TestimonialService)
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sriharidevelopers.settings')
+# One event loop per worker, so async views can keep an AsyncClient on it
+os.environ.setdefault('FIREBASE_ASYNC_CLIENT', 'True')
 
 application = get_asgi_application()
\ No newline at end of file
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -38,12 +39,16 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.PageCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'sriharidevelopers.urls'
@@ -59,6 +64,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.company_info',
             ],
         },
     },
@@ -86,6 +92,96 @@ DATABASES = {
 #     except ImportError:
 #         pass
 
+# Cache
+# Use Redis when REDIS_URL is set so content version keys are shared by all
+# workers; otherwise fall back to a file cache shared by workers on this host
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR', '/tmp/sriharidevelopers-cache'),
+        }
+    }
+
+# Content version counters behind page cache keys and ETags (see core/caching.py)
+# Counters are only trusted for 304s when every host shares the default cache;
+# set CONTENT_VERSIONS_SHARED=true on a single host using the file cache
+CONTENT_VERSIONS = {
+    'TTL': 600,
+    'SHARED': {'true': True, 'false': False}.get(os.environ.get('CONTENT_VERSIONS_SHARED', '').lower()),
+}
+
+# Image source URLs registered by {% responsive_image %} (see core/images.py).
+# Shared by every worker like the default cache, but never culled: a lost
+# entry makes its image 404 until a page renders it again
+if os.environ.get('REDIS_URL'):
+    CACHES['images'] = CACHES['default']
+else:
+    CACHES['images'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_DIR', '/tmp/sriharidevelopers-cache') + '-images',
+        'OPTIONS': {'MAX_ENTRIES': sys.maxsize},
+    }
+
+# Rendered pages are kept in worker memory; keys carry the shared content versions
+CACHES['pages'] = {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'pages',
+    'OPTIONS': {'MAX_ENTRIES': 500},
+}
+
+# Project/testimonial card fragments (see core/cards.py), also per worker so a
+# deploy with changed card markup starts empty
+CACHES['template_fragments'] = {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'template_fragments',
+    'OPTIONS': {'MAX_ENTRIES': 2000},
+}
+
+# Full-page cache for anonymous GETs (see core/middleware.py)
+PAGE_CACHE = {
+    'ENABLED': os.environ.get('PAGE_CACHE_ENABLED', 'True').lower() == 'true',
+    'CACHE_ALIAS': 'pages',
+    'TIMEOUT': 600,
+    'VIEWS': ['core:home', 'core:about', 'core:services', 'core:projects', 'core:contact'],
+    'VERSION': os.environ.get('PAGE_CACHE_VERSION', ''),  # Change per deploy when templates change
+}
+
+# Brotli/gzip for pages and API responses, plus HTML minification (see core/compression.py)
+# `python -m benchmarks.compression` shows the CPU cost against the bytes saved
+COMPRESSION = {
+    'ENABLED': os.environ.get('COMPRESSION_ENABLED', 'True').lower() == 'true',
+    'MIN_SIZE': 1024,
+    'BROTLI_QUALITY': 5,
+    'MINIFY_HTML': os.environ.get('MINIFY_HTML', 'True').lower() == 'true',
+}
+
+# Per-request SQL/Firestore counting and N+1 detection (see core/querybudget.py)
+# Budgets are declared on views; `manage.py check_query_budgets` enforces them
+QUERY_BUDGET = {
+    'ENABLED': os.environ.get('QUERY_BUDGET_ENABLED', str(DEBUG)).lower() == 'true',
+    'RAISE': os.environ.get('QUERY_BUDGET_RAISE', 'False').lower() == 'true',
+    'HEADERS': True,  # X-Query-Count / X-Firestore-RPCs response headers
+    'DUPLICATE_THRESHOLD': 3,  # Same SQL this many times in one request is flagged
+}
+
+# Request/Firestore metrics served on /metrics (see core/metrics.py)
+# Under gunicorn set METRICS_DIR so every worker's numbers are included
+METRICS = {
+    'ENABLED': os.environ.get('METRICS_ENABLED', 'True').lower() == 'true',
+    'TOKEN': os.environ.get('METRICS_TOKEN', ''),  # Bearer token for /metrics; unset disables it
+    'DIRECTORY': os.environ.get('METRICS_DIR') or None,
+    'FLUSH_INTERVAL': 5,  # Seconds between per-worker snapshot writes
+    'SERVER_TIMING': True,
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -115,13 +211,23 @@ STATICFILES_DIRS = [
     BASE_DIR / 'core' / 'static',
 ]
 
-# Static files for production - use simpler storage to avoid manifest issues
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
+# Content-hashed names plus Brotli/gzip copies; WhiteNoise serves hashed files
+# as immutable. Missing references fall back to the plain name (core/storage.py)
+STATICFILES_STORAGE = 'core.storage.ForgivingManifestStaticFilesStorage'
 
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Local AVIF/WebP copies of remote images for {% responsive_image %} (see core/images.py)
+# Sources are fetched once into MEDIA_ROOT/images; only ALLOWED_HOSTS are fetched
+IMAGES = {
+    'WIDTHS': [160, 320, 480, 640, 800, 1200, 1600],
+    'FORMATS': ['avif', 'webp'],  # AVIF needs pillow-avif-plugin
+    'ALLOWED_HOSTS': ['images.unsplash.com', 'firebasestorage.googleapis.com', 'storage.googleapis.com'],
+    'VERSION': os.environ.get('IMAGES_VERSION', '1'),  # Change to regenerate every derivative
+}
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -129,6 +235,96 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Add your Firebase service account key path here
 FIREBASE_SERVICE_ACCOUNT_KEY = BASE_DIR / 'firebase_config' / 'serviceAccountKey.json'
 
+# 'firestore' for the real database, 'memory' for the in-memory stand-in in
+# firebase_config/memory.py (benchmarks and local performance work)
+FIREBASE_BACKEND = os.environ.get('FIREBASE_BACKEND', 'firestore')
+
+# In-memory backend: per-call latency and jitter in seconds, failure probability,
+# RNG seed, and a JSON fixture of {collection: [documents]} to start from
+FIREBASE_MEMORY = {
+    'LATENCY': float(os.environ.get('FIREBASE_MEMORY_LATENCY', '0')),
+    'JITTER': float(os.environ.get('FIREBASE_MEMORY_JITTER', '0')),
+    'FAILURE_RATE': float(os.environ.get('FIREBASE_MEMORY_FAILURE_RATE', '0')),
+    'SEED': os.environ.get('FIREBASE_MEMORY_SEED'),
+    'FIXTURE': os.environ.get('FIREBASE_MEMORY_FIXTURE'),
+}
+
+# Where views read projects and testimonials (see core/repository.py):
+# 'auto' learns it per collection, 'firestore' or 'orm' pin it, 'mirror' reads
+# the models while sync_firestore keeps them current.
+# DECISION_TTL is how long, in seconds, a learned source is trusted.
+CONTENT_REPOSITORY = {
+    'SOURCE': os.environ.get('CONTENT_SOURCE', 'auto'),
+    'DECISION_TTL': 300,
+}
+
+# Firestore-to-database mirror (see core/mirror.py and the sync_firestore command).
+# Times are in seconds: INTERVAL between daemon runs, OVERLAP re-read before the
+# watermark, MAX_LAG before mirror reads fall back, FULL_SYNC_INTERVAL between full passes
+FIRESTORE_MIRROR = {
+    'COLLECTIONS': ['projects', 'testimonials', 'contacts'],
+    'BATCH_SIZE': 500,
+    'INTERVAL': 30,
+    'OVERLAP': 60,
+    'MAX_LAG': 300,
+    'FULL_SYNC_INTERVAL': 86400,
+}
+
+# Admin changelists over large tables (see core/changelist.py)
+# Counts are exact up to COUNT_LIMIT rows; date hierarchy buckets are cached for DATE_HIERARCHY_TTL seconds
+ADMIN_CHANGELIST = {
+    'COUNT_LIMIT': 10000,
+    'DATE_HIERARCHY_TTL': 600,
+}
+
+# Read-through cache for Firestore queries (see firebase_config/cache.py)
+# TTLs are in seconds; stale entries are served while refreshing in the background
+FIREBASE_CACHE = {
+    'ENABLED': os.environ.get('FIREBASE_CACHE_ENABLED', 'True').lower() == 'true',
+    'MAX_ENTRIES': 256,
+    'DEFAULT_TTL': 30,
+    'STALE_TTL': 300,
+    'QUERY_TTLS': {
+        'projects.all': 60,
+        'projects.featured': 60,
+        'testimonials.featured': 300,
+    },
+    'LISTENERS': True,  # Use Firestore on_snapshot; falls back to polling
+    'POLL_INTERVAL': 5,
+}
+
+# Write-behind spool for form submissions (see firebase_config/spool.py)
+# Submissions are queued locally and written to Firestore in batches
+# Vercel has no process after the response to flush it, so submissions are written synchronously there
+FIREBASE_SPOOL = {
+    'ENABLED': os.environ.get('FIREBASE_SPOOL_ENABLED', 'False' if os.environ.get('VERCEL') else 'True').lower() == 'true',
+    'PATH': os.environ.get('FIREBASE_SPOOL_PATH'),  # Default: the system temp directory
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 2,  # Seconds between flushes when no submission wakes the flusher
+    'MAX_BACKOFF': 300,
+    'MAX_ATTEMPTS': 8,  # Then an entry Firestore keeps rejecting moves to the spool_dead table
+    'AUTOSTART': os.environ.get('FIREBASE_SPOOL_AUTOSTART', 'True').lower() == 'true',
+}
+
+# Initialize Firebase in a background thread at startup instead of on the
+# first request that needs it. Off by default to keep cold starts fast; with
+# gunicorn --preload the thread would run in the master, so leave it off there.
+FIREBASE_WARMUP = os.environ.get('FIREBASE_WARMUP', 'False').lower() == 'true'
+
+# Async views read Firestore with an AsyncClient only under ASGI (asgi.py turns
+# this on); under WSGI each async view runs on a new event loop, so they use
+# the sync client in a worker thread instead
+FIREBASE_ASYNC_CLIENT = os.environ.get('FIREBASE_ASYNC_CLIENT', 'False').lower() == 'true'
+
+# Circuit breaker around Firebase (see firebase_config/circuit.py)
+# While open, views use Django models instead of waiting on Firestore
+FIREBASE_CIRCUIT = {
+    'FAILURE_THRESHOLD': 3,  # Consecutive call failures before opening
+    'RESET_TIMEOUT': 5,  # Seconds before the first half-open probe
+    'MAX_RESET_TIMEOUT': 300,  # Backoff cap; doubles after each failed probe
+    'CALL_TIMEOUT': 2.0,  # Deadline in seconds for each Firestore call
+}
+
 # Email Configuration (for contact forms)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # Change for production
 